@@ -0,0 +1,252 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+from datetime import datetime, timezone
+
+from course_tree import COURSES_ROOT, find_course_dirs
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS_DIR = os.path.normpath(os.path.join(SCRIPTS_DIR, '..', 'build', 'bench'))
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KB, or None where unavailable."""
+    # VmHWM starts fresh at exec; ru_maxrss on Linux carries over the forking parent's peak
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+# --- Benchmarks. Each runs in a fresh interpreter and returns the number of files it handled.
+
+def bench_split(source, stream=False):
+    from refactor_course import process_course
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(source, os.path.join(tmp, 'course.json'))
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_course(tmp, stream=stream)
+        elapsed = time.perf_counter() - start
+        with open(os.path.join(tmp, '.split-manifest.json'), encoding='utf-8') as f:
+            files = len(json.load(f)['files'])
+    return elapsed, files
+
+def bench_split_stream(source):
+    return bench_split(source, stream=True)
+
+def bench_walk(tree):
+    start = time.perf_counter()
+    files = 0
+    for _dirpath, _dirnames, filenames in os.walk(tree):
+        files += len(filenames)
+    return time.perf_counter() - start, files
+
+def bench_frontmatter(tree):
+    from frontmatter import parse_course_sections
+    start = time.perf_counter()
+    files = len(parse_course_sections(tree))
+    return time.perf_counter() - start, files
+
+def bench_json(tree):
+    start = time.perf_counter()
+    files = 0
+    for dirpath, _dirnames, filenames in os.walk(tree):
+        for name in filenames:
+            if name.endswith('.json') and not name.startswith('.'):
+                with open(os.path.join(dirpath, name), 'r', encoding='utf-8') as f:
+                    json.load(f)
+                files += 1
+    return time.perf_counter() - start, files
+
+# Benchmarks that read the monolithic course.json, and those that read the split tree
+SOURCE_BENCHMARKS = {
+    'split': bench_split,
+    'split-stream': bench_split_stream,
+}
+TREE_BENCHMARKS = {
+    'walk': bench_walk,
+    'frontmatter': bench_frontmatter,
+    'json-load': bench_json,
+}
+BENCHMARKS = {**SOURCE_BENCHMARKS, **TREE_BENCHMARKS}
+
+def run_in_child(name, target):
+    """Runs one benchmark in a fresh interpreter so its peak RSS is its own."""
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '_run', name, target],
+                          capture_output=True, text=True, cwd=SCRIPTS_DIR)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Benchmark {name} failed on {target}:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+# --- Scenarios
+
+def write_scaled_source(course_dir, scale, out_path):
+    """
+    Writes a monolithic course.json for course_dir with its modules repeated
+    scale times. Modules are serialized one at a time to keep memory flat.
+    """
+    from pack_course import pack_course, unpack_course
+    bundle_path = out_path + '.ctpack'
+    pack_course(course_dir, bundle_path)
+    course = unpack_course(bundle_path)
+    os.remove(bundle_path)
+    modules = course.pop('modules')
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(course, ensure_ascii=False)[:-1])
+        f.write(', "modules": [')
+        first = True
+        for _ in range(scale):
+            for module in modules:
+                if not first:
+                    f.write(', ')
+                f.write(json.dumps(module, ensure_ascii=False))
+                first = False
+        f.write(']}')
+
+def split_tree(source, out_dir):
+    from refactor_course import process_course
+    os.makedirs(out_dir, exist_ok=True)
+    shutil.copy(source, os.path.join(out_dir, 'course.json'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        process_course(out_dir)
+
+def best_of(name, target, repeat):
+    runs = [run_in_child(name, target) for _ in range(repeat)]
+    best = min(runs, key=lambda r: r['seconds'])
+    peaks = [r['peak_rss_kb'] for r in runs if r['peak_rss_kb'] is not None]
+    return {
+        'seconds': round(best['seconds'], 6),
+        'files': best['files'],
+        'files_per_second': round(best['files'] / best['seconds'], 1) if best['seconds'] else None,
+        'peak_rss_kb': max(peaks) if peaks else None,
+    }
+
+def run_scenario(label, course_dir, scale, work_dir, benchmarks, repeat):
+    """Benchmarks one course at one scale. Scale 1 reads the real tree in place."""
+    print(f"{label}:")
+    scenario_dir = os.path.join(work_dir, label.replace('/', '-'))
+    os.makedirs(scenario_dir, exist_ok=True)
+    source = os.path.join(scenario_dir, 'source.json')
+    write_scaled_source(course_dir, scale, source)
+    tree = course_dir
+    if scale != 1 and any(name in TREE_BENCHMARKS for name in benchmarks):
+        tree = os.path.join(scenario_dir, 'tree')
+        split_tree(source, tree)
+
+    results = []
+    for name in benchmarks:
+        target = source if name in SOURCE_BENCHMARKS else tree
+        result = best_of(name, target, repeat)
+        rss = f"{result['peak_rss_kb'] / 1024:8.1f}MB" if result['peak_rss_kb'] else '       n/a'
+        print(f"  {name:<14} {result['seconds'] * 1000:10.1f}ms {result['files']:>9,} files "
+              f"{result['files_per_second'] or 0:>12,.0f} files/s {rss}")
+        results.append({'scenario': label, 'benchmark': name, **result})
+    shutil.rmtree(scenario_dir, ignore_errors=True)
+    return results
+
+def git_revision():
+    try:
+        proc = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=SCRIPTS_DIR)
+        return proc.stdout.strip() or None
+    except OSError:
+        return None
+
+def run_suite(courses, scales, scale_course, benchmarks, repeat, results_dir):
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for course_dir in courses:
+            results += run_scenario(os.path.basename(course_dir), course_dir, 1, work_dir, benchmarks, repeat)
+        for scale in scales:
+            if scale != 1:
+                label = f"{os.path.basename(scale_course)}x{scale}"
+                results += run_scenario(label, scale_course, scale, work_dir, benchmarks, repeat)
+
+    revision = git_revision()
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    os.makedirs(results_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    out_path = os.path.join(results_dir, f"{stamp}-{revision or 'unknown'}.json")
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {out_path}")
+    return out_path
+
+def compare(baseline_path, candidate_path):
+    """Prints per-benchmark time and memory changes between two saved runs."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(candidate_path, encoding='utf-8') as f:
+        candidate = json.load(f)
+    old = {(r['scenario'], r['benchmark']): r for r in baseline['results']}
+    print(f"{baseline.get('revision')} -> {candidate.get('revision')}")
+    print(f"{'scenario':<16} {'benchmark':<14} {'before':>10} {'after':>10} {'change':>8} {'rss change':>11}")
+    for result in candidate['results']:
+        key = (result['scenario'], result['benchmark'])
+        before = old.get(key)
+        if before is None:
+            print(f"{key[0]:<16} {key[1]:<14} {'-':>10} {result['seconds'] * 1000:8.1f}ms {'new':>8}")
+            continue
+        change = (result['seconds'] / before['seconds'] - 1) * 100 if before['seconds'] else 0.0
+        rss_change = ''
+        if result['peak_rss_kb'] and before['peak_rss_kb']:
+            rss_change = f"{(result['peak_rss_kb'] / before['peak_rss_kb'] - 1) * 100:+10.1f}%"
+        print(f"{key[0]:<16} {key[1]:<14} {before['seconds'] * 1000:8.1f}ms {result['seconds'] * 1000:8.1f}ms "
+              f"{change:+7.1f}% {rss_change:>11}")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == '_run':
+        # Child process: run a single benchmark and report it as JSON
+        seconds, files = BENCHMARKS[sys.argv[2]](sys.argv[3])
+        print(json.dumps({'seconds': seconds, 'files': files, 'peak_rss_kb': peak_rss_kb()}))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Benchmark splitting, walking, frontmatter parsing and JSON loading of course content.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_cmd = sub.add_parser('run', help="Run the suite and save results as JSON")
+    run_cmd.add_argument('courses', nargs='*', help="Real course directories to benchmark (default: all)")
+    run_cmd.add_argument('--scales', type=int, nargs='*', default=[10, 100], help="Synthetic scale factors (default: 10 100)")
+    run_cmd.add_argument('--scale-course', default=os.path.join(COURSES_ROOT, 'java'), help="Course replicated for the scaled runs (default: java)")
+    run_cmd.add_argument('--only', nargs='*', choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    run_cmd.add_argument('-n', '--repeat', type=int, default=3, help="Runs per benchmark; the fastest is kept")
+    run_cmd.add_argument('-o', '--out-dir', default=DEFAULT_RESULTS_DIR)
+
+    compare_cmd = sub.add_parser('compare', help="Compare two saved result files")
+    compare_cmd.add_argument('baseline')
+    compare_cmd.add_argument('candidate')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        courses = [os.path.abspath(c) for c in args.courses] or find_course_dirs(COURSES_ROOT)
+        benchmarks = args.only or list(BENCHMARKS)
+        run_suite(courses, args.scales, os.path.abspath(args.scale_course), benchmarks, args.repeat, args.out_dir)
+    elif args.command == 'compare':
+        compare(args.baseline, args.candidate)
@@ -0,0 +1,302 @@
+import os
+import re
+import ast
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+
+from course_tree import COURSES_ROOT, pool_map
+
+DEFAULT_CACHE = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'build', 'fence-cache.json'))
+
+# Bump when extraction or checking changes to invalidate cached results
+CHECKER_VERSION = 2
+
+# Fence info strings -> the language whose checker handles them
+LANGUAGE_ALIASES = {
+    'py': 'python', 'python': 'python', 'python3': 'python',
+    'js': 'javascript', 'javascript': 'javascript', 'mjs': 'javascript', 'node': 'javascript',
+    'kotlin': 'kotlin', 'kt': 'kotlin', 'kts': 'kotlin',
+    'java': 'java',
+    'dart': 'dart', 'flutter': 'dart',
+    'csharp': 'csharp', 'cs': 'csharp', 'c#': 'csharp',
+}
+
+# External checkers: a command run on the block saved with suffix; a non-zero
+# exit means the block is broken. {file} is replaced with the saved path. A
+# checker whose executable isn't installed leaves its blocks unchecked.
+# --checkers adds or replaces entries from a JSON file of the same shape, e.g.
+# {"kotlin": {"command": ["ktlint", "{file}"], "suffix": ".kts"}}.
+DEFAULT_CHECKERS = {
+    # A module, so import/export and top-level await parse
+    'javascript': {'command': ['node', '--check', '{file}'], 'suffix': '.mjs'},
+}
+
+_FENCE_OPEN = re.compile(r'^(?P<indent>[ \t]*)(?P<fence>`{3,}|~{3,})[ \t]*(?P<info>[^`\n]*)$')
+
+def extract_fences(text):
+    """Yields (line of the opening fence, info language, source) for every fenced block."""
+    lines = text.split('\n')
+    i = 0
+    while i < len(lines):
+        match = _FENCE_OPEN.match(lines[i])
+        if not match:
+            i += 1
+            continue
+        fence = match.group('fence')
+        indent = len(match.group('indent'))
+        info = match.group('info').strip()
+        body = []
+        j = i + 1
+        while j < len(lines):
+            stripped = lines[j].strip()
+            if len(stripped) >= len(fence) and set(stripped) == {fence[0]}:
+                break
+            line = lines[j]
+            # Blocks nested in lists are indented along with their fence
+            body.append(line[indent:] if not line[:indent].strip() else line.lstrip())
+            j += 1
+        yield i + 1, info.split()[0].lower() if info else '', '\n'.join(body)
+        i = j + 1
+
+def strip_repl_prompts(source):
+    """Keeps only the input lines of an interactive >>> transcript."""
+    lines = source.split('\n')
+    if not any(line.startswith('>>>') for line in lines):
+        return source
+    return '\n'.join(line[4:] for line in lines if line.startswith(('>>> ', '... ')) or line in ('>>>', '...'))
+
+def check_python(source, strict=False):
+    """
+    Returns [(line, message)] for a Python block. By default only syntax is
+    checked; strict compiles fully, which also rejects snippets such as a
+    bare `return` lifted out of a function.
+    """
+    source = strip_repl_prompts(source)
+    flags = ast.PyCF_ALLOW_TOP_LEVEL_AWAIT | (0 if strict else ast.PyCF_ONLY_AST)
+    try:
+        compile(source, '<fence>', 'exec', flags=flags, dont_inherit=True)
+    except SyntaxError as e:
+        return [(e.lineno or 1, e.msg)]
+    except ValueError as e:
+        return [(1, str(e))]
+    return []
+
+def check_external(source, checker):
+    """Returns [(line, message)] from an external checker's output."""
+    tmp = tempfile.mkdtemp(prefix='fence-')
+    try:
+        path = os.path.join(tmp, 'snippet' + checker.get('suffix', ''))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        command = [arg.replace('{file}', path) for arg in checker['command']]
+        try:
+            proc = subprocess.run(command, capture_output=True, text=True, cwd=tmp,
+                                  timeout=checker.get('timeout', 30))
+        except subprocess.TimeoutExpired:
+            return [(1, 'checker timed out')]
+        if proc.returncode == 0:
+            return []
+        output = (proc.stderr + '\n' + proc.stdout).replace(path, 'snippet')
+        found = re.search(r'snippet[:(](\d+)', output)
+        lines = [line.strip() for line in output.splitlines() if line.strip()]
+        messages = [line for line in lines if 'error' in line.lower()] or lines or [f"exit status {proc.returncode}"]
+        return [(int(found.group(1)) if found else 1, messages[-1][:300])]
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+# Per-process checker table, set up once by init_worker()
+_checkers = {}
+_options = {}
+
+def init_worker(checkers, strict):
+    _checkers.clear()
+    _checkers.update(checkers)
+    _options['strict'] = strict
+
+def check_block(task):
+    """Worker: checks one block. Returns (result key, [[line, message], ...])."""
+    key, language, source = task
+    if language == 'python':
+        errors = check_python(source, _options.get('strict', False))
+    else:
+        errors = check_external(source, _checkers[language])
+    return key, [list(error) for error in errors]
+
+def available_checkers(extra=None):
+    """Returns {language: checker} for the checkers that can run here, and the list that can't."""
+    checkers = dict(DEFAULT_CHECKERS)
+    checkers.update(extra or {})
+    usable, missing = {}, []
+    for language, checker in checkers.items():
+        if shutil.which(checker['command'][0]):
+            usable[language] = checker
+        else:
+            missing.append(language)
+    return usable, sorted(missing)
+
+def checker_key(language, checkers, strict):
+    """Identifies the checker a result came from, so changing it invalidates the cache."""
+    if language == 'python':
+        return f"python {sys.version_info[0]}.{sys.version_info[1]} strict={strict}"
+    return json.dumps(checkers[language], sort_keys=True)
+
+def iter_markdown(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.endswith('.md'):
+                path = os.path.join(dirpath, name)
+                yield os.path.relpath(path, root).replace(os.sep, '/'), path
+
+def load_cache(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}, {}
+    if cache.get('version') != CHECKER_VERSION:
+        return {}, {}
+    return cache.get('files', {}), cache.get('results', {})
+
+def save_cache(path, files, results):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': CHECKER_VERSION, 'files': files, 'results': results}, f)
+    os.replace(path + '.tmp', path)
+
+def scan_file(path):
+    """Returns [{line, language, source}] plus {source hash: source} for the checkable blocks of a file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    fences = []
+    sources = {}
+    for line, info, source in extract_fences(text):
+        language = LANGUAGE_ALIASES.get(info)
+        if language is None or not source.strip():
+            continue
+        source_hash = hashlib.sha256(f"{language}\0{source}".encode('utf-8')).hexdigest()
+        fences.append({'line': line, 'language': language, 'source': source_hash})
+        sources[source_hash] = source
+    return fences, sources
+
+def result_key(fence, checkers, strict):
+    """Cache key of a block's result under the current checkers, or None if nothing can check it."""
+    language = fence['language']
+    if language != 'python' and language not in checkers:
+        return None
+    key = checker_key(language, checkers, strict)
+    return hashlib.sha256(f"{key}\0{fence['source']}".encode('utf-8')).hexdigest()
+
+def check_tree(root=COURSES_ROOT, cache_path=DEFAULT_CACHE, jobs=None, use_cache=True, extra_checkers=None,
+               strict=False, languages=None):
+    """
+    Checks every fenced block below root. Unchanged files are not re-read and
+    blocks with a cached result from the same checker are not re-checked.
+    Returns (broken: [(rel path, md line, language, message)], counts per
+    language).
+    """
+    start = time.perf_counter()
+    checkers, missing = available_checkers(extra_checkers)
+    cached_files, cached_results = load_cache(cache_path) if use_cache else ({}, {})
+
+    files = {}
+    pending = {}
+    pending_sources = {}
+    for rel_path, path in iter_markdown(root):
+        stat = os.stat(path)
+        entry = cached_files.get(rel_path)
+        if entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            fences, sources = entry['fences'], None
+        else:
+            fences, sources = scan_file(path)
+        for fence in fences:
+            if languages and fence['language'] not in languages:
+                continue
+            key = result_key(fence, checkers, strict)
+            if key is None or key in cached_results or key in pending:
+                continue
+            if sources is None:
+                # A cached file with a block that has no result for this checker: read it again
+                fences, sources = scan_file(path)
+            if fence['source'] in sources:
+                pending[key] = (key, fence['language'], sources[fence['source']])
+                pending_sources[key] = fence['source']
+        files[rel_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'fences': fences}
+
+    # Results are stored as [source hash, errors], so those of other checker
+    # settings survive for as long as their block does
+    results = dict(cached_results)
+    for key, errors in pool_map(check_block, list(pending.values()), jobs, init_worker, (checkers, strict)):
+        results[key] = [pending_sources[key], errors]
+
+    broken = []
+    counts = {}
+    live_sources = set()
+    for rel_path, entry in files.items():
+        for fence in entry['fences']:
+            live_sources.add(fence['source'])
+            language = fence['language']
+            if languages and language not in languages:
+                continue
+            count = counts.setdefault(language, {'blocks': 0, 'broken': 0, 'unchecked': 0})
+            count['blocks'] += 1
+            key = result_key(fence, checkers, strict)
+            if key is None or key not in results:
+                count['unchecked'] += 1
+                continue
+            errors = results[key][1]
+            if errors:
+                count['broken'] += 1
+                for line, message in errors:
+                    # Block line 1 is the line after the opening fence
+                    broken.append((rel_path, fence['line'] + line, language, message))
+
+    if use_cache:
+        # Results of blocks that no longer exist in any file are dropped
+        save_cache(cache_path, files, {k: r for k, r in results.items() if r[0] in live_sources})
+    total = sum(c['blocks'] for c in counts.values())
+    print(f"Checked {total:,} blocks in {len(files):,} files ({len(pending):,} checked, "
+          f"{total - len(pending):,} cached or unchecked) in {time.perf_counter() - start:.2f}s")
+    if missing:
+        print(f"No checker installed for: {', '.join(missing)}")
+    return broken, counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract every fenced code block from the course markdown and check that it parses.")
+    parser.add_argument('root', nargs='?', default=COURSES_ROOT, help="Content root to scan (default: content/courses)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help="Result cache keyed by block content hash")
+    parser.add_argument('--no-cache', action='store_true', help="Check every block and don't update the cache")
+    parser.add_argument('--checkers', help="JSON file of extra or replacement external checkers")
+    parser.add_argument('--languages', nargs='*', help="Only check and report fences in these languages")
+    parser.add_argument('--strict', action='store_true', help="Fully compile Python blocks instead of only parsing them")
+    parser.add_argument('--json', help="Write the broken blocks as a JSON report to this path")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"Error: {args.root} is not a directory.")
+        sys.exit(1)
+    extra = None
+    if args.checkers:
+        with open(args.checkers, 'r', encoding='utf-8') as f:
+            extra = json.load(f)
+
+    broken, counts = check_tree(args.root, args.cache, args.jobs, not args.no_cache, extra, args.strict, args.languages)
+    for rel_path, line, language, message in broken:
+        print(f"{rel_path}:{line}: [{language}] {message}")
+    print(f"{'language':<12} {'blocks':>7} {'broken':>7} {'unchecked':>10}")
+    for language, count in sorted(counts.items()):
+        print(f"{language:<12} {count['blocks']:>7,} {count['broken']:>7,} {count['unchecked']:>10,}")
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'counts': counts, 'broken': [
+                {'path': rel_path, 'line': line, 'language': language, 'message': message}
+                for rel_path, line, language, message in broken]}, f, indent=2)
+    sys.exit(1 if broken else 0)
@@ -0,0 +1,299 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+
+from course_tree import (
+    COURSES_ROOT, find_course_dirs, hints_text, iter_module_dirs, iter_lesson_dirs, read_json, read_lesson_content,
+)
+from search_index import lesson_fingerprint
+
+DEFAULT_DB = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'build', 'content.db'))
+SCHEMA_VERSION = 1
+
+# Lessons carry their module's order so "lessons of a course in order" and
+# "lessons of module N" are answered from one covering index. Sections and
+# challenges are indexed for full-text search through external-content FTS5
+# tables kept in sync by triggers, so the text is stored once.
+SCHEMA = '''
+CREATE TABLE courses (
+    id TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    title TEXT,
+    language TEXT,
+    description TEXT,
+    meta TEXT NOT NULL
+);
+CREATE TABLE modules (
+    course_id TEXT NOT NULL REFERENCES courses(id) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    dir TEXT NOT NULL,
+    ord INTEGER NOT NULL,
+    title TEXT,
+    description TEXT,
+    difficulty TEXT,
+    meta TEXT NOT NULL,
+    PRIMARY KEY (course_id, id)
+);
+CREATE INDEX modules_by_position ON modules (course_id, ord, id, title);
+CREATE TABLE lessons (
+    rowid INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    course_id TEXT NOT NULL,
+    module_id TEXT NOT NULL,
+    module_ord INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    ord INTEGER NOT NULL,
+    title TEXT,
+    difficulty TEXT,
+    estimated_minutes INTEGER,
+    archived INTEGER NOT NULL DEFAULT 0,
+    meta TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    FOREIGN KEY (course_id, module_id) REFERENCES modules(course_id, id) ON DELETE CASCADE
+);
+CREATE INDEX lessons_by_position ON lessons (course_id, module_ord, ord, id, title, rowid);
+CREATE INDEX lessons_by_id ON lessons (course_id, id);
+CREATE TABLE sections (
+    rowid INTEGER PRIMARY KEY,
+    lesson_rowid INTEGER NOT NULL REFERENCES lessons(rowid) ON DELETE CASCADE,
+    ord INTEGER NOT NULL,
+    type TEXT,
+    title TEXT,
+    body TEXT
+);
+CREATE UNIQUE INDEX sections_by_lesson ON sections (lesson_rowid, ord);
+CREATE TABLE challenges (
+    rowid INTEGER PRIMARY KEY,
+    lesson_rowid INTEGER NOT NULL REFERENCES lessons(rowid) ON DELETE CASCADE,
+    ord INTEGER NOT NULL,
+    id TEXT,
+    type TEXT,
+    title TEXT,
+    description TEXT,
+    hints TEXT,
+    starter_code TEXT,
+    solution TEXT,
+    meta TEXT NOT NULL
+);
+CREATE UNIQUE INDEX challenges_by_lesson ON challenges (lesson_rowid, ord);
+
+CREATE VIRTUAL TABLE sections_fts USING fts5 (
+    title, body, content='sections', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER sections_ai AFTER INSERT ON sections BEGIN
+    INSERT INTO sections_fts (rowid, title, body) VALUES (new.rowid, new.title, new.body);
+END;
+CREATE TRIGGER sections_ad AFTER DELETE ON sections BEGIN
+    INSERT INTO sections_fts (sections_fts, rowid, title, body) VALUES ('delete', old.rowid, old.title, old.body);
+END;
+
+CREATE VIRTUAL TABLE challenges_fts USING fts5 (
+    title, description, hints, solution, content='challenges', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER challenges_ai AFTER INSERT ON challenges BEGIN
+    INSERT INTO challenges_fts (rowid, title, description, hints, solution)
+    VALUES (new.rowid, new.title, new.description, new.hints, new.solution);
+END;
+CREATE TRIGGER challenges_ad AFTER DELETE ON challenges BEGIN
+    INSERT INTO challenges_fts (challenges_fts, rowid, title, description, hints, solution)
+    VALUES ('delete', old.rowid, old.title, old.description, old.hints, old.solution);
+END;
+'''
+
+# Keys stored in their own columns; everything else stays in the meta JSON
+COURSE_COLUMNS = ('id', 'title', 'language', 'description')
+MODULE_COLUMNS = ('id', 'order', 'title', 'description', 'difficulty')
+LESSON_COLUMNS = ('id', 'order', 'title', 'difficulty', 'estimatedMinutes', 'archived', 'moduleId')
+CHALLENGE_COLUMNS = ('id', 'type', 'title', 'description', 'hints', 'starterCode', 'solution')
+
+def rest(data, columns):
+    return json.dumps({k: v for k, v in data.items() if k not in columns}, ensure_ascii=False, sort_keys=True)
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    return conn
+
+def open_db(db_path, force=False):
+    """Opens the database, creating it when it's missing, outdated or force is set."""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    if os.path.exists(db_path) and not force:
+        conn = connect(db_path)
+        if conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION:
+            return conn
+        conn.close()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    conn = connect(db_path)
+    conn.executescript(SCHEMA)
+    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    return conn
+
+def digest_fingerprint(fingerprint):
+    return hashlib.sha256(json.dumps(fingerprint).encode('utf-8')).hexdigest()
+
+def insert_lesson(conn, path, course_id, module_id, module_ord, lesson, lesson_dir, fingerprint):
+    cursor = conn.execute(
+        'INSERT INTO lessons (path, course_id, module_id, module_ord, id, ord, title, difficulty, '
+        'estimated_minutes, archived, meta, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        (path, course_id, module_id, module_ord, lesson.get('id'), lesson.get('order', 0), lesson.get('title'),
+         lesson.get('difficulty'), lesson.get('estimatedMinutes'), int(bool(lesson.get('archived'))),
+         rest(lesson, LESSON_COLUMNS), fingerprint))
+    lesson_rowid = cursor.lastrowid
+    sections, challenges = read_lesson_content(lesson_dir)
+    conn.executemany(
+        'INSERT INTO sections (lesson_rowid, ord, type, title, body) VALUES (?, ?, ?, ?, ?)',
+        [(lesson_rowid, i, s.get('type'), s.get('title'), s.get('content')) for i, s in enumerate(sections, 1)])
+    conn.executemany(
+        'INSERT INTO challenges (lesson_rowid, ord, id, type, title, description, hints, starter_code, solution, meta) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [(lesson_rowid, i, c.get('id'), c.get('type'), c.get('title'),
+          c.get('description') or c.get('instructions') or c.get('question'), hints_text(c.get('hints')),
+          c.get('starterCode'), c.get('solution'), rest(c, CHALLENGE_COLUMNS))
+         for i, c in enumerate(challenges, 1)])
+
+def export(courses_root=COURSES_ROOT, db_path=DEFAULT_DB, force=False):
+    """
+    Loads the split course tree into the database. Courses and modules are
+    upserted on every run; a lesson is only re-read when its files'
+    size/mtime fingerprint changed, and lessons no longer in the tree are
+    deleted along with their sections and challenges. Everything happens in
+    one transaction, so readers never see a half-updated database.
+    Returns counts of added, updated, unchanged and removed lessons.
+    """
+    conn = open_db(db_path, force)
+    known = {path: (fingerprint, course_id, module_id) for path, fingerprint, course_id, module_id
+             in conn.execute('SELECT path, fingerprint, course_id, module_id FROM lessons')}
+    counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+    seen = set()
+    with conn:
+        course_ids = []
+        for course_dir in find_course_dirs(courses_root):
+            course = read_json(os.path.join(course_dir, 'course.json'))
+            course_id = course.get('id') or os.path.basename(course_dir)
+            course_ids.append(course_id)
+            conn.execute(
+                'INSERT INTO courses (id, dir, title, language, description, meta) VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (id) DO UPDATE SET dir = excluded.dir, title = excluded.title, language = excluded.language, '
+                'description = excluded.description, meta = excluded.meta',
+                (course_id, os.path.basename(course_dir), course.get('title'), course.get('language'),
+                 course.get('description'), rest(course, COURSE_COLUMNS + ('modules',))))
+            module_ids = []
+            for module_dir in iter_module_dirs(course_dir):
+                module_json = os.path.join(module_dir, 'module.json')
+                module = read_json(module_json) if os.path.exists(module_json) else {}
+                module_id = module.get('id') or os.path.basename(module_dir)
+                module_ord = module.get('order', 0)
+                module_ids.append(module_id)
+                conn.execute(
+                    'INSERT INTO modules (course_id, id, dir, ord, title, description, difficulty, meta) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (course_id, id) DO UPDATE SET dir = excluded.dir, '
+                    'ord = excluded.ord, title = excluded.title, description = excluded.description, '
+                    'difficulty = excluded.difficulty, meta = excluded.meta',
+                    (course_id, module_id, os.path.basename(module_dir), module_ord, module.get('title'),
+                     module.get('description'), module.get('difficulty'), rest(module, MODULE_COLUMNS)))
+                for lesson_dir in iter_lesson_dirs(module_dir):
+                    lesson_json = os.path.join(lesson_dir, 'lesson.json')
+                    if not os.path.exists(lesson_json):
+                        continue
+                    path = os.path.relpath(lesson_dir, courses_root).replace(os.sep, '/')
+                    seen.add(path)
+                    fingerprint = digest_fingerprint(lesson_fingerprint(lesson_dir))
+                    previous = known.get(path)
+                    if previous is not None and previous[0] == fingerprint:
+                        if previous[1:] != (course_id, module_id):
+                            # The course or module id changed: move the row before the stale
+                            # module is deleted, or the cascade would take the lesson with it
+                            conn.execute('UPDATE lessons SET course_id = ?, module_id = ?, module_ord = ? WHERE path = ?',
+                                         (course_id, module_id, module_ord, path))
+                            counts['updated'] += 1
+                            continue
+                        # The module's order may still have changed
+                        conn.execute('UPDATE lessons SET module_ord = ? WHERE path = ? AND module_ord != ?',
+                                     (module_ord, path, module_ord))
+                        counts['unchanged'] += 1
+                        continue
+                    if previous is not None:
+                        conn.execute('DELETE FROM lessons WHERE path = ?', (path,))
+                    insert_lesson(conn, path, course_id, module_id, module_ord, read_json(lesson_json), lesson_dir, fingerprint)
+                    counts['updated' if previous is not None else 'added'] += 1
+            conn.execute(f"DELETE FROM modules WHERE course_id = ? AND id NOT IN ({','.join('?' * len(module_ids))})",
+                         (course_id, *module_ids))
+        conn.execute(f"DELETE FROM courses WHERE id NOT IN ({','.join('?' * len(course_ids))})", course_ids)
+        for path in set(known) - seen:
+            conn.execute('DELETE FROM lessons WHERE path = ?', (path,))
+        # Counted from what's left, so lessons removed by a module or course cascade are included
+        present = {path for path, in conn.execute('SELECT path FROM lessons')}
+        counts['removed'] = len(set(known) - present)
+    if counts['added'] or counts['removed'] or counts['updated']:
+        conn.execute("INSERT INTO sections_fts (sections_fts) VALUES ('optimize')")
+        conn.execute("INSERT INTO challenges_fts (challenges_fts) VALUES ('optimize')")
+        conn.commit()
+    conn.close()
+    return counts
+
+def search(conn, query, limit=10, course=None):
+    """
+    Full-text search over sections and challenges, best matches first.
+    Returns [(kind, course, lesson id, lesson title, item title, snippet)].
+    """
+    course_filter = 'AND l.course_id = ?' if course else ''
+    params = (query, *([course] if course else []))
+    rows = conn.execute(f'''
+        SELECT 'section', l.course_id, l.id, l.title, s.title,
+               snippet(sections_fts, 1, '[', ']', '...', 12), bm25(sections_fts)
+        FROM sections_fts JOIN sections s ON s.rowid = sections_fts.rowid JOIN lessons l ON l.rowid = s.lesson_rowid
+        WHERE sections_fts MATCH ? {course_filter}
+        UNION ALL
+        SELECT 'challenge', l.course_id, l.id, l.title, c.title,
+               snippet(challenges_fts, -1, '[', ']', '...', 12), bm25(challenges_fts, 3.0, 1.0, 0.7, 0.5)
+        FROM challenges_fts JOIN challenges c ON c.rowid = challenges_fts.rowid JOIN lessons l ON l.rowid = c.lesson_rowid
+        WHERE challenges_fts MATCH ? {course_filter}
+        ORDER BY 7 LIMIT ?''', (*params, *params, limit)).fetchall()
+    return [row[:6] for row in rows]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the split course tree into one SQLite database with full-text search.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_cmd = sub.add_parser('build', help="Create or incrementally update the database")
+    build_cmd.add_argument('--courses', default=COURSES_ROOT)
+    build_cmd.add_argument('--db', default=DEFAULT_DB)
+    build_cmd.add_argument('--force', action='store_true', help="Rebuild from scratch")
+
+    search_cmd = sub.add_parser('search', help="Full-text search over sections and challenges (FTS5 query syntax)")
+    search_cmd.add_argument('terms', nargs='+')
+    search_cmd.add_argument('--db', default=DEFAULT_DB)
+    search_cmd.add_argument('--course', help="Only return lessons from this course (e.g. python)")
+    search_cmd.add_argument('-n', '--limit', type=int, default=10)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if not os.path.isdir(args.courses):
+            print(f"Error: {args.courses} is not a directory.")
+            sys.exit(1)
+        start = time.perf_counter()
+        counts = export(args.courses, args.db, args.force)
+        print(f"{args.db}: {counts['added']} lessons added, {counts['updated']} updated, "
+              f"{counts['unchanged']} unchanged, {counts['removed']} removed in {time.perf_counter() - start:.2f}s")
+    elif args.command == 'search':
+        if not os.path.exists(args.db):
+            print(f"Error: no database at {args.db}; run 'content_db.py build' first.")
+            sys.exit(1)
+        conn = sqlite3.connect(args.db)
+        try:
+            hits = search(conn, ' '.join(args.terms), args.limit, args.course)
+        except sqlite3.OperationalError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        for kind, course, lesson_id, lesson_title, title, snippet in hits:
+            print(f"[{course}] {lesson_id} {lesson_title} / {kind}: {title or ''}")
+            print(f"    {' '.join(snippet.split())}")
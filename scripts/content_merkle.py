@@ -0,0 +1,373 @@
+import os
+import sys
+import json
+import time
+import stat
+import fnmatch
+import hashlib
+import argparse
+import subprocess
+
+from course_tree import COURSES_ROOT
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+INDEX_DIR = os.path.join(REPO_ROOT, 'build', 'merkle')
+INDEX_VERSION = 1
+
+# Working-copy files git doesn't track (see .gitignore), left out so a clean
+# working copy hashes exactly like its commit
+IGNORED = ('__pycache__', '*.py[cod]', '.split-manifest.json', '.DS_Store', '.pytest_cache', '.mypy_cache')
+
+def ignored(name):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in IGNORED)
+
+# Hashes are git's object ids, so a working-copy index and a commit's tree
+# agree on every unchanged subtree and either can be diffed against the other.
+
+def blob_id(data):
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+def tree_id(entries):
+    """entries: [(name, mode, hex id)]. Git orders a directory's entries as if it were named 'name/'."""
+    body = b''.join(b'%s %s\0' % (mode.encode(), name.encode('utf-8')) + bytes.fromhex(oid)
+                    for name, mode, oid in sorted(entries, key=lambda e: e[0] + '/' if e[1] == '40000' else e[0]))
+    return hashlib.sha1(b'tree %d\0' % len(body) + body).hexdigest()
+
+def index_directory(path, cached=None, stats=None):
+    """
+    Merkle node for a directory: {'h': id, 'c': {name: child}} with files as
+    {'h': id, 'x': mode, 's': size, 'm': mtime_ns}. Files whose size and
+    mtime match the cached node keep their hash without being read. Returns
+    None for a directory with nothing tracked in it, which git can't store.
+    """
+    cached_children = (cached or {}).get('c', {})
+    children = {}
+    entries = []
+    with os.scandir(path) as it:
+        dir_entries = sorted(it, key=lambda e: e.name)
+    for entry in dir_entries:
+        if ignored(entry.name):
+            continue
+        previous = cached_children.get(entry.name)
+        if entry.is_dir(follow_symlinks=False):
+            child = index_directory(entry.path, previous if previous and 'c' in previous else None, stats)
+            if child is None:
+                continue
+            mode = '40000'
+        else:
+            st = entry.stat(follow_symlinks=False)
+            if stat.S_ISLNK(st.st_mode):
+                mode = '120000'
+            else:
+                mode = '100755' if st.st_mode & stat.S_IXUSR else '100644'
+            if previous and previous.get('s') == st.st_size and previous.get('m') == st.st_mtime_ns and previous.get('x') == mode:
+                child = previous
+            else:
+                if mode == '120000':
+                    data = os.readlink(entry.path).encode('utf-8')
+                else:
+                    with open(entry.path, 'rb') as f:
+                        data = f.read()
+                child = {'h': blob_id(data), 'x': mode, 's': st.st_size, 'm': st.st_mtime_ns}
+                if stats is not None:
+                    stats['hashed'] += 1
+            if stats is not None:
+                stats['files'] += 1
+        children[entry.name] = child
+        entries.append((entry.name, mode, child['h']))
+    if not children:
+        return None
+    return {'h': tree_id(entries), 'c': children}
+
+def index_path(root):
+    """Where the cached index of a working copy lives, one per directory indexed."""
+    key = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(INDEX_DIR, f'{os.path.basename(os.path.abspath(root))}-{key}.json')
+
+def load_index(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get('version') == INDEX_VERSION else None
+
+def refresh_index(root, path=None):
+    """Brings the working copy's index up to date and saves it. Returns (root node, stats)."""
+    path = path or index_path(root)
+    cached = load_index(path)
+    stats = {'files': 0, 'hashed': 0}
+    node = index_directory(root, cached['root'] if cached else None, stats) or {'h': tree_id([]), 'c': {}}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': INDEX_VERSION, 'root': node}, f, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+    return node, stats
+
+class WorkingTree:
+    """A side of a diff backed by a working-copy Merkle index."""
+
+    def __init__(self, root, index_file=None):
+        self.label = root
+        self.root, self.stats = refresh_index(root, index_file)
+        self.base = root
+
+    def node_id(self, node):
+        return node['h']
+
+    def is_tree(self, node):
+        return 'c' in node
+
+    def children(self, node):
+        return node['c']
+
+    def read(self, node, path):
+        with open(os.path.join(self.base, *path), 'rb') as f:
+            return f.read()
+
+class GitTree:
+    """A side of a diff backed by a git revision, reading tree objects only as the walk reaches them."""
+
+    def __init__(self, rev, subdir, repo=REPO_ROOT):
+        self.label = f'git:{rev}'
+        oid = subprocess.run(['git', 'rev-parse', f'{rev}:{subdir}'], cwd=repo, capture_output=True, text=True)
+        if oid.returncode != 0:
+            raise ValueError(f"can't resolve {rev}:{subdir}: {oid.stderr.strip()}")
+        self.proc = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=repo, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.root = ('40000', oid.stdout.strip())
+        self.stats = {'objectsRead': 0}
+
+    def _object(self, oid):
+        self.proc.stdin.write(oid.encode() + b'\n')
+        self.proc.stdin.flush()
+        header = self.proc.stdout.readline().split()
+        if len(header) < 3:
+            raise ValueError(f"missing git object {oid}")
+        data = self.proc.stdout.read(int(header[2]))
+        self.proc.stdout.read(1)
+        self.stats['objectsRead'] += 1
+        return data
+
+    def node_id(self, node):
+        return node[1]
+
+    def is_tree(self, node):
+        return node[0] == '40000'
+
+    def children(self, node):
+        data = self._object(node[1])
+        children = {}
+        i = 0
+        while i < len(data):
+            space = data.index(b' ', i)
+            nul = data.index(b'\0', space)
+            mode = data[i:space].decode()
+            children[data[space + 1:nul].decode('utf-8')] = (mode, data[nul + 1:nul + 21].hex())
+            i = nul + 21
+        return children
+
+    def read(self, node, path):
+        return self._object(node[1])
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+def open_side(spec, subdir):
+    """'git:REV' for a revision, anything else for a working-copy directory."""
+    if spec.startswith('git:'):
+        return GitTree(spec[4:], subdir)
+    if not os.path.isdir(spec):
+        raise ValueError(f"{spec} is not a directory")
+    return WorkingTree(spec)
+
+def walk_diff(old, new, old_node, new_node, path=(), visited=None):
+    """
+    Yields (path, status, old node, new node) for every difference, with
+    status 'added', 'removed' or 'modified'. Subtrees whose ids match are
+    skipped without being opened, and added or removed subtrees are reported
+    whole rather than descended into, so the work done is proportional to the
+    size of the change.
+    """
+    if visited is not None:
+        visited[0] += 1
+    old_children = old.children(old_node)
+    new_children = new.children(new_node)
+    for name in sorted(set(old_children) | set(new_children)):
+        a = old_children.get(name)
+        b = new_children.get(name)
+        child_path = path + (name,)
+        if a is None:
+            yield child_path, 'added', None, b
+        elif b is None:
+            yield child_path, 'removed', a, None
+        elif old.node_id(a) != new.node_id(b):
+            if old.is_tree(a) and new.is_tree(b):
+                yield child_path, 'modified', a, b
+                yield from walk_diff(old, new, a, b, child_path, visited)
+            else:
+                yield child_path, 'modified', a, b
+
+def lesson_title(side, node, path):
+    """The title in a lesson directory's lesson.json, read only for lessons in the changelog."""
+    if node is None or not side.is_tree(node):
+        return None
+    lesson_json = side.children(node).get('lesson.json')
+    if lesson_json is None:
+        return None
+    try:
+        return json.loads(side.read(lesson_json, path + ('lesson.json',))).get('title')
+    except (ValueError, OSError):
+        return None
+
+def changelog(old, new):
+    """
+    Diffs two sides of the split layout into a structured changelog:
+    courses and modules added/removed/modified, lessons added/removed/moved/
+    modified with the sections, challenges and metadata that changed, and
+    any other files outside lessons.
+    """
+    log = {'courses': [], 'modules': [], 'lessons': [], 'files': []}
+    lessons = {}
+    visited = [0]
+
+    def lesson_entry(key, status, old_node=None, new_node=None):
+        entry = lessons.get(key)
+        if entry is None:
+            entry = lessons[key] = {'path': '/'.join(key), 'status': status, 'sections': [], 'challenges': {}, 'metadata': False}
+            side, node = (new, new_node) if new_node is not None else (old, old_node)
+            entry['title'] = lesson_title(side, node, key)
+            if status != 'modified':
+                entry['id'] = side.node_id(node)
+        return entry
+
+    for path, status, a, b in walk_diff(old, new, old.root, new.root, visited=visited):
+        depth = len(path)
+        is_tree = new.is_tree(b) if b is not None else old.is_tree(a)
+        if depth == 1 and is_tree:
+            if status != 'modified':
+                log['courses'].append({'course': path[0], 'status': status})
+            continue
+        if depth == 2 and path[1] == 'course.json':
+            log['courses'].append({'course': path[0], 'status': 'metadata'})
+            continue
+        if depth >= 3 and path[1] == 'modules':
+            if depth == 3:
+                if status != 'modified':
+                    log['modules'].append({'module': '/'.join(path), 'status': status})
+                continue
+            if depth == 4 and path[3] == 'module.json':
+                log['modules'].append({'module': '/'.join(path[:3]), 'status': 'metadata'})
+                continue
+            if depth == 5 and path[3] == 'lessons' and is_tree:
+                # The walk reports a lesson directory before anything inside it
+                lesson_entry(path, status, a, b)
+                continue
+            if depth > 5 and path[3] == 'lessons':
+                entry = lesson_entry(path[:5], 'modified')
+                rest = path[5:]
+                if rest == ('lesson.json',):
+                    entry['metadata'] = True
+                elif rest in (('content',), ('challenges',)) and status != 'modified':
+                    # A whole content/ or challenges/ directory came or went: list what was in it
+                    side, node = (new, b) if b is not None else (old, a)
+                    for name in sorted(side.children(node)):
+                        if rest[0] == 'content':
+                            entry['sections'].append({'file': name, 'status': status})
+                        else:
+                            entry['challenges'][name] = {'status': status, 'files': []}
+                elif rest[0] == 'content' and len(rest) == 2:
+                    entry['sections'].append({'file': rest[1], 'status': status})
+                elif rest[0] == 'challenges' and len(rest) >= 2:
+                    challenge = entry['challenges'].setdefault(rest[1], {'status': 'modified', 'files': []})
+                    if len(rest) == 2:
+                        if status != 'modified':
+                            challenge['status'] = status
+                    else:
+                        challenge['files'].append({'file': '/'.join(rest[2:]), 'status': status})
+                elif not is_tree or status != 'modified':
+                    entry.setdefault('other', []).append({'file': '/'.join(rest), 'status': status})
+                continue
+        if not is_tree or status != 'modified':
+            log['files'].append({'file': '/'.join(path), 'status': status})
+
+    # A lesson removed in one place and added with identical content elsewhere was moved
+    added = {e['id']: e for e in lessons.values() if e['status'] == 'added'}
+    for entry in [e for e in lessons.values() if e['status'] == 'removed']:
+        target = added.pop(entry['id'], None)
+        if target is not None:
+            target['status'] = 'moved'
+            target['from'] = entry['path']
+            del lessons[tuple(entry['path'].split('/'))]
+
+    for entry in lessons.values():
+        entry.pop('id', None)
+        entry['challenges'] = [dict(c, challenge=name) for name, c in sorted(entry['challenges'].items())]
+    log['lessons'] = sorted(lessons.values(), key=lambda e: e['path'])
+    log['treesCompared'] = visited[0]
+    return log
+
+def print_changelog(log):
+    for course in log['courses']:
+        print(f"course {course['status']:<9} {course['course']}")
+    for module in log['modules']:
+        print(f"module {module['status']:<9} {module['module']}")
+    for lesson in log['lessons']:
+        title = f" ({lesson['title']})" if lesson['title'] else ''
+        moved = f" from {lesson['from']}" if lesson['status'] == 'moved' else ''
+        print(f"lesson {lesson['status']:<9} {lesson['path']}{title}{moved}")
+        if lesson['metadata']:
+            print("    lesson.json modified")
+        for section in lesson['sections']:
+            print(f"    section {section['status']:<9} {section['file']}")
+        for challenge in lesson['challenges']:
+            files = ', '.join(f"{f['file']} {f['status']}" for f in challenge['files'])
+            print(f"    challenge {challenge['status']:<9} {challenge['challenge']}{': ' + files if files else ''}")
+        for other in lesson.get('other', []):
+            print(f"    file {other['status']:<9} {other['file']}")
+    for f in log['files']:
+        print(f"file   {f['status']:<9} {f['file']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Diff two content revisions or working copies through a Merkle index of the split course layout.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    index_cmd = sub.add_parser('index', help="Refresh a working copy's index and print its root hash")
+    index_cmd.add_argument('root', nargs='?', default=COURSES_ROOT)
+
+    diff_cmd = sub.add_parser('diff', help="Changelog between two sides: directories or git:REV")
+    diff_cmd.add_argument('old', help="Old side, e.g. git:HEAD~5 or a directory")
+    diff_cmd.add_argument('new', nargs='?', default=COURSES_ROOT, help="New side (default: the working copy of content/courses)")
+    diff_cmd.add_argument('--subdir', default='content/courses', help="Content root inside git revisions (default: content/courses)")
+    diff_cmd.add_argument('--json', help="Write the changelog to this JSON file")
+
+    args = parser.parse_args()
+
+    if args.command == 'index':
+        if not os.path.isdir(args.root):
+            print(f"Error: {args.root} is not a directory.")
+            sys.exit(1)
+        start = time.perf_counter()
+        node, stats = refresh_index(args.root)
+        print(f"{node['h']}  {args.root} ({stats['files']:,} files, {stats['hashed']:,} hashed) "
+              f"in {time.perf_counter() - start:.2f}s")
+    elif args.command == 'diff':
+        start = time.perf_counter()
+        try:
+            old = open_side(args.old, args.subdir)
+            new = open_side(args.new, args.subdir)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        log = changelog(old, new)
+        for side in (old, new):
+            if isinstance(side, GitTree):
+                side.close()
+        print_changelog(log)
+        print(f"{len(log['lessons'])} lessons changed; compared {log['treesCompared']:,} trees "
+              f"in {time.perf_counter() - start:.2f}s")
+        if args.json:
+            os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(dict(log, old=old.label, new=new.label), f, indent=2)
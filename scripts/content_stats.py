@@ -0,0 +1,249 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+from course_tree import (
+    COURSES_ROOT, find_course_dirs, iter_module_dirs, iter_lesson_dirs, list_dirs, list_files,
+    read_json, read_text,
+)
+from frontmatter import parse_frontmatter
+
+BUILD_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'build'))
+DEFAULT_REPORT = os.path.join(BUILD_DIR, 'content-stats.json')
+DEFAULT_SHORT_DIR = os.path.join(BUILD_DIR, 'short-sections')
+
+# Sections whose prose is shorter than this many characters are reported as short
+SHORT_SECTION_CHARS = 50
+# Reading-time estimate: prose at a typical technical reading pace, code read line by line
+WORDS_PER_MINUTE = 200
+CODE_LINES_PER_MINUTE = 20
+# Robust z-score (median/MAD of log length) beyond which a section is an outlier for its course
+OUTLIER_Z = 3.5
+
+# A complete fenced block; the closing fence repeats the opening one
+FENCED_BLOCK_RE = re.compile(r'^[ \t]*(`{3,}|~{3,})[^\n]*\n.*?^[ \t]*\1[ \t]*$', re.M | re.S)
+HEADING_RE = re.compile(r'^#{1,6}[ \t]', re.M)
+
+def section_metrics(body):
+    """(prose, fence count, heading count, prose words, code lines) of a section body."""
+    fences = 0
+    code_lines = 0
+    prose = []
+    last = 0
+    for match in FENCED_BLOCK_RE.finditer(body):
+        fences += 1
+        code_lines += match.group(0).count('\n') - 1
+        prose.append(body[last:match.start()])
+        last = match.end()
+    prose.append(body[last:])
+    prose = ''.join(prose)
+    return prose, fences, len(HEADING_RE.findall(prose)), len(prose.split()), code_lines
+
+class ContentStats:
+    """
+    Section and lesson metrics of every course as flat NumPy arrays. Sections
+    refer to their lesson, lessons to their module and modules to their
+    course by index, so every aggregate is a bincount or a gather.
+    """
+
+    SECTION_FIELDS = ('lesson', 'index', 'length', 'fences', 'headings', 'words', 'code_lines')
+
+    def __init__(self, courses_root=COURSES_ROOT, courses=None):
+        self.courses_root = courses_root
+        self.courses = []
+        self.modules = []          # (course index, relative path, title)
+        self.lessons = []          # (relative path, id, title)
+        self.section_paths = []
+        self.section_titles = []
+        self.section_types = []
+        columns = {name: [] for name in self.SECTION_FIELDS}
+        lesson_module = []
+        lesson_challenges = []
+        lesson_minutes = []
+
+        for course_dir in find_course_dirs(courses_root):
+            course_name = os.path.basename(course_dir)
+            if courses and course_name not in courses:
+                continue
+            self.courses.append(course_name)
+            for module_dir in iter_module_dirs(course_dir):
+                module_meta = read_json(os.path.join(module_dir, 'module.json')) \
+                    if os.path.exists(os.path.join(module_dir, 'module.json')) else {}
+                self.modules.append((len(self.courses) - 1, self.relpath(module_dir), module_meta.get('title')))
+                for lesson_dir in iter_lesson_dirs(module_dir):
+                    lesson_json = os.path.join(lesson_dir, 'lesson.json')
+                    if not os.path.exists(lesson_json):
+                        continue
+                    lesson = read_json(lesson_json)
+                    lesson_index = len(self.lessons)
+                    self.lessons.append((self.relpath(lesson_dir), lesson.get('id'), lesson.get('title')))
+                    lesson_module.append(len(self.modules) - 1)
+                    lesson_minutes.append(lesson.get('estimatedMinutes') or 0)
+                    challenges_dir = os.path.join(lesson_dir, 'challenges')
+                    lesson_challenges.append(sum(os.path.exists(os.path.join(challenges_dir, name, 'challenge.json'))
+                                                 for name in list_dirs(challenges_dir)))
+
+                    content_dir = os.path.join(lesson_dir, 'content')
+                    for section_index, name in enumerate(list_files(content_dir, '.md')):
+                        path = os.path.join(content_dir, name)
+                        meta, body = parse_frontmatter(read_text(path))
+                        prose, fences, headings, words, code_lines = section_metrics(body)
+                        self.section_paths.append(path)
+                        self.section_titles.append(meta.get('title'))
+                        self.section_types.append(meta.get('type') or name[:-3].split('-', 1)[-1].upper())
+                        for column, value in zip(self.SECTION_FIELDS, (lesson_index, section_index, len(prose),
+                                                                       fences, headings, words, code_lines)):
+                            columns[column].append(value)
+
+        for name, values in columns.items():
+            setattr(self, name, np.array(values, dtype=np.int64))
+        self.lesson_module = np.array(lesson_module, dtype=np.int64)
+        self.lesson_challenges = np.array(lesson_challenges, dtype=np.int64)
+        self.lesson_minutes = np.array(lesson_minutes, dtype=np.float64)
+        self.module_course = np.array([course for course, _, _ in self.modules], dtype=np.int64)
+        self.section_module = self.lesson_module[self.lesson]
+        self.section_course = self.module_course[self.section_module]
+        self.reading_minutes = self.words / WORDS_PER_MINUTE + self.code_lines / CODE_LINES_PER_MINUTE
+
+    def relpath(self, path):
+        return os.path.relpath(path, self.courses_root).replace(os.sep, '/')
+
+    def distributions(self):
+        """Per course: section count and length percentiles, plus mean fences, headings and reading time."""
+        result = {}
+        percentiles = [5, 25, 50, 75, 95]
+        for course_index, course in enumerate(self.courses):
+            mask = self.section_course == course_index
+            if not mask.any():
+                continue
+            lengths = self.length[mask]
+            result[course] = {
+                'sections': int(mask.sum()),
+                'length': dict(zip((f'p{p}' for p in percentiles), np.percentile(lengths, percentiles).round(1).tolist()),
+                               mean=round(float(lengths.mean()), 1), max=int(lengths.max())),
+                'meanFences': round(float(self.fences[mask].mean()), 2),
+                'meanHeadings': round(float(self.headings[mask].mean()), 2),
+                'readingHours': round(float(self.reading_minutes[mask].sum()) / 60, 1),
+                'lengthHistogram': np.bincount(np.log2(lengths + 1).astype(np.int64)).tolist(),
+            }
+        return result
+
+    def outliers(self, threshold=OUTLIER_Z):
+        """Section indices whose log length is more than threshold robust z-scores from their course's median."""
+        log_length = np.log1p(self.length)
+        n_courses = len(self.courses)
+        median = np.zeros(n_courses)
+        mad = np.ones(n_courses)
+        for course_index in range(n_courses):
+            values = log_length[self.section_course == course_index]
+            if values.size:
+                median[course_index] = np.median(values)
+                mad[course_index] = np.median(np.abs(values - median[course_index])) or 1.0
+        z = 0.6745 * (log_length - median[self.section_course]) / mad[self.section_course]
+        return np.flatnonzero(np.abs(z) > threshold), z
+
+    def module_aggregates(self):
+        """Per module totals and means, computed with one bincount per metric."""
+        n = len(self.modules)
+        sections = np.bincount(self.section_module, minlength=n)
+        lessons = np.bincount(self.lesson_module, minlength=n)
+        totals = {name: np.bincount(self.section_module, weights=getattr(self, name), minlength=n)
+                  for name in ('length', 'fences', 'headings', 'words', 'code_lines')}
+        reading = np.bincount(self.section_module, weights=self.reading_minutes, minlength=n)
+        challenges = np.bincount(self.lesson_module, weights=self.lesson_challenges, minlength=n)
+        estimated = np.bincount(self.lesson_module, weights=self.lesson_minutes, minlength=n)
+        short = np.bincount(self.section_module[self.length < SHORT_SECTION_CHARS], minlength=n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_length = np.where(sections > 0, totals['length'] / np.maximum(sections, 1), 0)
+        result = []
+        for i, (_, path, title) in enumerate(self.modules):
+            result.append({
+                'module': path,
+                'title': title,
+                'lessons': int(lessons[i]),
+                'sections': int(sections[i]),
+                'challenges': int(challenges[i]),
+                'shortSections': int(short[i]),
+                'meanLength': round(float(mean_length[i]), 1),
+                'fences': int(totals['fences'][i]),
+                'headings': int(totals['headings'][i]),
+                'words': int(totals['words'][i]),
+                'codeLines': int(totals['code_lines'][i]),
+                'readingMinutes': round(float(reading[i]), 1),
+                'estimatedMinutes': int(estimated[i]),
+            })
+        return result
+
+    def short_sections(self, threshold=SHORT_SECTION_CHARS):
+        """{course: [short section records]} in the shape of the original short_sections_<course>.json scans."""
+        result = {course: [] for course in self.courses}
+        for i in np.flatnonzero(self.length < threshold):
+            lesson_path, lesson_id, lesson_title = self.lessons[self.lesson[i]]
+            # Only short sections are read a second time, for their text
+            prose = section_metrics(parse_frontmatter(read_text(self.section_paths[i]))[1])[0]
+            result[self.courses[self.section_course[i]]].append({
+                'lessonId': lesson_id,
+                'lessonTitle': lesson_title,
+                'sectionTitle': self.section_titles[i],
+                'sectionType': self.section_types[i],
+                'content': prose,
+                'contentLength': int(self.length[i]),
+                'sectionIndex': int(self.index[i]),
+                'path': self.relpath(self.section_paths[i]),
+            })
+        return result
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Section statistics for every course: length distributions, outliers, per-module totals and short sections.")
+    parser.add_argument('--courses-root', default=COURSES_ROOT, help="Content root (default: content/courses)")
+    parser.add_argument('--courses', nargs='*', help="Only these course directories (e.g. python kotlin)")
+    parser.add_argument('--short', type=int, default=SHORT_SECTION_CHARS, help=f"Prose length below which a section is short (default: {SHORT_SECTION_CHARS})")
+    parser.add_argument('--outlier-z', type=float, default=OUTLIER_Z, help=f"Robust z-score that makes a section an outlier (default: {OUTLIER_Z})")
+    parser.add_argument('--report', default=DEFAULT_REPORT, help="Full JSON report (default: build/content-stats.json)")
+    parser.add_argument('--short-dir', default=DEFAULT_SHORT_DIR, help="Where short_sections_<course>.json files go (default: build/short-sections)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.courses_root):
+        print(f"Error: {args.courses_root} is not a directory.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    stats = ContentStats(args.courses_root, args.courses)
+    loaded = time.perf_counter() - start
+    distributions = stats.distributions()
+    outlier_indices, z = stats.outliers(args.outlier_z)
+    modules = stats.module_aggregates()
+    short = stats.short_sections(args.short)
+
+    for course, records in short.items():
+        write_json(os.path.join(args.short_dir, f'short_sections_{course}.json'), records)
+    write_json(args.report, {
+        'thresholds': {'shortSection': args.short, 'outlierZ': args.outlier_z,
+                       'wordsPerMinute': WORDS_PER_MINUTE, 'codeLinesPerMinute': CODE_LINES_PER_MINUTE},
+        'courses': distributions,
+        'modules': modules,
+        'outliers': [{'path': stats.relpath(stats.section_paths[i]), 'length': int(stats.length[i]),
+                      'z': round(float(z[i]), 2)} for i in outlier_indices[np.argsort(-np.abs(z[outlier_indices]))]],
+    })
+
+    print(f"{'course':<12} {'sections':>8} {'median':>7} {'p5':>6} {'p95':>7} {'short':>6} {'outliers':>8} {'hours':>6}")
+    outlier_courses = np.bincount(stats.section_course[outlier_indices], minlength=len(stats.courses))
+    for course_index, course in enumerate(stats.courses):
+        d = distributions.get(course)
+        if d is None:
+            continue
+        print(f"{course:<12} {d['sections']:>8,} {d['length']['p50']:>7.0f} {d['length']['p5']:>6.0f} "
+              f"{d['length']['p95']:>7.0f} {len(short[course]):>6} {outlier_courses[course_index]:>8} {d['readingHours']:>6.1f}")
+    print(f"{len(stats.length):,} sections in {len(stats.lessons):,} lessons: loaded in {loaded:.2f}s, "
+          f"total {time.perf_counter() - start:.2f}s. Report: {args.report}")
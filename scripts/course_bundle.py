@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import mmap
+import time
+import argparse
+
+from pack_course import MAGIC, VERSION, HEADER, BUNDLE_EXT, DEFAULT_OUT_DIR
+from course_tree import COURSES_ROOT, find_course_dirs, read_lesson_content
+
+class LessonStub:
+    """Lesson metadata from the bundle index; the body is decoded on first access."""
+    __slots__ = ('bundle', 'module', 'dir', 'meta', '_offset', '_length', '_content')
+
+    def __init__(self, bundle, module, entry):
+        self.bundle = bundle
+        self.module = module
+        self.dir = entry['dir']
+        self.meta = entry['meta']
+        self._offset = entry['offset']
+        self._length = entry['length']
+        self._content = None
+
+    @property
+    def id(self):
+        return self.meta.get('id')
+
+    @property
+    def title(self):
+        return self.meta.get('title')
+
+    @property
+    def is_loaded(self):
+        return self._content is not None
+
+    def _load(self):
+        if self._content is None:
+            self._content = self.bundle.read_payload(self._offset, self._length)
+        return self._content
+
+    @property
+    def sections(self):
+        return self._load()['contentSections']
+
+    @property
+    def challenges(self):
+        return self._load()['challenges']
+
+    def to_dict(self):
+        """Returns the lesson in monolithic course.json shape."""
+        lesson = dict(self.meta)
+        lesson.update(self._load())
+        return lesson
+
+    def __repr__(self):
+        return f"<LessonStub {self.id} {self.title!r}>"
+
+class ModuleStub:
+    __slots__ = ('bundle', 'dir', 'meta', 'lessons')
+
+    def __init__(self, bundle, entry):
+        self.bundle = bundle
+        self.dir = entry['dir']
+        self.meta = entry['meta']
+        self.lessons = [LessonStub(bundle, self, lesson) for lesson in entry['lessons']]
+
+    @property
+    def id(self):
+        return self.meta.get('id')
+
+    @property
+    def title(self):
+        return self.meta.get('title')
+
+    def __repr__(self):
+        return f"<ModuleStub {self.id} {self.title!r} ({len(self.lessons)} lessons)>"
+
+class CourseBundle:
+    """
+    Read-only view of a .ctpack file. The index is decoded eagerly into
+    course/module/lesson stubs; lesson bodies stay in the memory map until
+    a stub's sections or challenges are accessed.
+    """
+    __slots__ = ('path', 'dir', 'meta', 'modules', '_file', '_map', '_payload_start', '_lessons_by_id')
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty, not a course bundle")
+        magic, version, _flags, index_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a course bundle (bad magic)")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: unsupported course bundle version {version}")
+        self._payload_start = HEADER.size + index_length
+        index = json.loads(self._map[HEADER.size:self._payload_start])
+        self.dir = index['dir']
+        self.meta = index['course']
+        self.modules = [ModuleStub(self, module) for module in index['modules']]
+        self._lessons_by_id = None
+
+    def read_payload(self, offset, length):
+        start = self._payload_start + offset
+        return json.loads(self._map[start:start + length])
+
+    @property
+    def id(self):
+        return self.meta.get('id')
+
+    def lessons(self):
+        for module in self.modules:
+            yield from module.lessons
+
+    def lesson(self, lesson_id):
+        """Returns the LessonStub with the given id, or None."""
+        if self._lessons_by_id is None:
+            self._lessons_by_id = {lesson.id: lesson for lesson in self.lessons()}
+        return self._lessons_by_id.get(lesson_id)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return f"<CourseBundle {self.id} ({len(self.modules)} modules)>"
+
+def open_bundles(bundle_dir=DEFAULT_OUT_DIR):
+    """Opens every .ctpack file in bundle_dir, sorted by name."""
+    return [CourseBundle(os.path.join(bundle_dir, name))
+            for name in sorted(os.listdir(bundle_dir)) if name.endswith(BUNDLE_EXT)]
+
+def scan_tree_structure(courses_root):
+    """Baseline: loads course, module and lesson metadata by walking the split tree."""
+    lessons = 0
+    for course in os.scandir(courses_root):
+        if not course.is_dir() or not os.path.exists(os.path.join(course.path, 'course.json')):
+            continue
+        with open(os.path.join(course.path, 'course.json'), encoding='utf-8') as f:
+            json.load(f)
+        modules_dir = os.path.join(course.path, 'modules')
+        if not os.path.isdir(modules_dir):
+            continue
+        for module in os.scandir(modules_dir):
+            with open(os.path.join(module.path, 'module.json'), encoding='utf-8') as f:
+                json.load(f)
+            lessons_dir = os.path.join(module.path, 'lessons')
+            if not os.path.isdir(lessons_dir):
+                continue
+            for lesson in os.scandir(lessons_dir):
+                with open(os.path.join(lesson.path, 'lesson.json'), encoding='utf-8') as f:
+                    json.load(f)
+                lessons += 1
+    return lessons
+
+def scan_tree_content(courses_root):
+    """Baseline: loads every lesson body from the split tree."""
+    lessons = 0
+    for course_dir in find_course_dirs(courses_root):
+        modules_dir = os.path.join(course_dir, 'modules')
+        for module in os.scandir(modules_dir):
+            lessons_dir = os.path.join(module.path, 'lessons')
+            if not os.path.isdir(lessons_dir):
+                continue
+            for lesson in os.scandir(lessons_dir):
+                read_lesson_content(lesson.path)
+                lessons += 1
+    return lessons
+
+def scan_bundle_structure(bundle_dir):
+    lessons = 0
+    for bundle in open_bundles(bundle_dir):
+        with bundle:
+            lessons += sum(1 for _ in bundle.lessons())
+    return lessons
+
+def scan_bundle_content(bundle_dir):
+    lessons = 0
+    for bundle in open_bundles(bundle_dir):
+        with bundle:
+            for lesson in bundle.lessons():
+                lesson.sections
+                lessons += 1
+    return lessons
+
+def best_time(fn, arg, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(arg)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run_benchmark(bundle_dir, courses_root, repeat):
+    rows = [
+        ("tree: scandir + json.load metadata", scan_tree_structure, courses_root),
+        ("bundle: mmap + index", scan_bundle_structure, bundle_dir),
+        ("tree: all lesson bodies", scan_tree_content, courses_root),
+        ("bundle: all lesson bodies", scan_bundle_content, bundle_dir),
+    ]
+    print(f"{'benchmark':<38} {'best':>10} {'lessons':>8}")
+    for label, fn, arg in rows:
+        elapsed, lessons = best_time(fn, arg, repeat)
+        print(f"{label:<38} {elapsed * 1000:8.2f}ms {lessons:>8}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read packed course bundles lazily, or benchmark them against the split tree.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    list_cmd = sub.add_parser('list', help="Print the module/lesson outline of a bundle")
+    list_cmd.add_argument('bundle')
+
+    show_cmd = sub.add_parser('show', help="Print one lesson of a bundle as JSON")
+    show_cmd.add_argument('bundle')
+    show_cmd.add_argument('lesson_id')
+
+    bench_cmd = sub.add_parser('bench', help="Compare bundle reads with walking the split tree")
+    bench_cmd.add_argument('--bundles', default=DEFAULT_OUT_DIR, help="Directory of .ctpack files (build them with pack_course.py pack)")
+    bench_cmd.add_argument('--courses', default=COURSES_ROOT, help="Root of the split course trees")
+    bench_cmd.add_argument('-n', '--repeat', type=int, default=5)
+
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        with CourseBundle(args.bundle) as bundle:
+            print(f"{bundle.id}: {bundle.meta.get('title')}")
+            for module in bundle.modules:
+                print(f"  {module.dir}")
+                for lesson in module.lessons:
+                    print(f"    {lesson.id}  {lesson.title}")
+    elif args.command == 'show':
+        with CourseBundle(args.bundle) as bundle:
+            lesson = bundle.lesson(args.lesson_id)
+            if lesson is None:
+                print(f"Error: lesson {args.lesson_id} not found in {args.bundle}")
+                sys.exit(1)
+            print(json.dumps(lesson.to_dict(), indent=2, ensure_ascii=False))
+    elif args.command == 'bench':
+        if not os.path.isdir(args.bundles):
+            print(f"Error: {args.bundles} not found; run pack_course.py pack first.")
+            sys.exit(1)
+        run_benchmark(args.bundles, args.courses, args.repeat)
@@ -0,0 +1,132 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from frontmatter import parse_frontmatter
+
+# Default location of the split course trees, relative to this script
+COURSES_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'content', 'courses'))
+
+def list_dirs(path):
+    """Returns sorted subdirectory names of path, or [] if it doesn't exist."""
+    try:
+        return sorted(e.name for e in os.scandir(path) if e.is_dir())
+    except FileNotFoundError:
+        return []
+
+def list_files(path, suffix=''):
+    """Returns sorted file names in path ending with suffix, or [] if it doesn't exist."""
+    try:
+        return sorted(e.name for e in os.scandir(path) if e.is_file() and e.name.endswith(suffix))
+    except FileNotFoundError:
+        return []
+
+def read_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def find_course_dirs(root=COURSES_ROOT):
+    """Returns sorted course directories directly below root that have been split."""
+    return [os.path.join(root, name) for name in list_dirs(root)
+            if os.path.exists(os.path.join(root, name, 'course.json'))
+            and os.path.isdir(os.path.join(root, name, 'modules'))]
+
+def iter_module_dirs(course_dir):
+    modules_dir = os.path.join(course_dir, 'modules')
+    for name in list_dirs(modules_dir):
+        yield os.path.join(modules_dir, name)
+
+def iter_lesson_dirs(module_dir):
+    lessons_dir = os.path.join(module_dir, 'lessons')
+    for name in list_dirs(lessons_dir):
+        yield os.path.join(lessons_dir, name)
+
+def iter_course_lessons(course_dir):
+    """Yields (module_dir, lesson_dir) for every lesson of a split course, in order."""
+    for module_dir in iter_module_dirs(course_dir):
+        for lesson_dir in iter_lesson_dirs(module_dir):
+            yield module_dir, lesson_dir
+
+def read_section(path):
+    """Reads a content/NN-type.md file into a contentSections entry."""
+    meta, body = parse_frontmatter(read_text(path))
+    section = {}
+    section_type = meta.get('type')
+    if not section_type:
+        # Fall back to the type encoded in the file name (NN-type.md)
+        section_type = os.path.basename(path)[:-3].split('-', 1)[-1].upper()
+    section['type'] = section_type
+    if meta.get('title'):
+        section['title'] = meta['title']
+    section['content'] = body
+    return section
+
+def find_code_file(challenge_dir, stem):
+    """Returns the first '<stem>.*' file of a challenge alphabetically, as the app does."""
+    names = list_files(challenge_dir)
+    for name in names:
+        if name.startswith(stem + '.'):
+            return os.path.join(challenge_dir, name)
+    return None
+
+def hints_text(hints, sep='\n'):
+    """The text of a challenge's hints, which are {"text"} objects or plain strings."""
+    return sep.join(h.get('text', '') if isinstance(h, dict) else str(h) for h in hints or [])
+
+def mistakes_text(mistakes, sep='\n'):
+    """The text of a challenge's commonMistakes, which are {"mistake", "consequence", "correction"} objects or plain strings."""
+    return sep.join(' '.join(str(m.get(k) or '') for k in ('mistake', 'consequence', 'correction'))
+                    if isinstance(m, dict) else str(m) for m in mistakes or [])
+
+def read_challenge(challenge_dir):
+    """Reads a challenge directory back into its monolithic form, or None if it has no challenge.json."""
+    json_path = os.path.join(challenge_dir, 'challenge.json')
+    if not os.path.exists(json_path):
+        return None
+    challenge = read_json(json_path)
+    starter_path = find_code_file(challenge_dir, 'starter')
+    if starter_path:
+        challenge['starterCode'] = read_text(starter_path)
+    solution_path = find_code_file(challenge_dir, 'solution')
+    if solution_path:
+        challenge['solution'] = read_text(solution_path)
+    return challenge
+
+def read_lesson_content(lesson_dir):
+    """Returns (contentSections, challenges) for a split lesson directory."""
+    content_dir = os.path.join(lesson_dir, 'content')
+    sections = [read_section(os.path.join(content_dir, name)) for name in list_files(content_dir, '.md')]
+    challenges = []
+    challenges_dir = os.path.join(lesson_dir, 'challenges')
+    for name in list_dirs(challenges_dir):
+        challenge = read_challenge(os.path.join(challenges_dir, name))
+        if challenge is not None:
+            challenges.append(challenge)
+    return sections, challenges
+
+def read_lesson(lesson_dir):
+    """Reads a split lesson back into the monolithic course.json lesson shape."""
+    lesson = read_json(os.path.join(lesson_dir, 'lesson.json'))
+    lesson['contentSections'], lesson['challenges'] = read_lesson_content(lesson_dir)
+    return lesson
+
+# Below this many items a process pool costs more to start than it saves
+MIN_POOL_ITEMS = 200
+
+def pool_map(fn, items, jobs=None, initializer=None, initargs=(), chunksize=32):
+    """
+    Yields fn(item) for items in order, on a process pool unless jobs is 1 or
+    there are too few items to be worth one. initializer(*initargs) runs once
+    per worker, or once here when running serially.
+    """
+    if jobs == 1 or len(items) < MIN_POOL_ITEMS:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(fn, items)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as pool:
+        yield from pool.map(fn, items, chunksize=chunksize)
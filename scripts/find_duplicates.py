@@ -0,0 +1,420 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import operator
+import argparse
+import itertools
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from course_tree import (
+    COURSES_ROOT, find_course_dirs, hints_text, iter_course_lessons, list_dirs, list_files,
+    read_json, read_text,
+)
+from frontmatter import parse_frontmatter
+from search_index import tokenize
+from check_fences import extract_fences
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+
+# Documents are only compared within a family: prose against prose, code against code
+FAMILIES = {
+    'section': 'prose',
+    'challenge': 'prose',
+    'fence': 'code',
+    'code': 'code',
+    'file': 'code',
+}
+CODE_TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+FENCE_LINE_RE = re.compile(r'^\s*(`{3,}|~{3,})')
+TEXT_EXTENSIONS = {'.py', '.md', '.js', '.mjs', '.ts', '.cs', '.java', '.kt', '.dart', '.json', '.yml', '.yaml',
+                   '.sh', '.txt', '.xml', '.csproj', '.toml', '.sql', '.html', '.css'}
+
+# Word shingles for prose, token shingles for code
+SHINGLE_SIZES = {'prose': 3, 'code': 5}
+MAX_HASH = 0xFFFFFFFF
+
+def prose_without_fences(markdown):
+    """The prose of a markdown body, with fenced code blocks left out."""
+    lines = []
+    fence = None
+    for line in markdown.split('\n'):
+        match = FENCE_LINE_RE.match(line)
+        if match and (fence is None or match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence)):
+            fence = match.group(1) if fence is None else None
+            continue
+        if fence is None:
+            lines.append(line)
+    return '\n'.join(lines)
+
+def lesson_documents(lesson_dir):
+    """Yields (kind, id, text) for a lesson's sections, code fences, challenge descriptions and code files."""
+    rel_dir = os.path.relpath(lesson_dir, REPO_ROOT).replace(os.sep, '/')
+    content_dir = os.path.join(lesson_dir, 'content')
+    for name in list_files(content_dir, '.md'):
+        _, body = parse_frontmatter(read_text(os.path.join(content_dir, name)))
+        yield 'section', f'{rel_dir}/content/{name}', prose_without_fences(body)
+        for line, _, source in extract_fences(body):
+            yield 'fence', f'{rel_dir}/content/{name}:{line}', source
+
+    challenges_dir = os.path.join(lesson_dir, 'challenges')
+    for name in list_dirs(challenges_dir):
+        challenge_dir = os.path.join(challenges_dir, name)
+        json_path = os.path.join(challenge_dir, 'challenge.json')
+        if os.path.exists(json_path):
+            challenge = read_json(json_path)
+            hints = hints_text(challenge.get('hints'), ' ')
+            description = challenge.get('description') or challenge.get('instructions') or challenge.get('question') or ''
+            yield 'challenge', f'{rel_dir}/challenges/{name}/challenge.json', f"{description}\n{hints}"
+        for file_name in list_files(challenge_dir):
+            if file_name.startswith(('starter.', 'solution.')):
+                yield 'code', f'{rel_dir}/challenges/{name}/{file_name}', read_text(os.path.join(challenge_dir, file_name))
+
+def loose_files(directory, recurse=True, skip=('modules',)):
+    """Yields ('file', id, text) for text files outside the lesson tree, such as scripts and capstone projects."""
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(d for d in dirnames if d not in skip and not d.startswith('.') and d != '__pycache__') if recurse else []
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1] not in TEXT_EXTENSIONS or name == 'course.json':
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                text = read_text(path)
+            except (UnicodeDecodeError, OSError):
+                continue
+            yield 'file', os.path.relpath(path, REPO_ROOT).replace(os.sep, '/'), text
+
+def iter_documents(courses_root=COURSES_ROOT, extra_dirs=(SCRIPTS_DIR,), kinds=None):
+    """Yields (kind, id, text) for every document in every course, plus top-level files of extra_dirs."""
+    def wanted(kind):
+        return kinds is None or kind in kinds
+    for course_dir in find_course_dirs(courses_root):
+        for _, lesson_dir in iter_course_lessons(course_dir):
+            for doc in lesson_documents(lesson_dir):
+                if wanted(doc[0]):
+                    yield doc
+        if wanted('file'):
+            yield from loose_files(course_dir)
+    if wanted('file'):
+        for directory in extra_dirs:
+            yield from loose_files(directory, recurse=False)
+
+def document_tokens(kind, text):
+    if FAMILIES[kind] == 'prose':
+        return tokenize(text)
+    return CODE_TOKEN_RE.findall(text)
+
+def probe_table(num_perm, seed=1):
+    """For each bin, the order in which other bins are tried when it's empty (densification)."""
+    rng = random.Random(seed)
+    table = []
+    for i in range(num_perm):
+        order = [j for j in range(num_perm) if j != i]
+        rng.shuffle(order)
+        table.append(order)
+    return table
+
+class MinHasher:
+    """
+    One-permutation MinHash with densification: every shingle is hashed once
+    and lands in one of num_perm bins, and each bin keeps its minimum. Empty
+    bins borrow from another bin in a fixed per-bin order. This costs one
+    hash per shingle instead of num_perm, and its collision probability still
+    estimates Jaccard similarity.
+    """
+
+    def __init__(self, num_perm=128, seed=1):
+        self.num_perm = num_perm
+        self.probes = probe_table(num_perm, seed)
+
+    def signature(self, tokens, k):
+        num_perm = self.num_perm
+        bins = [MAX_HASH + 1] * num_perm
+        count = max(1, len(tokens) - k + 1)
+        for shingle in {' '.join(tokens[i:i + k]) for i in range(count)}:
+            h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+            b = (h & MAX_HASH) % num_perm
+            v = h >> 32
+            if v < bins[b]:
+                bins[b] = v
+        if MAX_HASH + 1 in bins:
+            filled = list(bins)
+            for i, value in enumerate(filled):
+                if value > MAX_HASH:
+                    # Two documents with the same empty bin probe in the same order,
+                    # so they borrow from the same bin when their contents agree
+                    for j in self.probes[i]:
+                        if filled[j] <= MAX_HASH:
+                            bins[i] = filled[j]
+                            break
+        return bins
+
+_hasher = None
+
+def init_worker(num_perm):
+    global _hasher
+    _hasher = MinHasher(num_perm)
+
+def signature_task(task):
+    """(kind, text) -> (content digest, packed signature), or (None, None) when there's too little text."""
+    kind, text, min_tokens = task
+    tokens = document_tokens(kind, text)
+    if len(tokens) < min_tokens:
+        return None, None
+    digest = hashlib.blake2b(' '.join(tokens).encode('utf-8'), digest_size=12).digest()
+    return digest, array('I', _hasher.signature(tokens, SHINGLE_SIZES[FAMILIES[kind]])).tobytes()
+
+def signature_batch(batch):
+    return [signature_task(task) for task in batch]
+
+def iter_signatures(tasks, jobs=None, batch_size=256):
+    """
+    Signatures of tasks in order. Tasks are read from the iterator only as
+    workers free up, so at most a few batches of text are held at once
+    however long the stream is.
+    """
+    if jobs == 1:
+        yield from map(signature_task, tasks)
+        return
+    batches = iter(lambda: list(itertools.islice(tasks, batch_size)), [])
+    first = next(batches, None)
+    if first is None:
+        return
+    if len(first) < batch_size:
+        # Too few documents to be worth starting a pool
+        yield from map(signature_task, first)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(_hasher.num_perm,)) as pool:
+        max_in_flight = (jobs or os.cpu_count()) * 4
+        in_flight = deque([pool.submit(signature_batch, first)])
+        for batch in batches:
+            in_flight.append(pool.submit(signature_batch, batch))
+            while len(in_flight) >= max_in_flight:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+def _false_rates(threshold, bands, rows, steps=200):
+    """Areas under the LSH S-curve below (false positives) and above (false negatives) the threshold."""
+    false_positive = false_negative = 0.0
+    for i in range(steps):
+        s = (i + 0.5) / steps
+        p = 1 - (1 - s ** rows) ** bands
+        if s < threshold:
+            false_positive += p / steps
+        else:
+            false_negative += (1 - p) / steps
+    return false_positive, false_negative
+
+def choose_bands(threshold, num_perm):
+    """The (bands, rows) split of the signature whose S-curve best matches the threshold."""
+    best = None
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        false_positive, false_negative = _false_rates(threshold, bands, rows)
+        # Missed duplicates cost more than candidates that fail verification
+        error = false_positive + 2 * false_negative
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+class UnionFind:
+    def __init__(self, size):
+        self.parent = array('i', range(size))
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+def find_duplicates(documents, threshold=0.8, num_perm=128, min_tokens=20, jobs=None, max_bucket=100):
+    """
+    Clusters near-duplicate documents. documents is an iterable of
+    (kind, id, text); it's consumed once and no text is kept, only each
+    document's kind, id and packed signature (num_perm * 4 bytes).
+
+    Exact duplicates (same tokens) are grouped by content hash first and only
+    their first copy goes through LSH. Signatures are split into bands; two
+    documents become candidates when any band matches, and a candidate pair
+    is kept when the signatures agree on at least `threshold` of their
+    positions. Buckets above max_bucket members are only linked as a chain,
+    which keeps popular boilerplate from going quadratic.
+
+    Returns (clusters, stats) with clusters as
+    [{'members': [{'id', 'kind', 'similarity'}], 'minSimilarity', 'maxSimilarity'}].
+    """
+    stats = {'documents': 0, 'skippedShort': 0}
+    edges = {}
+    kind_names = sorted(FAMILIES)
+    family_names = sorted(set(FAMILIES.values()))
+    kinds = array('B')
+    ids = []
+
+    def link(a, b, similarity):
+        key = (a, b) if a < b else (b, a)
+        if similarity > edges.get(key, -1.0):
+            edges[key] = similarity
+
+    def tasks():
+        for kind, doc_id, text in documents:
+            kinds.append(kind_names.index(kind))
+            ids.append(doc_id)
+            yield kind, text, min_tokens
+
+    # Exact duplicates: link every copy to the first, then keep only the first for LSH
+    first_copy = {}
+    indexed = array('I')
+    families = array('B')
+    signatures = array('I')
+    start = time.perf_counter()
+    init_worker(num_perm)
+    for i, (digest, signature) in enumerate(iter_signatures(tasks(), jobs)):
+        if digest is None:
+            stats['skippedShort'] += 1
+            continue
+        family = family_names.index(FAMILIES[kind_names[kinds[i]]])
+        key = (family, digest)
+        if key in first_copy:
+            link(first_copy[key], i, 1.0)
+            continue
+        first_copy[key] = i
+        indexed.append(i)
+        families.append(family)
+        signatures.frombytes(signature)
+    first_copy = None
+    stats['documents'] = len(ids)
+    stats['exactDuplicates'] = len(edges)
+    stats['signatureSeconds'] = round(time.perf_counter() - start, 2)
+
+    start = time.perf_counter()
+    bands, rows = choose_bands(threshold, num_perm)
+    stats['bands'], stats['rows'] = bands, rows
+    candidates = 0
+    count = len(indexed)
+
+    def similarity(a, b):
+        sa = signatures[a * num_perm:(a + 1) * num_perm]
+        sb = signatures[b * num_perm:(b + 1) * num_perm]
+        return sum(map(operator.eq, sa, sb)) / num_perm
+
+    def verify(a, b, band):
+        nonlocal candidates
+        if families[a] != families[b]:
+            return
+        # A pair is verified in the first band it collides in, which takes
+        # the place of a set of every pair seen so far
+        for earlier in range(band):
+            lo = earlier * rows
+            if signatures[a * num_perm + lo:a * num_perm + lo + rows] == signatures[b * num_perm + lo:b * num_perm + lo + rows]:
+                return
+        candidates += 1
+        score = similarity(a, b)
+        if score >= threshold:
+            link(indexed[a], indexed[b], score)
+
+    for band in range(bands):
+        lo = band * rows
+        keys = array('q', (hash((families[d], tuple(signatures[d * num_perm + lo:d * num_perm + lo + rows])))
+                           for d in range(count)))
+        order = sorted(range(count), key=keys.__getitem__)
+        run_start = 0
+        for position in range(1, count + 1):
+            if position < count and keys[order[position]] == keys[order[run_start]]:
+                continue
+            bucket = order[run_start:position]
+            if len(bucket) <= max_bucket:
+                for x in range(len(bucket)):
+                    for y in range(x + 1, len(bucket)):
+                        verify(bucket[x], bucket[y], band)
+            else:
+                for x in range(1, len(bucket)):
+                    verify(bucket[x - 1], bucket[x], band)
+            run_start = position
+    stats['candidatePairs'] = candidates
+    stats['lshSeconds'] = round(time.perf_counter() - start, 2)
+
+    union = UnionFind(len(ids))
+    best = {}
+    for (a, b), score in edges.items():
+        union.union(a, b)
+        best[a] = max(best.get(a, 0.0), score)
+        best[b] = max(best.get(b, 0.0), score)
+    groups = {}
+    for i in best:
+        groups.setdefault(union.find(i), []).append(i)
+    component_edges = {}
+    for (a, b), score in edges.items():
+        component_edges.setdefault(union.find(a), []).append(score)
+
+    clusters = []
+    for root, members in groups.items():
+        scores = component_edges[root]
+        clusters.append({
+            'members': [{'id': ids[i], 'kind': kind_names[kinds[i]], 'similarity': round(best[i], 3)}
+                        for i in sorted(members, key=ids.__getitem__)],
+            'minSimilarity': round(min(scores), 3),
+            'maxSimilarity': round(max(scores), 3),
+        })
+    clusters.sort(key=lambda c: (-len(c['members']), -c['maxSimilarity'], c['members'][0]['id']))
+    stats['clusters'] = len(clusters)
+    return clusters, stats
+
+def course_of(doc_id):
+    parts = doc_id.split('/')
+    return parts[2] if parts[:2] == ['content', 'courses'] and len(parts) > 2 else parts[0]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find near-duplicate sections, code blocks, challenges and files across the courses with MinHash LSH.")
+    parser.add_argument('root', nargs='?', default=COURSES_ROOT, help="Content root (default: content/courses)")
+    parser.add_argument('--threshold', type=float, default=0.8, help="Minimum estimated Jaccard similarity (default: 0.8)")
+    parser.add_argument('--num-perm', type=int, default=128, help="Signature length; lower saves memory on huge corpora (default: 128)")
+    parser.add_argument('--min-tokens', type=int, default=20, help="Skip documents shorter than this many tokens (default: 20)")
+    parser.add_argument('--kinds', nargs='*', choices=sorted(FAMILIES), help="Only compare these kinds of document")
+    parser.add_argument('--no-scripts', action='store_true', help="Leave scripts/ out of the comparison")
+    parser.add_argument('--cross-course', action='store_true', help="Only report clusters spanning more than one course")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="Worker processes for hashing (default: CPU count)")
+    parser.add_argument('--top', type=int, default=25, help="Clusters printed (default: 25)")
+    parser.add_argument('--json', help="Write every cluster to this JSON file")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"Error: {args.root} is not a directory.")
+        sys.exit(1)
+    if not 0 < args.threshold <= 1:
+        print("Error: --threshold must be in (0, 1].")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    extra = () if args.no_scripts else (SCRIPTS_DIR,)
+    documents = iter_documents(args.root, extra, set(args.kinds) if args.kinds else None)
+    clusters, stats = find_duplicates(documents, args.threshold, args.num_perm, args.min_tokens, args.jobs)
+    if args.cross_course:
+        clusters = [c for c in clusters if len({course_of(m['id']) for m in c['members']}) > 1]
+
+    for cluster in clusters[:args.top]:
+        print(f"{len(cluster['members'])} documents, similarity {cluster['minSimilarity']:.2f}-{cluster['maxSimilarity']:.2f}:")
+        for member in cluster['members'][:10]:
+            print(f"  {member['similarity']:.2f} [{member['kind']}] {member['id']}")
+        if len(cluster['members']) > 10:
+            print(f"  ... and {len(cluster['members']) - 10} more")
+    duplicated = sum(len(c['members']) for c in clusters)
+    print(f"{len(clusters):,} clusters covering {duplicated:,} of {stats['documents']:,} documents "
+          f"({stats['exactDuplicates']:,} exact copies, {stats['candidatePairs']:,} candidate pairs checked, "
+          f"{stats['bands']}x{stats['rows']} bands) in {time.perf_counter() - start:.1f}s")
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'threshold': args.threshold, 'stats': stats, 'clusters': clusters}, f, indent=2)
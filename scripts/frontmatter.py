@@ -0,0 +1,219 @@
+import os
+import re
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+DELIMITER = '---'
+
+_ESCAPES = {
+    '\\': '\\\\',
+    '"': '\\"',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\t': '\\t',
+    # YAML reads these as line breaks, even inside quotes
+    '\x85': '\\N',
+    '\u2028': '\\L',
+    '\u2029': '\\P',
+}
+_NEEDS_ESCAPE = re.compile(r'[\\"\x00-\x1f\x7f\x85\u2028\u2029]')
+_UNESCAPES = {
+    '\\': '\\', '"': '"', '/': '/', 'n': '\n', 'r': '\r', 't': '\t',
+    '0': '\0', 'a': '\a', 'b': '\b', 'e': '\x1b', 'f': '\f', 'v': '\v',
+    'N': '\x85', 'L': '\u2028', 'P': '\u2029', '_': '\xa0',
+}
+_ESCAPE_SEQUENCE = re.compile(r'\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|.)', re.DOTALL)
+
+def _escape_char(match):
+    char = match.group(0)
+    return _ESCAPES.get(char) or f'\\x{ord(char):02x}'
+
+def _unescape_sequence(match):
+    seq = match.group(1)
+    if len(seq) > 1:
+        return chr(int(seq[1:], 16))
+    # Files written before escaping was complete may hold a bare backslash; keep it
+    return _UNESCAPES.get(seq, match.group(0))
+
+def quote(value):
+    """Returns value as a YAML double-quoted scalar."""
+    value = str(value)
+    if _NEEDS_ESCAPE.search(value):
+        value = _NEEDS_ESCAPE.sub(_escape_char, value)
+    return f'"{value}"'
+
+def unquote(raw):
+    """Decodes a double-quoted, single-quoted or plain YAML scalar to a string."""
+    raw = raw.strip()
+    if len(raw) >= 2 and raw[0] == '"' and raw[-1] == '"':
+        inner = raw[1:-1]
+        return _ESCAPE_SEQUENCE.sub(_unescape_sequence, inner) if '\\' in inner else inner
+    if len(raw) >= 2 and raw[0] == "'" and raw[-1] == "'":
+        return raw[1:-1].replace("''", "'")
+    return raw
+
+def format_frontmatter(metadata):
+    """
+    Returns the header block for metadata as double-quoted YAML scalars,
+    including the blank line that separates it from the body. Keys with None
+    or empty values are omitted. parse_frontmatter() reverses it exactly.
+    """
+    lines = [DELIMITER]
+    for key, value in metadata.items():
+        if value is None or value == '':
+            continue
+        lines.append(f'{key}: {quote(value)}')
+    lines.append(DELIMITER)
+    return '\n'.join(lines) + '\n\n'
+
+def format_section(metadata, body):
+    return format_frontmatter(metadata) + body
+
+def _parse_header_lines(lines):
+    metadata = {}
+    for line in lines:
+        key, sep, raw = line.partition(':')
+        if sep and key.strip():
+            metadata[key.strip()] = unquote(raw)
+    return metadata
+
+def parse_frontmatter(text):
+    """
+    Splits a section file into (metadata, body). Text without a complete
+    header comes back as ({}, text).
+    """
+    if not text.startswith(DELIMITER + '\n'):
+        return {}, text
+    start = len(DELIMITER) + 1
+    # Searching from the opening delimiter's newline also finds an empty header
+    end = text.find('\n' + DELIMITER + '\n', start - 1)
+    if end < 0:
+        # The closing delimiter may be the very last line
+        if not text.endswith('\n' + DELIMITER) or len(text) < 2 * len(DELIMITER) + 1:
+            return {}, text
+        end = len(text) - len(DELIMITER) - 1
+    end += 1
+    metadata = _parse_header_lines(text[start:end].split('\n')) if end > start else {}
+    body = text[end + len(DELIMITER) + 1:]
+    if body.startswith('\n'):
+        body = body[1:]
+    return metadata, body
+
+def read_frontmatter(path):
+    """Parses only the header of a section file, without reading its body."""
+    lines = []
+    with open(path, 'r', encoding='utf-8') as f:
+        if f.readline().rstrip('\n') != DELIMITER:
+            return {}
+        for line in f:
+            line = line.rstrip('\n')
+            if line == DELIMITER:
+                return _parse_header_lines(lines)
+            lines.append(line)
+    return {}
+
+def read_section_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_frontmatter(f.read())
+
+def course_section_paths(course_dir):
+    """Returns every content/*.md section path of a split course, in course order."""
+    paths = []
+    modules_dir = os.path.join(course_dir, 'modules')
+    for module in sorted(os.listdir(modules_dir)) if os.path.isdir(modules_dir) else []:
+        lessons_dir = os.path.join(modules_dir, module, 'lessons')
+        for lesson in sorted(os.listdir(lessons_dir)) if os.path.isdir(lessons_dir) else []:
+            content_dir = os.path.join(lessons_dir, lesson, 'content')
+            if os.path.isdir(content_dir):
+                paths.extend(os.path.join(content_dir, name)
+                             for name in sorted(os.listdir(content_dir)) if name.endswith('.md'))
+    return paths
+
+def _parse_batch(task):
+    paths, header_only = task
+    if header_only:
+        return [(path, read_frontmatter(path), None) for path in paths]
+    return [(path, *read_section_file(path)) for path in paths]
+
+def parse_course_sections(course_dir, header_only=False, jobs=1, batch_size=256):
+    """
+    Parses every section of a course. Returns [(path, metadata, body)], with
+    body None when header_only. With jobs > 1 batches are parsed in worker
+    processes.
+    """
+    paths = course_section_paths(course_dir)
+    if jobs == 1:
+        return _parse_batch((paths, header_only))
+    batches = [(paths[i:i + batch_size], header_only) for i in range(0, len(paths), batch_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for batch in pool.map(_parse_batch, batches):
+            results.extend(batch)
+    return results
+
+def check_round_trip(course_dirs):
+    """
+    Re-formats every section and parses it again. Returns (files whose
+    metadata or body changed, count of files that aren't byte-identical to
+    the writer's output, e.g. hand-written unquoted values).
+    """
+    mismatches = []
+    non_canonical = 0
+    for course_dir in course_dirs:
+        for path in course_section_paths(course_dir):
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            parsed = parse_frontmatter(text)
+            formatted = format_section(*parsed)
+            if not parsed[0] or parse_frontmatter(formatted) != parsed:
+                mismatches.append(path)
+            elif formatted != text:
+                non_canonical += 1
+    return mismatches, non_canonical
+
+def run_benchmark(course_dirs, jobs, repeat):
+    print(f"{'mode':<14} {'files':>7} {'best':>10} {'files/s':>10}")
+    for label, header_only in (('full', False), ('header-only', True)):
+        best = None
+        count = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = sum(len(parse_course_sections(c, header_only, jobs)) for c in course_dirs)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{label:<14} {count:>7} {best * 1000:8.1f}ms {count / best:>10,.0f}")
+
+if __name__ == "__main__":
+    from course_tree import COURSES_ROOT, find_course_dirs
+
+    parser = argparse.ArgumentParser(description="Parse, check or benchmark the frontmatter of course section files.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    show_cmd = sub.add_parser('show', help="Print the parsed header of section files")
+    show_cmd.add_argument('paths', nargs='+')
+
+    check_cmd = sub.add_parser('check', help="Verify every section round-trips through the codec unchanged")
+    check_cmd.add_argument('courses', nargs='*')
+
+    bench_cmd = sub.add_parser('bench', help="Measure bulk parsing throughput")
+    bench_cmd.add_argument('courses', nargs='*')
+    bench_cmd.add_argument('-j', '--jobs', type=int, default=1)
+    bench_cmd.add_argument('-n', '--repeat', type=int, default=3)
+
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        for path in args.paths:
+            print(f"{path}: {read_frontmatter(path)}")
+    else:
+        course_dirs = args.courses or find_course_dirs(COURSES_ROOT)
+        if args.command == 'check':
+            mismatches, non_canonical = check_round_trip(course_dirs)
+            for path in mismatches:
+                print(f"Does not round-trip: {path}")
+            print(f"{len(mismatches)} section files do not round-trip "
+                  f"({non_canonical} parse fine but differ from the writer's formatting)")
+            sys.exit(1 if mismatches else 0)
+        run_benchmark(course_dirs, args.jobs, args.repeat)
@@ -0,0 +1,314 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from refactor_course import LANGUAGE_EXTENSIONS, slugify, split_lesson, write_file
+from course_tree import list_dirs
+
+# Size deciles (bytes) of real section and code files, measured over content/courses.
+# Sampling interpolates between deciles; --sample-from re-measures a tree instead.
+DEFAULT_PROFILE = {
+    'THEORY': [45, 317, 463, 599, 727, 850, 1010, 1184, 1406, 1983, 13477],
+    'EXAMPLE': [64, 774, 1025, 1309, 1668, 2074, 2527, 3221, 4158, 5761, 16042],
+    'KEY_POINT': [54, 534, 604, 644, 669, 695, 747, 885, 1056, 1334, 5113],
+    'WARNING': [51, 695, 822, 940, 1032, 1155, 1266, 1530, 1834, 2203, 5811],
+    'ANALOGY': [261, 569, 695, 804, 856, 962, 1041, 1169, 1423, 1838, 5813],
+    'starter': [41, 106, 190, 339, 513, 708, 884, 1119, 1359, 1928, 7015],
+    'solution': [43, 254, 432, 663, 970, 1337, 1755, 2395, 3174, 4278, 13569],
+}
+# Relative frequency of section types in the real courses
+SECTION_WEIGHTS = {'THEORY': 2920, 'EXAMPLE': 1262, 'KEY_POINT': 805, 'WARNING': 581, 'ANALOGY': 444}
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+# lesson.schema.json and module.schema.json ids are module-NN / lesson-NN-NN
+MAX_PER_LEVEL = 99
+
+WORDS = (
+    'value function loop list map key index result error type class object method return '
+    'variable string number array collection iterate condition branch module package import '
+    'async await task thread state event handler request response server client database query '
+    'record field schema test assert mock fixture build compile runtime memory cache buffer '
+    'stream file path input output format parse token scope closure lambda interface generic '
+    'pattern match guard option default config setting user account order payment invoice budget'
+).split()
+
+CODE_LINES = {
+    'py': ['{a} = {b} + {n}', 'if {a} > {n}:\n    {b} = {a} - {n}', 'for {a} in range({n}):\n    print({a}, {b})',
+           'def {a}_{b}(x):\n    return x * {n}', 'print(f"{a}: {{{b}}}")'],
+    'cs': ['var {a} = {b} + {n};', 'if ({a} > {n}) {{ {b} = {a} - {n}; }}', 'foreach (var {a} in {b}s) Console.WriteLine({a});',
+           'static int {a}{b}(int x) => x * {n};', 'Console.WriteLine($"{a}: {{{b}}}");'],
+    'java': ['int {a} = {b} + {n};', 'if ({a} > {n}) {{ {b} = {a} - {n}; }}', 'for (int {a} = 0; {a} < {n}; {a}++) System.out.println({b});',
+             'static int {a}{b}(int x) {{ return x * {n}; }}', 'System.out.println("{a}: " + {b});'],
+    'kt': ['val {a} = {b} + {n}', 'if ({a} > {n}) {b} = {a} - {n}', 'for ({a} in 0 until {n}) println({b})',
+           'fun {a}{b}(x: Int) = x * {n}', 'println("{a}: ${b}")'],
+    'js': ['const {a} = {b} + {n};', 'if ({a} > {n}) {{ {b} = {a} - {n}; }}', 'for (let {a} = 0; {a} < {n}; {a}++) console.log({b});',
+           'const {a}{b} = (x) => x * {n};', 'console.log(`{a}: ${{{b}}}`);'],
+    'dart': ['final {a} = {b} + {n};', 'if ({a} > {n}) {{ {b} = {a} - {n}; }}', 'for (var {a} = 0; {a} < {n}; {a}++) print({b});',
+             'int {a}{b}(int x) => x * {n};', "print('{a}: ${b}');"],
+}
+
+def measure_profile(courses_root):
+    """Builds a size profile (deciles per section type and code file) from a real content tree."""
+    sizes = {key: [] for key in DEFAULT_PROFILE}
+    for dirpath, dirnames, filenames in os.walk(courses_root):
+        dirnames.sort()
+        for name in filenames:
+            if name.endswith('.md') and '-' in name:
+                key = name[:-3].split('-', 1)[1].upper()
+            elif name.startswith(('starter.', 'solution.')):
+                key = name.split('.')[0]
+            else:
+                continue
+            if key in sizes:
+                sizes[key].append(os.path.getsize(os.path.join(dirpath, name)))
+    profile = {}
+    for key, values in sizes.items():
+        values.sort()
+        if not values:
+            profile[key] = DEFAULT_PROFILE[key]
+            continue
+        last = len(values) - 1
+        profile[key] = [values[round(i * last / 10)] for i in range(11)]
+    return profile
+
+def sample_size(rng, deciles):
+    position = rng.random() * 10
+    low = int(position)
+    if low >= 10:
+        return deciles[10]
+    return int(deciles[low] + (deciles[low + 1] - deciles[low]) * (position - low))
+
+def parse_range(spec):
+    """Parses '8' or '6-12' into an inclusive (low, high) pair."""
+    low, sep, high = str(spec).partition('-')
+    low = int(low)
+    high = int(high) if sep else low
+    if low < 0 or high < low:
+        raise argparse.ArgumentTypeError(f"invalid count or range: {spec}")
+    return low, high
+
+class TextSource:
+    """Slices deterministic pseudo-prose and code out of pre-built pools."""
+
+    def __init__(self, rng, file_ext):
+        self.rng = rng
+        self.prose = ' '.join(rng.choices(WORDS, k=40000))
+        templates = CODE_LINES.get(file_ext, CODE_LINES['py'])
+        self.code = '\n'.join(
+            rng.choice(templates).format(a=rng.choice(WORDS), b=rng.choice(WORDS), n=rng.randint(1, 99))
+            for _ in range(4000)
+        ) + '\n'
+
+    def _slice(self, pool, size):
+        size = max(1, min(size, len(pool)))
+        start = self.rng.randrange(0, len(pool) - size + 1)
+        return pool[start:start + size]
+
+    def words(self, count):
+        return ' '.join(self.rng.choices(WORDS, k=count))
+
+    def title(self):
+        return self.words(self.rng.randint(2, 5)).title()
+
+    def sentence(self, size):
+        text = self._slice(self.prose, size).strip()
+        return text[:1].upper() + text[1:] + '.'
+
+    def markdown(self, size, lang_id, with_code):
+        """Markdown of roughly size characters with headings, lists and an optional code fence."""
+        parts = []
+        remaining = size
+        code_size = remaining // 2 if with_code else 0
+        remaining -= code_size
+        while remaining > 0:
+            kind = self.rng.random()
+            if kind < 0.15:
+                chunk = f"### {self.title()}"
+            elif kind < 0.35:
+                chunk = '\n'.join(f"- {self.sentence(self.rng.randint(20, 60))}" for _ in range(self.rng.randint(2, 5)))
+            else:
+                chunk = self.sentence(min(remaining, self.rng.randint(80, 400)))
+            parts.append(chunk)
+            remaining -= len(chunk) + 2
+        if code_size:
+            parts.insert(len(parts) // 2 + 1, f"```{lang_id}\n{self._slice(self.code, code_size).strip()}\n```")
+        return '\n\n'.join(parts)
+
+    def code_block(self, size):
+        return self._slice(self.code, size).strip() + '\n'
+
+def generate_lesson(text, rng, profile, lang_id, mod_index, lesson_index, counts):
+    """Returns one lesson dict in monolithic course.json shape."""
+    sections_range, challenges_range = counts
+    section_types = list(SECTION_WEIGHTS)
+    weights = list(SECTION_WEIGHTS.values())
+    lesson = {
+        'id': f"lesson-{mod_index:02d}-{lesson_index:02d}",
+        'title': f"{text.title()} {lesson_index}",
+        'moduleId': f"module-{mod_index:02d}",
+        'order': lesson_index,
+        'estimatedMinutes': rng.randint(10, 60),
+        'difficulty': rng.choice(DIFFICULTIES),
+    }
+    sections = []
+    for _ in range(rng.randint(*sections_range)):
+        section_type = rng.choices(section_types, weights)[0]
+        sections.append({
+            'type': section_type,
+            'title': text.title(),
+            'content': text.markdown(sample_size(rng, profile[section_type]), lang_id, section_type == 'EXAMPLE'),
+        })
+    lesson['contentSections'] = sections
+
+    challenges = []
+    for chal_index in range(1, rng.randint(*challenges_range) + 1):
+        description = text.sentence(rng.randint(120, 600))
+        challenges.append({
+            'type': 'FREE_CODING',
+            'id': f"module-{mod_index:02d}-lesson-{lesson_index:02d}-challenge-{chal_index}",
+            'title': f"{text.title()} {chal_index}",
+            'description': description,
+            'instructions': description,
+            'language': lang_id,
+            'testCases': [{
+                'id': f"test-{n}",
+                'description': text.sentence(40),
+                'expectedOutput': text.words(rng.randint(1, 6)),
+                'isVisible': n == 1,
+            } for n in range(1, rng.randint(1, 3) + 1)],
+            'hints': [{'level': n, 'text': text.sentence(rng.randint(60, 200))} for n in range(1, rng.randint(1, 3) + 1)],
+            'commonMistakes': [{
+                'mistake': text.sentence(40),
+                'consequence': text.sentence(30),
+                'correction': text.sentence(40),
+            }],
+            'difficulty': lesson['difficulty'],
+            'starterCode': text.code_block(sample_size(rng, profile['starter'])),
+            'solution': text.code_block(sample_size(rng, profile['solution'])),
+        })
+    lesson['challenges'] = challenges
+    return lesson
+
+def generate_module(task):
+    """
+    Worker: generates one module. Every module has its own RNG seeded from
+    (seed, course, module), so output doesn't depend on worker count or order.
+    Returns (module dict, lessons).
+    """
+    seed, course_index, mod_index, lang_id, profile, counts = task
+    rng = random.Random(f"{seed}:{course_index}:{mod_index}")
+    text = TextSource(rng, LANGUAGE_EXTENSIONS.get(lang_id, 'txt'))
+    lessons_range, sections_range, challenges_range = counts
+    module = {
+        'id': f"module-{mod_index:02d}",
+        'title': f"{text.title()} {mod_index}",
+        'description': text.sentence(rng.randint(60, 200)),
+        'difficulty': rng.choice(DIFFICULTIES),
+        'estimatedHours': rng.randint(1, 12),
+        'order': mod_index,
+    }
+    lessons = [generate_lesson(text, rng, profile, lang_id, mod_index, lesson_index, (sections_range, challenges_range))
+               for lesson_index in range(1, rng.randint(*lessons_range) + 1)]
+    return module, lessons
+
+class PlainOutputs:
+    """Output sink for refactor_course.split_lesson() that writes unconditionally and counts files."""
+
+    def __init__(self):
+        self.written = 0
+
+    def write_file(self, path, content):
+        write_file(path, content)
+        self.written += 1
+
+    def write_json(self, path, data):
+        self.write_file(path, json.dumps(data, indent=2, ensure_ascii=False))
+
+def write_module_tree(task):
+    """Worker: generates a module and writes it in the split layout. Returns files written."""
+    course_dir, lang_id = task[0], task[1][3]
+    module, lessons = generate_module(task[1])
+    outputs = PlainOutputs()
+    mod_dir = os.path.join(course_dir, 'modules', f"{module['order']:02d}-{slugify(module['title'])}")
+    file_ext = LANGUAGE_EXTENSIONS.get(lang_id, 'txt')
+    for lesson in lessons:
+        lesson_dir = os.path.join(mod_dir, 'lessons', f"{lesson['order']:02d}-{slugify(lesson['title'])}")
+        split_lesson(lesson_dir, lesson, lang_id, file_ext, outputs)
+    outputs.write_json(os.path.join(mod_dir, 'module.json'), module)
+    return outputs.written
+
+def serialize_module(task):
+    """Worker: generates a module and returns it as compact JSON with its lessons."""
+    module, lessons = generate_module(task)
+    module['lessons'] = lessons
+    return json.dumps(module, ensure_ascii=False)
+
+def course_metadata(seed, course_index, lang_id, module_count):
+    rng = random.Random(f"{seed}:{course_index}")
+    return {
+        'id': f"synthetic-{course_index:02d}",
+        'language': lang_id,
+        'title': f"Synthetic Course {course_index}",
+        'description': f"Generated load-testing course {course_index} (seed {seed}).",
+        'difficulty': 'beginner-to-advanced',
+        'estimatedHours': max(1, module_count * rng.randint(2, 6)),
+        'prerequisites': [],
+        'totalModules': max(1, module_count),
+    }
+
+def generate(out_dir, courses, modules, counts, lang_id, seed, profile, fmt, jobs):
+    """Writes the requested synthetic courses under out_dir. Returns files written."""
+    files = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for course_index in range(1, courses + 1):
+            course_dir = os.path.join(out_dir, f"synthetic-{course_index:02d}")
+            metadata = course_metadata(seed, course_index, lang_id, modules)
+            tasks = [(seed, course_index, mod_index, lang_id, profile, counts) for mod_index in range(1, modules + 1)]
+            if fmt in ('tree', 'both'):
+                files += sum(pool.map(write_module_tree, [(course_dir, task) for task in tasks]))
+                write_file(os.path.join(course_dir, 'course.json'), json.dumps(metadata, indent=2, ensure_ascii=False))
+                files += 1
+            if fmt in ('json', 'both'):
+                # Alongside a tree the monolith is kept as course.source.json (see refactor_course.py --source)
+                name = 'course.source.json' if fmt == 'both' else 'course.json'
+                os.makedirs(course_dir, exist_ok=True)
+                with open(os.path.join(course_dir, name), 'w', encoding='utf-8') as f:
+                    f.write(json.dumps(metadata, ensure_ascii=False)[:-1] + ', "modules": [')
+                    for i, module_json in enumerate(pool.map(serialize_module, tasks)):
+                        f.write((', ' if i else '') + module_json)
+                    f.write(']}')
+                files += 1
+            print(f"Generated {course_dir}")
+    return files
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic courses for load-testing the content tooling.")
+    parser.add_argument('out_dir', help="Directory to create synthetic-NN course directories in")
+    parser.add_argument('--courses', type=int, default=1, help="Number of courses (default: 1)")
+    parser.add_argument('--modules', type=int, default=12, help=f"Modules per course (max {MAX_PER_LEVEL}, default: 12)")
+    parser.add_argument('--lessons', type=parse_range, default=(6, 10), help=f"Lessons per module, N or MIN-MAX (max {MAX_PER_LEVEL}, default: 6-10)")
+    parser.add_argument('--sections', type=parse_range, default=(5, 12), help="Content sections per lesson (default: 5-12)")
+    parser.add_argument('--challenges', type=parse_range, default=(0, 2), help="Challenges per lesson (default: 0-2)")
+    parser.add_argument('--language', default='python', choices=sorted(LANGUAGE_EXTENSIONS))
+    parser.add_argument('--format', default='tree', choices=['tree', 'json', 'both'], help="Split tree, monolithic course.json, or both")
+    parser.add_argument('--seed', default='0')
+    parser.add_argument('--sample-from', help="Measure section/code sizes from this content tree instead of the built-in profile")
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    args = parser.parse_args()
+
+    if not 1 <= args.modules <= MAX_PER_LEVEL or args.lessons[1] > MAX_PER_LEVEL or args.lessons[0] < 1:
+        print(f"Error: module and lesson counts must be between 1 and {MAX_PER_LEVEL} to keep ids schema-valid; use --courses to scale further.")
+        sys.exit(1)
+    if any(name.startswith('synthetic-') for name in list_dirs(args.out_dir)):
+        print(f"Warning: {args.out_dir} already contains synthetic courses; files will be overwritten.")
+
+    profile = measure_profile(args.sample_from) if args.sample_from else DEFAULT_PROFILE
+    start = time.perf_counter()
+    files = generate(args.out_dir, args.courses, args.modules,
+                     (args.lessons, args.sections, args.challenges),
+                     args.language, args.seed, profile, args.format, args.jobs)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {files:,} files in {elapsed:.1f}s ({files / elapsed:,.0f} files/s)")
@@ -0,0 +1,382 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from course_tree import read_json
+from run_solutions import DEFAULT_ROOT, SandboxConfig, find_solutions, run_solution_streaming
+
+# Languages the sandbox can execute
+RUNNABLE_LANGUAGES = {'python'}
+
+NUMBER = r'[-+]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?'
+_NUMBER_RE = re.compile(NUMBER)
+_NUMBER_CHARS = '0123456789.eE+-'
+_LAST_SPACE_RE = re.compile(r'\s\S*\Z')
+
+class GradeOptions:
+    """How output is compared against testCases[].expectedOutput."""
+
+    def __init__(self, mode='contains', whitespace='trim', ignore_case=False, float_tolerance=None,
+                 fail_fast=False, visible_only=False, max_output=1024 * 1024):
+        # contains: expected text appears anywhere in the output, as the app grades.
+        # exact: the whole output equals it.
+        self.mode = mode
+        # exact: compare as-is; trim: ignore trailing whitespace on each line and
+        # around the whole text; collapse: treat any whitespace run as one space
+        self.whitespace = whitespace
+        self.ignore_case = ignore_case
+        self.float_tolerance = float_tolerance
+        self.fail_fast = fail_fast
+        self.visible_only = visible_only
+        self.max_output = max_output
+
+    def normalize(self, text):
+        text = text.replace('\r\n', '\n')
+        if self.whitespace == 'trim':
+            text = '\n'.join(line.rstrip() for line in text.split('\n')).strip()
+        elif self.whitespace == 'collapse':
+            text = ' '.join(text.split())
+        return text.lower() if self.ignore_case else text
+
+def numbers_close(actual, expected, tolerance):
+    a, b = float(actual), float(expected)
+    return abs(a - b) <= tolerance * max(1.0, abs(b))
+
+class OutputCheck:
+    """Tracks one test case against a growing output. status is None until decided."""
+
+    def __init__(self, test_case, options):
+        self.test_case = test_case
+        self.options = options
+        self.expected = options.normalize(test_case.get('expectedOutput') or '')
+        self.status = None
+        self.detail = ''
+        self.pattern = None
+        self.numbers = []
+        # What feed() has seen: the tail a contains-mode match could still
+        # start in, and how much of the expected text exact mode has matched
+        self.window = ''
+        self.matched = 0
+        self.separator = ' ' if options.whitespace == 'collapse' else '\n'
+        self.separators = self.expected.count(self.separator)
+        if options.float_tolerance is not None and _NUMBER_RE.search(self.expected):
+            # Numbers match any number; their values are checked separately
+            parts = []
+            position = 0
+            for match in _NUMBER_RE.finditer(self.expected):
+                parts.append(re.escape(self.expected[position:match.start()]))
+                parts.append(f'({NUMBER})')
+                self.numbers.append(match.group(0))
+                position = match.end()
+            parts.append(re.escape(self.expected[position:]))
+            self.pattern = re.compile(''.join(parts))
+
+    def _found(self, text):
+        if self.pattern is None:
+            return self.expected in text
+        # Matches may overlap: one whose numbers are off mustn't hide the next
+        position = 0
+        while True:
+            match = self.pattern.search(text, position)
+            if match is None:
+                return False
+            if all(numbers_close(a, e, self.options.float_tolerance) for a, e in zip(match.groups(), self.numbers)):
+                return True
+            position = match.start() + 1
+
+    def _equal(self, text):
+        if self.pattern is None:
+            return text == self.expected
+        match = self.pattern.fullmatch(text)
+        return bool(match) and all(numbers_close(a, e, self.options.float_tolerance)
+                                   for a, e in zip(match.groups(), self.numbers))
+
+    def feed(self, text):
+        """
+        Checks the next stretch of stable output from OutputStream.feed().
+        Only a contains-mode pass or an exact-mode mismatch can be decided
+        this early. Just the part of the output a later match could still
+        start in is kept, so each stretch is looked at a bounded number of
+        times.
+        """
+        if self.status is not None or not self.expected or not text:
+            return
+        if self.options.mode == 'contains':
+            window = self.window + text
+            # More output could still lengthen a number at the very end
+            searchable = window if self.pattern is None else window.rstrip(_NUMBER_CHARS)
+            if self._found(searchable):
+                self.status = 'passed'
+            else:
+                self.window = self._tail(window)
+        elif self.pattern is None:
+            # Exact mode can fail as soon as the output stops being a prefix
+            end = self.matched + len(text)
+            if self.expected[self.matched:end] != text:
+                self.status, self.detail = 'failed', f"output differs from {self.expected[:200]!r}"
+            self.matched = end
+
+    def _tail(self, window):
+        # A match never spans more separators than the expected text holds,
+        # since the number pattern doesn't match whitespace
+        start = len(window)
+        for _ in range(self.separators + 1):
+            start = window.rfind(self.separator, 0, start)
+            if start < 0:
+                break
+        start += 1
+        if self.pattern is None:
+            start = max(start, len(window) - len(self.expected) + 1)
+        return window[start:]
+
+    def finish(self, text):
+        """Decides against the whole normalized output of a clean run."""
+        if self.status is not None:
+            return
+        if not self.expected:
+            # No expected output: the test only asks for a clean run
+            self.status = 'passed'
+        elif self.options.mode == 'contains':
+            if self._found(text):
+                self.status = 'passed'
+            else:
+                self.status, self.detail = 'failed', f"output does not contain {self.expected[:200]!r}"
+        elif self._equal(text):
+            self.status = 'passed'
+        else:
+            self.status, self.detail = 'failed', f"output differs from {self.expected[:200]!r}"
+
+class OutputStream:
+    """
+    Normalizes output as it arrives. feed() returns only text whose
+    normalized form later output can't change (whole lines, or whole words
+    when collapsing whitespace), so everything it returns adds up to a prefix
+    of options.normalize() of the full output.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.pending = []
+        self.started = False
+        self.blank_lines = 0
+
+    def feed(self, text):
+        whitespace = self.options.whitespace
+        if whitespace == 'trim':
+            cut = text.rfind('\n') + 1
+        elif whitespace == 'collapse':
+            match = _LAST_SPACE_RE.search(text)
+            cut = match.start() if match else 0
+        else:
+            # Hold back a '\r' that may turn out to start a '\r\n'
+            cut = len(text) - text.endswith('\r')
+        if cut <= 0:
+            self.pending.append(text)
+            return ''
+        stable = ''.join(self.pending) + text[:cut]
+        self.pending = [text[cut:]]
+        if whitespace == 'trim':
+            out = []
+            for line in stable.replace('\r\n', '\n').split('\n')[:-1]:
+                line = line.rstrip()
+                if not line:
+                    # Blank lines only count once something follows them
+                    self.blank_lines += self.started
+                    continue
+                if self.started:
+                    out.append('\n' * (self.blank_lines + 1))
+                else:
+                    line = line.lstrip()
+                out.append(line)
+                self.started = True
+                self.blank_lines = 0
+            stable = ''.join(out)
+        elif whitespace == 'collapse':
+            words = stable.split()
+            stable = (' ' if self.started and words else '') + ' '.join(words)
+            self.started = self.started or bool(words)
+        else:
+            stable = stable.replace('\r\n', '\n')
+        return stable.lower() if self.options.ignore_case else stable
+
+def challenge_tests(challenge, options):
+    tests = [t for t in challenge.get('testCases') or [] if isinstance(t, dict)]
+    if options.visible_only:
+        tests = [t for t in tests if t.get('isVisible', True)]
+    return tests
+
+def grade_submission(source_path, challenge, options, config):
+    """
+    Runs a submission once per distinct test input, streaming its stdout into
+    every test case that uses that input. Returns a list of per-test verdicts
+    in testCases order.
+    """
+    tests = challenge_tests(challenge, options)
+    groups = {}
+    for test in tests:
+        groups.setdefault(test.get('input'), []).append(test)
+
+    verdicts = {}
+    failed = False
+    for stdin_data, group in groups.items():
+        checks = [OutputCheck(test, options) for test in group]
+        if failed and options.fail_fast:
+            for check in checks:
+                check.status, check.detail = 'skipped', 'an earlier test failed'
+        else:
+            output = []
+            stream = OutputStream(options)
+            size = 0
+            overflow = False
+
+            def consume(text):
+                nonlocal size, overflow
+                output.append(text)
+                size += len(text)
+                if size > options.max_output:
+                    overflow = True
+                    return False
+                stable = stream.feed(text)
+                for check in checks:
+                    check.feed(stable)
+                # Only an exact-mode mismatch is known before the run ends
+                return not (options.fail_fast and any(c.status == 'failed' for c in checks))
+
+            result = run_solution_streaming(source_path, config, consume, stdin_data)
+            normalized = options.normalize(''.join(output))
+            for check in checks:
+                if check.status is not None:
+                    continue
+                if overflow:
+                    check.status, check.detail = 'failed', f"more than {options.max_output:,} characters of output"
+                elif result['status'] == 'stopped':
+                    check.status, check.detail = 'skipped', 'an earlier test failed'
+                elif result['status'] == 'timeout':
+                    check.status, check.detail = 'timeout', result['detail']
+                elif result['returncode'] != 0:
+                    check.status, check.detail = 'error', result['detail']
+                else:
+                    check.finish(normalized)
+        for check in checks:
+            failed = failed or check.status != 'passed'
+            verdicts[id(check.test_case)] = {
+                'id': check.test_case.get('id'),
+                'description': check.test_case.get('description', ''),
+                'visible': check.test_case.get('isVisible', True),
+                'status': check.status,
+                'detail': check.detail,
+            }
+    return [verdicts[id(test)] for test in tests]
+
+# Per-process grading state, set up once by init_worker()
+_state = {}
+
+def init_worker(options, config):
+    _state['options'] = options
+    _state['config'] = config
+    _state['challenges'] = {}
+
+def grade_task(task):
+    """Worker: grades one (submission id, challenge dir, source path) submission."""
+    submission_id, challenge_dir, source_path = task
+    challenges = _state['challenges']
+    if challenge_dir not in challenges:
+        challenges[challenge_dir] = read_json(os.path.join(challenge_dir, 'challenge.json'))
+    challenge = challenges[challenge_dir]
+    start = time.perf_counter()
+    language = (challenge.get('language') or 'python').lower()
+    if language not in RUNNABLE_LANGUAGES:
+        tests, status = [], 'unsupported-language'
+    else:
+        tests = grade_submission(source_path, challenge, _state['options'], _state['config'])
+        status = 'passed' if all(t['status'] == 'passed' for t in tests) else 'failed'
+    return {
+        'submission': submission_id,
+        'challenge': challenge.get('id', challenge_dir),
+        'status': status,
+        'passed': sum(1 for t in tests if t['status'] == 'passed'),
+        'total': len(tests),
+        'seconds': round(time.perf_counter() - start, 4),
+        'tests': tests,
+    }
+
+def grade_batch(tasks, options, config, jobs=None):
+    """Grades many submissions over a process pool. Yields results in task order."""
+    if jobs == 1:
+        init_worker(options, config)
+        yield from map(grade_task, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(options, config)) as pool:
+        yield from pool.map(grade_task, tasks, chunksize=8)
+
+def read_manifest(path):
+    """Reads {"id", "challenge", "path"} lines; relative paths are relative to the manifest."""
+    base = os.path.dirname(os.path.abspath(path))
+    tasks = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            tasks.append((entry.get('id', str(line_no)),
+                          os.path.join(base, entry['challenge']),
+                          os.path.join(base, entry['path'])))
+    return tasks
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grade submissions against the testCases of their challenge.json.")
+    parser.add_argument('challenge', nargs='?', help="Challenge directory the submissions answer")
+    parser.add_argument('submissions', nargs='*', help="Submission source files")
+    parser.add_argument('--manifest', help='JSONL of {"id", "challenge", "path"} submissions to grade')
+    parser.add_argument('--solutions', metavar='ROOT', nargs='?', const=DEFAULT_ROOT,
+                        help="Grade every challenge's own solution.py below ROOT (default: the Python course)")
+    parser.add_argument('--mode', choices=['contains', 'exact'], default='contains')
+    parser.add_argument('--whitespace', choices=['exact', 'trim', 'collapse'], default='trim')
+    parser.add_argument('--ignore-case', action='store_true')
+    parser.add_argument('--float-tolerance', type=float, default=None, help="Relative tolerance for numbers in expected output")
+    parser.add_argument('--fail-fast', action='store_true', help="Stop grading a submission at its first failing test")
+    parser.add_argument('--visible-only', action='store_true', help="Grade only isVisible tests, as the app does")
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--memory', type=int, default=512)
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    parser.add_argument('--jsonl', help="Write one result per line to this path")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Print every test verdict")
+    args = parser.parse_args()
+
+    if args.manifest:
+        tasks = read_manifest(args.manifest)
+    elif args.solutions:
+        tasks = [(rel_dir, os.path.dirname(path), path) for rel_dir, path in find_solutions(args.solutions)]
+    elif args.challenge and args.submissions:
+        tasks = [(path, args.challenge, path) for path in args.submissions]
+    else:
+        parser.error("give a challenge directory and submissions, --manifest or --solutions")
+
+    options = GradeOptions(args.mode, args.whitespace, args.ignore_case, args.float_tolerance,
+                           args.fail_fast, args.visible_only)
+    config = SandboxConfig(args.timeout, args.memory)
+    start = time.perf_counter()
+    counts = {}
+    out = open(args.jsonl, 'w', encoding='utf-8') if args.jsonl else None
+    try:
+        for result in grade_batch(tasks, options, config, args.jobs):
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+            if out:
+                out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            if result['status'] != 'passed' or args.verbose:
+                print(f"{result['status']:<20} {result['passed']}/{result['total']} {result['submission']}")
+                for test in result['tests']:
+                    if test['status'] != 'passed' or args.verbose:
+                        print(f"    {test['status']:<8} {test['id']}: {test['detail'] or test['description']}")
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"Graded {total:,} submissions in {elapsed:.1f}s ({total / elapsed * 60 if elapsed else 0:,.0f}/min): "
+          + ', '.join(f"{count} {status}" for status, count in sorted(counts.items())))
+    sys.exit(1 if counts.get('failed') else 0)
@@ -0,0 +1,391 @@
+import os
+import sys
+import json
+import mmap
+import time
+import hashlib
+import argparse
+import tempfile
+from array import array
+
+import pygments
+from pygments import token
+from pygments.lexers import find_lexer_class_by_name, find_lexer_class_for_filename
+from pygments.util import ClassNotFound
+
+from check_fences import extract_fences
+from course_tree import (
+    COURSES_ROOT, find_course_dirs, iter_course_lessons, list_dirs, list_files, pool_map, read_json, read_text,
+)
+
+DEFAULT_CACHE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'build', 'highlight'))
+# Bump when tokenizing or the class table changes to invalidate cached streams
+CACHE_VERSION = 1
+
+# Token classes the renderer colors, by id. Id 0 is never stored: text
+# between tokens keeps the default foreground.
+CLASSES = ('text', 'keyword', 'type', 'string', 'comment', 'number', 'function', 'punctuation',
+           'operator', 'name', 'builtin', 'decorator', 'error')
+CLASS_IDS = {name: i for i, name in enumerate(CLASSES)}
+
+# Most specific Pygments token type first; a token takes the class of its
+# nearest listed ancestor
+TOKEN_CLASSES = {
+    token.Keyword.Type: 'type',
+    token.Keyword: 'keyword',
+    token.Operator.Word: 'keyword',
+    token.Operator: 'operator',
+    token.Name.Class: 'type',
+    token.Name.Namespace: 'type',
+    token.Name.Function: 'function',
+    token.Name.Decorator: 'decorator',
+    token.Name.Builtin: 'builtin',
+    token.Name: 'name',
+    token.Literal.String: 'string',
+    token.Literal.Number: 'number',
+    token.Literal: 'string',
+    token.Comment: 'comment',
+    token.Punctuation: 'punctuation',
+    token.Error: 'error',
+}
+
+# Fence info strings Pygments doesn't know under that name
+LEXER_ALIASES = {
+    'flutter': 'dart',
+    'c#': 'csharp',
+    'node': 'javascript',
+    'sh': 'bash',
+    'shell': 'bash',
+}
+
+_class_cache = {}
+
+def token_class(ttype):
+    """Class id of a Pygments token type; 0 for text and whitespace."""
+    class_id = _class_cache.get(ttype)
+    if class_id is None:
+        t = ttype
+        while t not in TOKEN_CLASSES and t.parent is not None:
+            t = t.parent
+        class_id = _class_cache[ttype] = CLASS_IDS[TOKEN_CLASSES.get(t, 'text')]
+    return class_id
+
+_lexer_classes = {}
+_lexers = {}
+
+def lexer_class(name=None, filename=None):
+    """
+    The Pygments lexer class for a fence language or a file name, or None.
+    Only the class is looked up; building a lexer compiles its rules, which
+    is left to the blocks that actually need lexing.
+    """
+    key = name or os.path.splitext(filename)[1]
+    if key not in _lexer_classes:
+        try:
+            if name:
+                cls = find_lexer_class_by_name(LEXER_ALIASES.get(name, name))
+            else:
+                cls = find_lexer_class_for_filename(filename)
+        except ClassNotFound:
+            cls = None
+        _lexer_classes[key] = cls
+    return _lexer_classes[key]
+
+def lexer_for(name):
+    """A cached lexer instance for a lexer name."""
+    lexer = _lexers.get(name)
+    if lexer is None:
+        lexer = _lexers[name] = lexer_class(name)()
+    return lexer
+
+def tokenize(lexer, source):
+    """
+    Lexes source into (offsets, lengths, class ids) arrays. Offsets and
+    lengths count UTF-16 code units, the unit the desktop app's text editor
+    indexes by. Text tokens are dropped and adjacent tokens of the same class
+    merged, so a stream holds only what gets colored.
+    """
+    offsets = array('I')
+    lengths = array('I')
+    classes = array('B')
+    # Pygments' own preprocessing would shift offsets; lex the text as-is, with
+    # the trailing newline some lexers' rules expect
+    text = source if source.endswith('\n') else source + '\n'
+    ascii_only = text.isascii()
+    position = 0
+    end = 0
+    for _, ttype, value in lexer.get_tokens_unprocessed(text):
+        width = len(value) if ascii_only else len(value.encode('utf-16-le')) // 2
+        class_id = token_class(ttype)
+        if class_id:
+            if classes and classes[-1] == class_id and end == position:
+                lengths[-1] += width
+            else:
+                offsets.append(position)
+                lengths.append(width)
+                classes.append(class_id)
+            end = position + width
+        position += width
+    # Drop what lexing the added newline produced
+    limit = len(source) if ascii_only else len(source.encode('utf-16-le')) // 2
+    while offsets and offsets[-1] >= limit:
+        offsets.pop()
+        lengths.pop()
+        classes.pop()
+    if offsets and offsets[-1] + lengths[-1] > limit:
+        lengths[-1] = limit - offsets[-1]
+    return offsets, lengths, classes
+
+def pack(offsets, lengths, classes):
+    """A stream's bytes: every offset, then every length (uint32), then every class id (uint8)."""
+    return offsets.tobytes() + lengths.tobytes() + classes.tobytes()
+
+def unpack(data, count):
+    offsets = array('I')
+    offsets.frombytes(data[:count * 4])
+    lengths = array('I')
+    lengths.frombytes(data[count * 4:count * 8])
+    classes = array('B')
+    classes.frombytes(data[count * 8:count * 9])
+    return offsets, lengths, classes
+
+def block_key(lexer_name, source):
+    return hashlib.sha256(f"{lexer_name}\0{source}".encode('utf-8')).hexdigest()[:32]
+
+def tokenize_task(task):
+    """Worker: (key, lexer name, source) -> (key, token count, packed stream)."""
+    key, lexer_name, source = task
+    offsets, lengths, classes = tokenize(lexer_for(lexer_name), source)
+    return key, len(offsets), pack(offsets, lengths, classes)
+
+def lesson_blocks(courses_root, lesson_dir, default_language):
+    """
+    Yields (entry, lexer name, source) for every code fence in a lesson's
+    sections and every starter/solution file of its challenges. The entry
+    says where the block is: {'file', 'fence', 'line', 'language'}.
+    """
+    rel_dir = os.path.relpath(lesson_dir, courses_root).replace(os.sep, '/')
+    content_dir = os.path.join(lesson_dir, 'content')
+    for name in list_files(content_dir, '.md'):
+        text = read_text(os.path.join(content_dir, name))
+        if '```' not in text and '~~~' not in text:
+            continue
+        for fence, (line, info, source) in enumerate(extract_fences(text)):
+            language = info or default_language
+            if not language or lexer_class(language) is None or not source.strip():
+                continue
+            yield ({'file': f'{rel_dir}/content/{name}', 'fence': fence, 'line': line, 'language': language},
+                   LEXER_ALIASES.get(language, language), source)
+    challenges_dir = os.path.join(lesson_dir, 'challenges')
+    for challenge in list_dirs(challenges_dir):
+        for name in list_files(os.path.join(challenges_dir, challenge)):
+            if not name.startswith(('starter.', 'solution.')):
+                continue
+            cls = lexer_class(filename=name)
+            if cls is None:
+                continue
+            source = read_text(os.path.join(challenges_dir, challenge, name))
+            if source.strip():
+                yield ({'file': f'{rel_dir}/challenges/{challenge}/{name}', 'fence': None, 'line': 1,
+                        'language': cls.aliases[0]}, cls.aliases[0], source)
+
+def cache_version():
+    """Cached streams are only valid for the same class table and Pygments release."""
+    return f"{CACHE_VERSION}/{pygments.__version__}"
+
+class TokenCache:
+    """
+    Read side of the cache: lesson lookups return the pre-lexed streams of
+    every block in the lesson, sliced out of a memory-mapped token file.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        with open(os.path.join(cache_dir, 'index.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != cache_version():
+            raise ValueError(f"highlight cache in {cache_dir} is from another version; rebuild it")
+        self.classes = index['classes']
+        self.blocks = index['blocks']
+        self.lessons = index['lessons']
+        self._file = open(os.path.join(cache_dir, index['tokens']), 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.blocks else None
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def raw(self, key):
+        offset, count = self.blocks[key]
+        return self._map[offset:offset + count * 9], count
+
+    def stream(self, key):
+        """(offsets, lengths, class ids) of one block."""
+        return unpack(*self.raw(key))
+
+    def lesson(self, lesson_path):
+        """[(entry, (offsets, lengths, class ids))] for a lesson path like 'python/modules/.../lessons/01-x'."""
+        return [(entry, self.stream(entry['key'])) for entry in self.lessons.get(lesson_path, [])]
+
+def load_previous(cache_dir):
+    """The existing cache, or None if there's none this version can reuse."""
+    try:
+        cache = TokenCache(cache_dir)
+    except (OSError, ValueError, KeyError):
+        return None
+    return cache
+
+def build_cache(courses_root=COURSES_ROOT, cache_dir=DEFAULT_CACHE_DIR, jobs=None, force=False, quiet=False):
+    """
+    Tokenizes every code fence and starter/solution file below courses_root
+    into the cache. Streams are keyed by a hash of the lexer and the source,
+    so a block that is unchanged, or repeated elsewhere, is lexed once.
+    Returns counts of blocks, distinct streams, streams lexed and tokens.
+    """
+    start = time.perf_counter()
+    os.makedirs(cache_dir, exist_ok=True)
+    previous = None if force else load_previous(cache_dir)
+
+    lessons = {}
+    sources = {}
+    blocks = 0
+    for course_dir in find_course_dirs(courses_root):
+        default_language = read_json(os.path.join(course_dir, 'course.json')).get('language', '').lower()
+        for _, lesson_dir in iter_course_lessons(course_dir):
+            entries = []
+            for entry, lexer_name, source in lesson_blocks(courses_root, lesson_dir, default_language):
+                key = block_key(lexer_name, source)
+                entry['key'] = key
+                entries.append(entry)
+                if key not in sources:
+                    sources[key] = (lexer_name, source)
+                blocks += 1
+            if entries:
+                lessons[os.path.relpath(lesson_dir, courses_root).replace(os.sep, '/')] = entries
+
+    packed = {}
+    pending = []
+    for key, (lexer_name, source) in sources.items():
+        if previous is not None and key in previous.blocks:
+            data, count = previous.raw(key)
+            packed[key] = (count, data)
+        else:
+            pending.append((key, lexer_name, source))
+    unchanged = previous is not None and not pending and previous.lessons == lessons and len(previous.blocks) == len(packed)
+    if previous is not None:
+        previous.close()
+    if unchanged:
+        if not quiet:
+            print(f"Highlight cache up to date ({blocks:,} blocks in {len(lessons):,} lessons, "
+                  f"{time.perf_counter() - start:.2f}s)")
+        return {'blocks': blocks, 'streams': len(packed), 'lexed': 0, 'tokens': sum(c for c, _ in packed.values()),
+                'bytes': sum(len(d) for _, d in packed.values()), 'seconds': time.perf_counter() - start}
+
+    for key, count, data in pool_map(tokenize_task, pending, jobs):
+        packed[key] = (count, data)
+
+    # The index names the token file it was written with, so readers never
+    # pair an index with another build's tokens
+    digest = hashlib.sha256()
+    index_blocks = {}
+    tokens = 0
+    tmp_path = os.path.join(cache_dir, 'tokens.bin.tmp')
+    with open(tmp_path, 'wb') as f:
+        offset = 0
+        for key in sorted(packed):
+            count, data = packed[key]
+            f.write(data)
+            digest.update(data)
+            index_blocks[key] = [offset, count]
+            offset += len(data)
+            tokens += count
+    tokens_name = f'tokens-{digest.hexdigest()[:16]}.bin'
+    os.replace(tmp_path, os.path.join(cache_dir, tokens_name))
+
+    index_path = os.path.join(cache_dir, 'index.json')
+    with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'version': cache_version(), 'classes': list(CLASSES), 'tokens': tokens_name,
+                   'blocks': index_blocks, 'lessons': lessons}, f, separators=(',', ':'))
+    os.replace(index_path + '.tmp', index_path)
+    for name in os.listdir(cache_dir):
+        if name.startswith('tokens-') and name != tokens_name:
+            os.remove(os.path.join(cache_dir, name))
+
+    counts = {'blocks': blocks, 'streams': len(packed), 'lexed': len(pending), 'tokens': tokens,
+              'bytes': offset, 'seconds': time.perf_counter() - start}
+    if not quiet:
+        print(f"Cached {counts['blocks']:,} blocks in {len(lessons):,} lessons as {counts['streams']:,} streams "
+              f"({counts['lexed']:,} lexed, {counts['streams'] - counts['lexed']:,} reused), "
+              f"{tokens:,} tokens in {offset / 1024:.0f} KB, {counts['seconds']:.2f}s")
+    return counts
+
+def run_benchmark(courses_root, jobs, repeat):
+    """Cold and no-op build times, then per-lesson lookup from the cache against lexing at view time."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = build_cache(courses_root, cache_dir, jobs, force=True, quiet=True)
+        warm = build_cache(courses_root, cache_dir, jobs, quiet=True)
+        print(f"build: cold {cold['seconds']:.2f}s ({cold['lexed']:,} streams lexed), "
+              f"no-op {warm['seconds']:.2f}s; {cold['tokens']:,} tokens, {cold['bytes'] / 1024:.0f} KB")
+
+        start = time.perf_counter()
+        cache = TokenCache(cache_dir)
+        print(f"open:  {(time.perf_counter() - start) * 1000:.1f}ms")
+        with cache:
+            lookups = []
+            for _ in range(repeat):
+                for lesson_path in cache.lessons:
+                    start = time.perf_counter()
+                    cache.lesson(lesson_path)
+                    lookups.append(time.perf_counter() - start)
+
+            # The same lessons lexed the way the app does it today, at view time
+            lexing = []
+            for lesson_path, entries in cache.lessons.items():
+                start = time.perf_counter()
+                for entry in entries:
+                    if entry['fence'] is None:
+                        source = read_text(os.path.join(courses_root, *entry['file'].split('/')))
+                    else:
+                        text = read_text(os.path.join(courses_root, *entry['file'].split('/')))
+                        source = next(s for i, (_, _, s) in enumerate(extract_fences(text)) if i == entry['fence'])
+                    tokenize(lexer_for(LEXER_ALIASES.get(entry['language'], entry['language'])), source)
+                lexing.append(time.perf_counter() - start)
+
+    def summary(times):
+        times = sorted(times)
+        return (f"mean {sum(times) / len(times) * 1e6:,.0f}us, p50 {times[len(times) // 2] * 1e6:,.0f}us, "
+                f"p95 {times[int(len(times) * 0.95)] * 1e6:,.0f}us")
+    print(f"per-lesson lookup: {summary(lookups)} over {len(lookups):,} lookups")
+    print(f"per-lesson lexing: {summary(lexing)} (includes reading the files)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-tokenize every code fence and starter/solution file into a syntax highlighting cache.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_cmd = sub.add_parser('build', help="Build or incrementally refresh the cache")
+    build_cmd.add_argument('--courses', default=COURSES_ROOT)
+    build_cmd.add_argument('--cache', default=DEFAULT_CACHE_DIR)
+    build_cmd.add_argument('-j', '--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    build_cmd.add_argument('--force', action='store_true', help="Re-lex every block")
+
+    bench_cmd = sub.add_parser('bench', help="Time cache builds and per-lesson lookups in a scratch cache")
+    bench_cmd.add_argument('--courses', default=COURSES_ROOT)
+    bench_cmd.add_argument('-j', '--jobs', type=int, default=None)
+    bench_cmd.add_argument('--repeat', type=int, default=5, help="Lookups of every lesson (default: 5)")
+
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.courses):
+        print(f"Error: {args.courses} is not a directory.")
+        sys.exit(1)
+
+    if args.command == 'build':
+        build_cache(args.courses, args.cache, args.jobs, args.force)
+    elif args.command == 'bench':
+        run_benchmark(args.courses, args.jobs, args.repeat)
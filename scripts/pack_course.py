@@ -0,0 +1,190 @@
+import io
+import os
+import sys
+import json
+import struct
+import argparse
+import tempfile
+import contextlib
+
+from course_tree import (
+    COURSES_ROOT, find_course_dirs, iter_module_dirs, iter_lesson_dirs, read_json, read_lesson_content,
+)
+
+# Bundle layout (all integers little-endian):
+#   magic 'CTPK' | u16 version | u16 flags | u64 index length
+#   index: compact UTF-8 JSON {course, modules: [{dir, meta, lessons: [{dir, meta, offset, length}]}]}
+#   payloads: one compact UTF-8 JSON {contentSections, challenges} per lesson,
+#             at index offsets relative to the end of the index
+MAGIC = b'CTPK'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQ')
+BUNDLE_EXT = '.ctpack'
+DEFAULT_OUT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'build', 'course-packs'))
+
+def compact_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def pack_course(course_dir, out_path):
+    """Packs a split course directory into a single bundle file. Returns the lesson count."""
+    modules = []
+    payloads = []
+    offset = 0
+    for module_dir in iter_module_dirs(course_dir):
+        module_json = os.path.join(module_dir, 'module.json')
+        module = {
+            'dir': os.path.basename(module_dir),
+            'meta': read_json(module_json) if os.path.exists(module_json) else {},
+            'lessons': [],
+        }
+        for lesson_dir in iter_lesson_dirs(module_dir):
+            lesson_json = os.path.join(lesson_dir, 'lesson.json')
+            if not os.path.exists(lesson_json):
+                print(f"Skipping {lesson_dir}: no lesson.json")
+                continue
+            sections, challenges = read_lesson_content(lesson_dir)
+            payload = compact_json({'contentSections': sections, 'challenges': challenges})
+            module['lessons'].append({
+                'dir': os.path.basename(lesson_dir),
+                'meta': read_json(lesson_json),
+                'offset': offset,
+                'length': len(payload),
+            })
+            payloads.append(payload)
+            offset += len(payload)
+        modules.append(module)
+
+    index = compact_json({
+        'dir': os.path.basename(os.path.normpath(course_dir)),
+        'course': read_json(os.path.join(course_dir, 'course.json')),
+        'modules': modules,
+    })
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(index)))
+        f.write(index)
+        for payload in payloads:
+            f.write(payload)
+    os.replace(tmp_path, out_path)
+    return len(payloads)
+
+def read_index(f):
+    """Reads the bundle header and index from an open binary file. Returns (index, payload_start)."""
+    magic, version, _flags, index_length = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Not a course bundle (bad magic)")
+    if version != VERSION:
+        raise ValueError(f"Unsupported course bundle version {version}")
+    index = json.loads(f.read(index_length).decode('utf-8'))
+    return index, HEADER.size + index_length
+
+def unpack_course(bundle_path):
+    """Reads a bundle back into a monolithic course.json dict."""
+    with open(bundle_path, 'rb') as f:
+        index, payload_start = read_index(f)
+        course = dict(index['course'])
+        course['modules'] = []
+        for module_entry in index['modules']:
+            module = dict(module_entry['meta'])
+            module['lessons'] = []
+            for lesson_entry in module_entry['lessons']:
+                f.seek(payload_start + lesson_entry['offset'])
+                lesson = dict(lesson_entry['meta'])
+                lesson.update(json.loads(f.read(lesson_entry['length']).decode('utf-8')))
+                module['lessons'].append(lesson)
+            course['modules'].append(module)
+    return course
+
+def diff_courses(expected, actual):
+    """Returns human-readable differences between two monolithic course dicts."""
+    problems = []
+    course_keys = set(expected) | set(actual)
+    course_keys.discard('modules')
+    for key in sorted(course_keys):
+        if expected.get(key) != actual.get(key):
+            problems.append(f"course.{key} differs")
+    expected_modules, actual_modules = expected.get('modules', []), actual.get('modules', [])
+    if len(expected_modules) != len(actual_modules):
+        problems.append(f"{len(expected_modules)} modules became {len(actual_modules)}")
+    for mod_index, (exp_mod, act_mod) in enumerate(zip(expected_modules, actual_modules), 1):
+        where = f"module {mod_index} ({exp_mod.get('title')})"
+        exp_lessons, act_lessons = exp_mod.get('lessons', []), act_mod.get('lessons', [])
+        if {k: v for k, v in exp_mod.items() if k != 'lessons'} != {k: v for k, v in act_mod.items() if k != 'lessons'}:
+            problems.append(f"{where}: metadata differs")
+        if len(exp_lessons) != len(act_lessons):
+            problems.append(f"{where}: {len(exp_lessons)} lessons became {len(act_lessons)}")
+        for exp_lesson, act_lesson in zip(exp_lessons, act_lessons):
+            for key in sorted(set(exp_lesson) | set(act_lesson)):
+                if exp_lesson.get(key) != act_lesson.get(key):
+                    problems.append(f"{where}, lesson {exp_lesson.get('id')}: '{key}' differs")
+    return problems
+
+def verify_course(course_dir):
+    """
+    Checks pack(split(x)) == x, where x is the monolithic course read from a
+    split course directory. Returns the list of differences found.
+    """
+    from refactor_course import process_course
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_path = os.path.join(tmp, 'original' + BUNDLE_EXT)
+        pack_course(course_dir, bundle_path)
+        course = unpack_course(bundle_path)
+
+        split_dir = os.path.join(tmp, 'split')
+        os.makedirs(split_dir)
+        with open(os.path.join(split_dir, 'course.json'), 'w', encoding='utf-8') as f:
+            json.dump(course, f, ensure_ascii=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_course(split_dir)
+
+        round_trip_path = os.path.join(tmp, 'round-trip' + BUNDLE_EXT)
+        pack_course(split_dir, round_trip_path)
+        return diff_courses(course, unpack_course(round_trip_path))
+
+def bundle_path_for(course_dir, out_dir):
+    return os.path.join(out_dir, os.path.basename(os.path.normpath(course_dir)) + BUNDLE_EXT)
+
+def resolve_courses(targets):
+    if not targets:
+        return find_course_dirs(COURSES_ROOT)
+    return [os.path.normpath(t) for t in targets]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack split course trees into single indexed bundle files (the inverse of refactor_course.py).")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    pack_cmd = sub.add_parser('pack', help="Pack course directories (default: every course under content/courses)")
+    pack_cmd.add_argument('courses', nargs='*')
+    pack_cmd.add_argument('-o', '--out-dir', default=DEFAULT_OUT_DIR, help="Directory for the .ctpack files")
+
+    unpack_cmd = sub.add_parser('unpack', help="Write a bundle back out as a monolithic course.json")
+    unpack_cmd.add_argument('bundle')
+    unpack_cmd.add_argument('output', help="Path of the course.json to write")
+
+    verify_cmd = sub.add_parser('verify', help="Check that pack(split(x)) == x for each course")
+    verify_cmd.add_argument('courses', nargs='*')
+
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        for course_dir in resolve_courses(args.courses):
+            out_path = bundle_path_for(course_dir, args.out_dir)
+            lessons = pack_course(course_dir, out_path)
+            print(f"Packed {course_dir}: {lessons} lessons, {os.path.getsize(out_path):,} bytes -> {out_path}")
+    elif args.command == 'unpack':
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(unpack_course(args.bundle), f, indent=2, ensure_ascii=False)
+        print(f"Unpacked {args.bundle} -> {args.output}")
+    elif args.command == 'verify':
+        failed = 0
+        for course_dir in resolve_courses(args.courses):
+            problems = verify_course(course_dir)
+            for problem in problems:
+                print(f"  {problem}")
+            print(f"{course_dir}: {'OK' if not problems else f'{len(problems)} differences'}")
+            failed += bool(problems)
+        sys.exit(1 if failed else 0)
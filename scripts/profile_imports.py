@@ -0,0 +1,268 @@
+import os
+import re
+import ast
+import sys
+import json
+import time
+import shutil
+import argparse
+import statistics
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from run_solutions import (
+    BOOTSTRAP, DEFAULT_ROOT, SANDBOX_FLAGS, SOLUTION_NAME, SandboxConfig, find_solutions, kill_tree, sandbox_env, sandbox_limits,
+)
+
+DEFAULT_REPORT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'build', 'import-profile.json'))
+
+# import time: <self us> | <cumulative us> | <indent><module>, two spaces of indent per nesting level
+IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)\s*$')
+
+# Imports-only mode runs a solution's module-level imports and nothing else.
+# Failed imports are reported on stdout rather than stopping the run.
+IMPORTS_HARNESS = '''
+import sys
+sys.path.insert(0, {directory!r})
+failed = []
+{imports}
+print(repr(failed))
+'''
+
+IMPORT_TEMPLATE = '''try:
+    {statement}
+except Exception as e:
+    failed.append(({statement!r}, type(e).__name__))
+'''
+
+def module_imports(source):
+    """The import statements that run when the module is imported: everything outside function bodies."""
+    statements = []
+
+    def visit(nodes):
+        for node in nodes:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                # Relative imports need a package, which a solution never has
+                if not (isinstance(node, ast.ImportFrom) and node.level):
+                    statements.append(ast.unparse(node))
+            elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                visit(ast.iter_child_nodes(node))
+
+    visit(ast.parse(source).body)
+    return statements
+
+def imports_harness(path):
+    """Source for a script that performs only path's module-level imports."""
+    with open(path, 'r', encoding='utf-8') as f:
+        statements = module_imports(f.read())
+    imports = ''.join(IMPORT_TEMPLATE.format(statement=statement) for statement in statements)
+    return IMPORTS_HARNESS.format(directory=os.path.dirname(os.path.abspath(path)), imports=imports)
+
+def parse_importtime(stderr):
+    """{module: (self us, cumulative us, depth)} from -X importtime output, in import order."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+    return modules
+
+def profile_once(path, config, imports_only):
+    """
+    Runs path (or only its imports) once under -X importtime. Like
+    run_solution(), it runs a copy in a scratch directory so nothing the
+    solution writes lands in the course tree. Returns (modules, failed
+    imports, timed out).
+    """
+    with tempfile.TemporaryDirectory(prefix='import-profile-') as scratch:
+        script = os.path.join(scratch, SOLUTION_NAME)
+        shutil.copyfile(path, script)
+        if imports_only:
+            args = [config.python, *SANDBOX_FLAGS, '-X', 'importtime', '-c', imports_harness(script)]
+        else:
+            limits = [str(limit) for limit in sandbox_limits(config)]
+            args = [config.python, *SANDBOX_FLAGS, '-X', 'importtime', '-c', BOOTSTRAP, *limits, script]
+        proc = subprocess.Popen(args, cwd=scratch, env=sandbox_env(scratch), stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8',
+                                errors='replace', start_new_session=hasattr(os, 'setsid'))
+        try:
+            stdout, stderr = proc.communicate(timeout=config.timeout)
+            timed_out = False
+        except subprocess.TimeoutExpired:
+            kill_tree(proc)
+            stdout, stderr = proc.communicate()
+            timed_out = True
+    failed = []
+    if imports_only and stdout.strip():
+        try:
+            failed = [statement for statement, _ in ast.literal_eval(stdout.strip().splitlines()[-1])]
+        except (ValueError, SyntaxError):
+            pass
+    return parse_importtime(stderr), failed, timed_out
+
+def profile_solution(path, config, imports_only, repeat, baseline):
+    """
+    Profiles path `repeat` times and keeps each module's fastest run, which is
+    the least disturbed by the rest of the machine. Modules the interpreter
+    imports on its own (baseline) are left out.
+    """
+    best = {}
+    failed = []
+    timed_out = False
+    for _ in range(repeat):
+        modules, failed, timed_out = profile_once(path, config, imports_only)
+        for name, (self_us, cumulative_us, depth) in modules.items():
+            if name in baseline:
+                continue
+            previous = best.get(name)
+            if previous is None or cumulative_us < previous[1]:
+                best[name] = (self_us, cumulative_us, depth)
+        if timed_out:
+            break
+    direct = [name for name, (_, _, depth) in best.items() if depth == 0]
+    return {
+        'totalUs': sum(best[name][1] for name in direct),
+        'direct': direct,
+        'modules': {name: {'selfUs': s, 'cumulativeUs': c, 'depth': d} for name, (s, c, d) in best.items()},
+        'failedImports': failed,
+        'timedOut': timed_out,
+    }
+
+def baseline_modules(config, imports_only):
+    """Modules imported by the interpreter and harness alone, profiled against an empty solution."""
+    with tempfile.TemporaryDirectory(prefix='import-profile-') as scratch:
+        empty = os.path.join(scratch, 'solution.py')
+        open(empty, 'w').close()
+        modules, _, _ = profile_once(empty, config, imports_only)
+    return set(modules)
+
+def lesson_of(rel_dir):
+    return rel_dir.rpartition('/challenges/')[0] or rel_dir
+
+def aggregate(solutions, heavy_ms):
+    """Module ranking, per-lesson cost and lessons sharing heavy top-level packages."""
+    per_module = {}
+    for rel_dir, profile in solutions.items():
+        for name, timing in profile['modules'].items():
+            entry = per_module.setdefault(name, {'cumulative': [], 'self': [], 'direct': 0, 'lessons': set()})
+            entry['cumulative'].append(timing['cumulativeUs'])
+            entry['self'].append(timing['selfUs'])
+            entry['direct'] += timing['depth'] == 0
+            entry['lessons'].add(lesson_of(rel_dir))
+
+    modules = sorted(({
+        'module': name,
+        'solutions': len(entry['cumulative']),
+        'directImports': entry['direct'],
+        'lessons': len(entry['lessons']),
+        'medianCumulativeUs': int(statistics.median(entry['cumulative'])),
+        'maxCumulativeUs': max(entry['cumulative']),
+        'medianSelfUs': int(statistics.median(entry['self'])),
+        'totalSelfUs': sum(entry['self']),
+    } for name, entry in per_module.items()), key=lambda m: (-m['medianCumulativeUs'], m['module']))
+
+    # Only top-level packages, so fastapi's pydantic counts once rather than as dozens of submodules
+    heavy = {m['module'] for m in modules if '.' not in m['module'] and m['medianCumulativeUs'] >= heavy_ms * 1000}
+
+    lessons = {}
+    for rel_dir, profile in solutions.items():
+        lesson = lessons.setdefault(lesson_of(rel_dir), {'challenges': 0, 'totals': [], 'heavy': set()})
+        lesson['challenges'] += 1
+        lesson['totals'].append(profile['totalUs'])
+        lesson['heavy'].update(name for name in profile['modules'] if name in heavy)
+    lesson_rows = sorted(({
+        'lesson': name,
+        'challenges': lesson['challenges'],
+        'totalUs': sum(lesson['totals']),
+        'maxUs': max(lesson['totals']),
+        'heavyModules': sorted(lesson['heavy']),
+    } for name, lesson in lessons.items()), key=lambda l: (-l['totalUs'], l['lesson']))
+
+    shared = []
+    for module in modules:
+        if module['module'] not in heavy:
+            continue
+        users = [l['lesson'] for l in lesson_rows if module['module'] in l['heavyModules']]
+        if len(users) > 1:
+            shared.append({'module': module['module'], 'medianCumulativeUs': module['medianCumulativeUs'], 'lessons': users})
+    return modules, lesson_rows, shared
+
+def profile_all(root, config, imports_only=True, repeat=3, jobs=1, heavy_ms=25.0):
+    """Profiles every solution below root and returns the full report."""
+    baseline = baseline_modules(config, imports_only)
+    paths = dict(find_solutions(root))
+    # Timings are only comparable when runs don't compete for CPU, hence one job by default
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {rel_dir: pool.submit(profile_solution, path, config, imports_only, repeat, baseline)
+                   for rel_dir, path in paths.items()}
+        solutions = {rel_dir: future.result() for rel_dir, future in futures.items()}
+    modules, lessons, shared = aggregate(solutions, heavy_ms)
+    return {
+        'root': root,
+        'mode': 'imports' if imports_only else 'full',
+        'repeat': repeat,
+        'python': config.python,
+        'baselineModules': len(baseline),
+        'heavyThresholdMs': heavy_ms,
+        'modules': modules,
+        'lessons': lessons,
+        'sharedHeavyModules': shared,
+        'solutions': solutions,
+    }
+
+def ms(us):
+    return f"{us / 1000:8.1f}ms"
+
+def print_report(report, top=20):
+    print(f"Slowest modules to import (median cumulative across {len(report['solutions'])} solutions):")
+    print(f"{'module':<40} {'cumulative':>10} {'self':>10} {'solutions':>9} {'lessons':>8}")
+    for module in report['modules'][:top]:
+        print(f"{module['module']:<40} {ms(module['medianCumulativeUs'])} {ms(module['medianSelfUs'])} "
+              f"{module['solutions']:>9} {module['lessons']:>8}")
+
+    print("\nLessons by total import time:")
+    print(f"{'lesson':<70} {'total':>10} {'slowest':>10}  heavy modules")
+    for lesson in report['lessons'][:top]:
+        print(f"{lesson['lesson'][:70]:<70} {ms(lesson['totalUs'])} {ms(lesson['maxUs'])}  {', '.join(lesson['heavyModules'])}")
+
+    print(f"\nHeavy packages (>= {report['heavyThresholdMs']:g}ms) shared across lessons:")
+    for entry in report['sharedHeavyModules']:
+        print(f"{entry['module']:<20} {ms(entry['medianCumulativeUs'])}  {len(entry['lessons'])} lessons")
+
+    failed = {rel_dir: p['failedImports'] for rel_dir, p in report['solutions'].items() if p['failedImports']}
+    timed_out = [rel_dir for rel_dir, p in report['solutions'].items() if p['timedOut']]
+    if failed:
+        print(f"\n{len(failed)} solutions have imports that failed and weren't timed (missing packages?)")
+    if timed_out:
+        print(f"{len(timed_out)} solutions timed out; their profiles are partial")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile import time of every challenge solution.py with -X importtime and rank the results.")
+    parser.add_argument('root', nargs='?', default=DEFAULT_ROOT, help="Directory searched for solution.py files (default: the Python course)")
+    parser.add_argument('--full', action='store_true', help="Run the whole solution instead of only its module-level imports")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per solution; the fastest time per module is kept (default: 3)")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="Concurrent runs; above 1 skews timings (default: 1)")
+    parser.add_argument('--timeout', type=float, default=10.0, help="Wall-clock seconds per run (default: 10)")
+    parser.add_argument('--python', default=sys.executable, help="Interpreter to profile")
+    parser.add_argument('--heavy-ms', type=float, default=25.0, help="Median cumulative import time that makes a package heavy (default: 25)")
+    parser.add_argument('--top', type=int, default=20, help="Rows per table (default: 20)")
+    parser.add_argument('--json', default=DEFAULT_REPORT, help="JSON report path (default: build/import-profile.json)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"Error: {args.root} is not a directory.")
+        sys.exit(1)
+    if args.repeat < 1:
+        print("Error: --repeat must be at least 1.")
+        sys.exit(1)
+
+    config = SandboxConfig(args.timeout, python=args.python)
+    start = time.perf_counter()
+    report = profile_all(args.root, config, not args.full, args.repeat, args.jobs, args.heavy_ms)
+    print_report(report, args.top)
+    os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+    with open(args.json, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nProfiled {len(report['solutions'])} solutions in {time.perf_counter() - start:.1f}s; report written to {args.json}")
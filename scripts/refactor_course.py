@@ -2,7 +2,14 @@ import os
 import json
 import re
 import sys
+import time
 import shutil
+import hashlib
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from frontmatter import format_frontmatter
 
 # Mapping of course language IDs to file extensions
 LANGUAGE_EXTENSIONS = {
@@ -48,121 +55,526 @@ def write_json(path, data):
 
 def get_frontmatter(metadata):
     """Generates YAML frontmatter string from a dict."""
-    yaml = "---\n"
-    for key, value in metadata.items():
-        if value:
-            # Escape quotes if necessary, simplified for this use case
-            clean_value = str(value).replace('"', '\\"')
-            yaml += f'{key}: "{clean_value}"\n'
-    yaml += "---\n\n"
-    return yaml
-
-def process_course(course_dir):
-    json_path = os.path.join(course_dir, 'course.json')
+    return format_frontmatter(metadata)
+
+MANIFEST_NAME = '.split-manifest.json'
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def load_manifest(course_dir):
+    """Loads the {relative path: record} manifest of a previous split, if any."""
+    path = os.path.join(course_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('files', {})
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable {path}: {e}")
+        return {}
+
+def save_manifest(course_dir, entries):
+    path = os.path.join(course_dir, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'files': dict(sorted(entries.items()))}, f, indent=1)
+    os.replace(tmp_path, path)
+
+class SplitOutputs:
+    """
+    Writes split output files, skipping any whose content hash matches the
+    previous manifest entry and whose size/mtime show it wasn't touched since.
+    """
+
+    def __init__(self, course_dir, previous=None, force=False):
+        self.course_dir = course_dir
+        self.previous = previous or {}
+        self.force = force
+        self.entries = {}
+        self.written = 0
+        self.unchanged = 0
+
+    def _is_current(self, path, record, digest):
+        if self.force or record is None or record['sha256'] != digest:
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return st.st_size == record['size'] and st.st_mtime_ns == record['mtime_ns']
+
+    def write_file(self, path, content):
+        rel_path = os.path.relpath(path, self.course_dir).replace(os.sep, '/')
+        digest = content_hash(content)
+        record = self.previous.get(rel_path)
+        if self._is_current(path, record, digest):
+            self.entries[rel_path] = record
+            self.unchanged += 1
+            return False
+        write_file(path, content)
+        st = os.stat(path)
+        self.entries[rel_path] = {'sha256': digest, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        self.written += 1
+        return True
+
+    def write_json(self, path, data):
+        return self.write_file(path, json.dumps(data, indent=2, ensure_ascii=False))
+
+    def merge(self, other):
+        self.entries.update(other.entries)
+        self.written += other.written
+        self.unchanged += other.unchanged
+
+def split_lesson(lesson_dir, lesson, lang_id, file_ext, outputs):
+    """Writes one lesson's sections, challenges and lesson.json through outputs."""
+
+    # Process Content Sections
+    sections = lesson.pop('contentSections', [])
+    for sec_index, section in enumerate(sections, 1):
+        sec_type = section.get('type', 'text').lower()
+        sec_filename = f"{sec_index:02d}-{sec_type}.md"
+        sec_path = os.path.join(lesson_dir, 'content', sec_filename)
+
+        # Prepare Frontmatter
+        frontmatter_data = {
+            "type": section.get('type'),
+            "title": section.get('title'),
+        }
+
+        # Prepare Content
+        md_content = get_frontmatter(frontmatter_data)
+        md_content += section.get('content', '') or ''
+
+        # Append Code if present
+        code_snippet = section.get('code')
+        if code_snippet:
+            code_lang = section.get('language', lang_id)
+            md_content += f"\n\n```{code_lang}\n{code_snippet}\n```\n"
+
+        outputs.write_file(sec_path, md_content)
+
+    # Process Challenges
+    challenges = lesson.pop('challenges', [])
+    for chal_index, challenge in enumerate(challenges, 1):
+        chal_title = challenge.get('title', f'challenge-{chal_index}')
+        chal_slug = f"{chal_index:02d}-{slugify(chal_title)}"
+        chal_dir = os.path.join(lesson_dir, 'challenges', chal_slug)
+
+        # Extract code files
+        starter_code = challenge.pop('starterCode', None)
+        solution_code = challenge.pop('solution', None)
+
+        # Write Metadata
+        outputs.write_json(os.path.join(chal_dir, 'challenge.json'), challenge)
+
+        # Write Code Files
+        if starter_code:
+            outputs.write_file(os.path.join(chal_dir, f'starter.{file_ext}'), starter_code)
+        if solution_code:
+            outputs.write_file(os.path.join(chal_dir, f'solution.{file_ext}'), solution_code)
+
+    # Write Lesson Metadata
+    outputs.write_json(os.path.join(lesson_dir, 'lesson.json'), lesson)
+
+def split_lessons(task):
+    """
+    Worker entry point: splits a list of (lesson_dir, lesson, lang_id, file_ext)
+    jobs in order and returns the SplitOutputs that recorded them.
+    """
+    jobs, outputs = task
+    for job in jobs:
+        split_lesson(*job, outputs)
+    return outputs
+
+class JsonStream:
+    """
+    Minimal incremental JSON reader over a text file. Structural tokens are
+    consumed one at a time; whole values are decoded with raw_decode once
+    enough of the file has been buffered to hold them.
+    """
+
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _read_more(self, size):
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+        self.buf += chunk
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._read_more(self.chunk_size)
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'EOF'}' while streaming JSON")
+        self.pos += 1
+
+    def value(self):
+        """Decodes and returns the next complete JSON value."""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number ending exactly at the buffer edge may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow reads geometrically so a large value is re-scanned O(log n) times
+            self._read_more(size)
+            size *= 2
+
+    def items(self):
+        """Iterates the keys of an object, leaving the stream positioned at each value."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect('}')
+            return
+
+    def elements(self):
+        """Iterates the elements of an array, leaving the stream positioned at each one."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect(']')
+            return
+
+def iter_lessons(course_data):
+    """
+    Yields (mod_index, module, lesson_index, lesson) for every lesson of an
+    in-memory course, then (mod_index, module, None, None) when a module ends.
+    Modules and lessons are popped from course_data as they are visited.
+    """
+    for mod_index, module in enumerate(course_data.pop('modules', []), 1):
+        for lesson_index, lesson in enumerate(module.pop('lessons', []), 1):
+            yield mod_index, module, lesson_index, lesson
+        yield mod_index, module, None, None
+
+def stream_lessons(f, course_meta):
+    """
+    Same events as iter_lessons(), but parsed incrementally from an open
+    course.json so only one lesson is decoded at a time. Top-level keys other
+    than 'modules' are collected into course_meta as they are read.
+    """
+    stream = JsonStream(f)
+    for key in stream.items():
+        if key != 'modules' or stream.peek() != '[':
+            course_meta[key] = stream.value()
+            continue
+        mod_index = 0
+        for _ in stream.elements():
+            mod_index += 1
+            module = {}
+            if stream.peek() != '{':
+                # Not an object; nothing to split
+                stream.value()
+                continue
+            for mod_key in stream.items():
+                if mod_key != 'lessons' or stream.peek() != '[':
+                    module[mod_key] = stream.value()
+                    continue
+                lesson_index = 0
+                for _ in stream.elements():
+                    lesson_index += 1
+                    yield mod_index, module, lesson_index, stream.value()
+            yield mod_index, module, None, None
+
+def has_modules(path):
+    """
+    True if a course source file has a top-level modules list; stops reading
+    at that key. An already split, unreadable or malformed source has none.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            stream = JsonStream(f)
+            for key in stream.items():
+                if key == 'modules':
+                    return stream.peek() == '['
+                stream.value()
+    except (OSError, ValueError):
+        return False
+    return False
+
+class LessonDispatcher:
+    """
+    Runs lesson jobs serially or on a process pool while keeping at most a
+    bounded number in flight, so streamed lessons are not all held at once.
+    Results are merged in submission order and a lesson directory is never
+    written by two jobs at the same time.
+    """
+
+    def __init__(self, course_dir, outputs, previous_by_lesson, force, pool=None, max_in_flight=16):
+        self.course_dir = course_dir
+        self.outputs = outputs
+        self.previous_by_lesson = previous_by_lesson
+        self.force = force
+        self.pool = pool
+        self.max_in_flight = max_in_flight
+        self.in_flight = deque()
+        self.lesson_dirs = set()
+        self.lessons_rewritten = 0
+
+    def _collect(self, result, lesson_dir):
+        self.outputs.merge(result)
+        if result.written:
+            self.lessons_rewritten += 1
+        self.lesson_dirs.add(lesson_dir)
+
+    def _drain_one(self):
+        lesson_dir, future = self.in_flight.popleft()
+        self._collect(future.result(), lesson_dir)
+
+    def submit(self, lesson_dir, lesson, lang_id, file_ext):
+        key = os.path.relpath(lesson_dir, self.course_dir).replace(os.sep, '/')
+        task = ([(lesson_dir, lesson, lang_id, file_ext)],
+                SplitOutputs(self.course_dir, self.previous_by_lesson.get(key), self.force))
+        if self.pool is None:
+            self._collect(split_lessons(task), lesson_dir)
+            return
+        # A repeated lesson directory must wait for the earlier job so the last one wins
+        while self.in_flight and (len(self.in_flight) >= self.max_in_flight
+                                  or any(d == lesson_dir for d, _ in self.in_flight)):
+            self._drain_one()
+        self.in_flight.append((lesson_dir, self.pool.submit(split_lessons, task)))
+
+    def finish(self):
+        while self.in_flight:
+            self._drain_one()
+
+def lesson_key(rel_path):
+    """Maps 'modules/NN-x/lessons/NN-y/...' to its lesson directory prefix."""
+    return '/'.join(rel_path.split('/', 4)[:4])
+
+def remove_empty_dirs(path, stop_dir):
+    """Removes path and its empty parents, stopping at stop_dir."""
+    stop_dir = os.path.abspath(stop_dir)
+    path = os.path.abspath(path)
+    while path != stop_dir and path.startswith(stop_dir) and os.path.isdir(path) and not os.listdir(path):
+        os.rmdir(path)
+        path = os.path.dirname(path)
+
+def process_course(course_dir, pool=None, source='course.json', force=False, prune=False, stream=False):
+    """
+    Splits a monolithic course.json into the modules/ directory tree. The
+    caller checks has_modules() first.
+    With a process pool, lessons are split in parallel; module and course
+    metadata are always written by the calling process. Outputs whose content
+    hash matches the course's split manifest are left untouched. With stream,
+    the source is parsed one lesson at a time instead of loaded whole.
+    """
+    json_path = os.path.join(course_dir, source)
 
     if not os.path.exists(json_path):
-        print(f"Error: course.json not found in {course_dir}")
+        print(f"Error: {source} not found in {course_dir}")
         return
 
     print(f"Processing {course_dir}...")
 
-    # 1. Load original JSON
-    with open(json_path, 'r', encoding='utf-8') as f:
-        course_data = json.load(f)
+    # 1. Create Backup (a separate source file is never overwritten)
+    if source == 'course.json':
+        shutil.copy(json_path, json_path + '.bak')
+        print("Created backup: course.json.bak")
 
-    # 2. Determine file extension
-    lang_id = course_data.get('language', 'text').lower()
-    # Handle edge cases or default to txt
-    file_ext = LANGUAGE_EXTENSIONS.get(lang_id, 'txt')
+    previous = load_manifest(course_dir)
+    outputs = SplitOutputs(course_dir, previous, force)
 
-    # 3. Create Backup
-    shutil.copy(json_path, json_path + '.bak')
-    print("Created backup: course.json.bak")
-
-    # 4. Process Modules
-    modules = course_data.pop('modules', [])
+    # Hand each lesson only its own slice of the previous manifest
+    previous_by_lesson = {}
+    for rel_path, record in previous.items():
+        previous_by_lesson.setdefault(lesson_key(rel_path), {})[rel_path] = record
+    dispatcher = LessonDispatcher(course_dir, outputs, previous_by_lesson, force, pool)
 
     # Ensure modules directory exists
     modules_dir_base = os.path.join(course_dir, 'modules')
-    if os.path.exists(modules_dir_base):
+    if os.path.exists(modules_dir_base) and not previous:
         # Optional: Warn or clean up existing modules dir if re-running
         print(f"Warning: '{modules_dir_base}' already exists. Merging/Overwriting...")
 
-    for mod_index, module in enumerate(modules, 1):
+    def module_dir(mod_index, module):
         mod_title = module.get('title', f'module-{mod_index}')
-        mod_slug = f"{mod_index:02d}-{slugify(mod_title)}"
-        mod_dir = os.path.join(modules_dir_base, mod_slug)
+        return os.path.join(modules_dir_base, f"{mod_index:02d}-{slugify(mod_title)}")
 
-        # Process Lessons
-        lessons = module.pop('lessons', [])
+    # Lessons wait here until the course language and their module title are
+    # known; when streaming, those keys may appear after the lessons in the file.
+    pending = deque()
+    finished_modules = set()
 
-        for lesson_index, lesson in enumerate(lessons, 1):
+    def dispatch_ready(source_done):
+        if not (source_done or 'language' in course_data):
+            return
+        # 2. Determine file extension
+        lang_id = course_data.get('language', 'text').lower()
+        # Handle edge cases or default to txt
+        file_ext = LANGUAGE_EXTENSIONS.get(lang_id, 'txt')
+        while pending:
+            mod_index, module, lesson_index, lesson = pending[0]
+            if mod_index not in finished_modules and 'title' not in module:
+                return
+            pending.popleft()
             # Use 'order' field if available, else iterator
             order = lesson.get('order', lesson_index)
             lesson_title = lesson.get('title', f'lesson-{order}')
             lesson_slug = f"{order:02d}-{slugify(lesson_title)}"
-            lesson_dir = os.path.join(mod_dir, 'lessons', lesson_slug)
-
-            # Process Content Sections
-            sections = lesson.pop('contentSections', [])
-            for sec_index, section in enumerate(sections, 1):
-                sec_type = section.get('type', 'text').lower()
-                sec_filename = f"{sec_index:02d}-{sec_type}.md"
-                sec_path = os.path.join(lesson_dir, 'content', sec_filename)
-
-                # Prepare Frontmatter
-                frontmatter_data = {
-                    "type": section.get('type'),
-                    "title": section.get('title'),
-                }
-
-                # Prepare Content
-                md_content = get_frontmatter(frontmatter_data)
-                md_content += section.get('content', '') or ''
-
-                # Append Code if present
-                code_snippet = section.get('code')
-                if code_snippet:
-                    code_lang = section.get('language', lang_id)
-                    md_content += f"\n\n```{code_lang}\n{code_snippet}\n```\n"
-
-                write_file(sec_path, md_content)
-
-            # Process Challenges
-            challenges = lesson.pop('challenges', [])
-            for chal_index, challenge in enumerate(challenges, 1):
-                chal_title = challenge.get('title', f'challenge-{chal_index}')
-                chal_slug = f"{chal_index:02d}-{slugify(chal_title)}"
-                chal_dir = os.path.join(lesson_dir, 'challenges', chal_slug)
-
-                # Extract code files
-                starter_code = challenge.pop('starterCode', None)
-                solution_code = challenge.pop('solution', None)
-
-                # Write Metadata
-                write_json(os.path.join(chal_dir, 'challenge.json'), challenge)
-
-                # Write Code Files
-                if starter_code:
-                    write_file(os.path.join(chal_dir, f'starter.{file_ext}'), starter_code)
-                if solution_code:
-                    write_file(os.path.join(chal_dir, f'solution.{file_ext}'), solution_code)
-
-            # Write Lesson Metadata
-            write_json(os.path.join(lesson_dir, 'lesson.json'), lesson)
-
-        # Write Module Metadata
-        write_json(os.path.join(mod_dir, 'module.json'), module)
+            lesson_dir = os.path.join(module_dir(mod_index, module), 'lessons', lesson_slug)
+            dispatcher.submit(lesson_dir, lesson, lang_id, file_ext)
+
+    # 3. Load original JSON, or open it for streaming
+    with open(json_path, 'r', encoding='utf-8') as f:
+        if stream:
+            course_data = {}
+            events = stream_lessons(f, course_data)
+        else:
+            course_data = json.load(f)
+            events = iter_lessons(course_data)
+
+        # 4. Process Modules and Lessons
+        for mod_index, module, lesson_index, lesson in events:
+            if lesson is not None:
+                pending.append((mod_index, module, lesson_index, lesson))
+            else:
+                finished_modules.add(mod_index)
+                # Write Module Metadata
+                outputs.write_json(os.path.join(module_dir(mod_index, module), 'module.json'), module)
+            dispatch_ready(not stream)
+
+    dispatch_ready(True)
+    dispatcher.finish()
+    lesson_count = len(dispatcher.lesson_dirs)
+    lessons_rewritten = dispatcher.lessons_rewritten
 
     # 5. Overwrite root course.json with stripped metadata
-    write_json(json_path, course_data)
-    print("Refactoring complete.")
+    outputs.write_json(os.path.join(course_dir, 'course.json'), course_data)
+
+    # 6. Report or prune outputs of a previous split that are no longer produced.
+    # A run that produced no lessons says nothing about which outputs are stale.
+    orphans = sorted(set(previous) - set(outputs.entries)) if lesson_count else []
+    if not lesson_count:
+        for rel_path in set(previous) - set(outputs.entries):
+            outputs.entries[rel_path] = previous[rel_path]
+    for rel_path in orphans:
+        if prune:
+            path = os.path.join(course_dir, *rel_path.split('/'))
+            if os.path.exists(path):
+                os.remove(path)
+            remove_empty_dirs(os.path.dirname(path), course_dir)
+            print(f"Pruned: {rel_path}")
+        else:
+            # Keep tracking it so a later --prune still knows it is ours
+            outputs.entries[rel_path] = previous[rel_path]
+            print(f"Orphaned: {rel_path}")
+    if orphans and not prune:
+        print(f"{len(orphans):,} orphaned files (re-run with --prune to delete them)")
+
+    save_manifest(course_dir, outputs.entries)
+    print(f"Refactoring complete: {lessons_rewritten:,} lessons rewritten, "
+          f"{lesson_count - lessons_rewritten:,} unchanged "
+          f"({outputs.written:,} files written, {outputs.unchanged:,} unchanged).")
+
+def find_courses(root, source='course.json'):
+    """Returns sorted course directories below root that hold a monolithic source file."""
+    courses = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if source not in filenames:
+            continue
+        # Don't descend into the generated tree of a course
+        dirnames[:] = [d for d in dirnames if d != 'modules']
+        if has_modules(os.path.join(dirpath, source)):
+            courses.append(dirpath)
+        else:
+            print(f"Skipping {dirpath}: {source} has no modules list (already split?)")
+    return courses
+
+def process_all(root, jobs=None, source='course.json', force=False, prune=False, stream=False):
+    """Splits every monolithic course below root, sharing one process pool."""
+    courses = find_courses(root, source)
+    if not courses:
+        print(f"No monolithic {source} found under {root}")
+        return
+
+    timings = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for course_dir in courses:
+            start = time.perf_counter()
+            try:
+                process_course(course_dir, pool, source, force, prune, stream)
+            except ValueError as e:
+                # Malformed past the modules key; has_modules() stops reading there
+                print(f"Error: skipping {course_dir}: {source} is not valid JSON ({e})")
+                continue
+            timings.append((course_dir, time.perf_counter() - start))
+
+    print()
+    for course_dir, elapsed in timings:
+        print(f"{elapsed:8.2f}s  {course_dir}")
+    print(f"{sum(t for _, t in timings):8.2f}s  total ({len(timings)} courses)")
+
+def default_courses_root():
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'content', 'courses'))
 
 if __name__ == "__main__":
-    # Use argument if provided, otherwise current directory
-    target_dir = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    parser = argparse.ArgumentParser(description="Split monolithic course.json files into the modules/ directory tree.")
+    parser.add_argument('target', nargs='?', help="Course directory (default: current directory), or the search root with --all")
+    parser.add_argument('--all', action='store_true', help="Split every course.json found under the target (default: content/courses)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="Worker processes for --all (default: CPU count)")
+    parser.add_argument('--source', default='course.json', help="Monolithic input file name; anything other than course.json is kept as-is so it can be re-split after edits")
+    parser.add_argument('--force', action='store_true', help="Rewrite every output even if its content hash is unchanged")
+    parser.add_argument('--stream', action='store_true', help="Parse the source one lesson at a time so peak memory is bounded by the largest lesson")
+    parser.add_argument('--prune', action='store_true', help="Delete outputs of a previous split that are no longer produced")
+    args = parser.parse_args()
+
+    if args.all:
+        target_dir = args.target or default_courses_root()
+    else:
+        # Use argument if provided, otherwise current directory
+        target_dir = args.target or os.getcwd()
+
+    if not os.path.isdir(target_dir):
+        print(f"Error: {target_dir} is not a directory.")
+        sys.exit(1)
 
-    if os.path.isdir(target_dir):
-        process_course(target_dir)
+    if args.all:
+        process_all(target_dir, args.jobs, args.source, args.force, args.prune, args.stream)
     else:
-        print(f"Error: {target_dir} is not a directory.")
\ No newline at end of file
+        json_path = os.path.join(target_dir, args.source)
+        if os.path.exists(json_path) and not has_modules(json_path):
+            # Splitting an already split course.json again would produce nothing,
+            # overwrite the backup and report (or prune) every output as orphaned
+            print(f"Skipping {target_dir}: {args.source} has no modules list (already split?)")
+        else:
+            process_course(target_dir, source=args.source, force=args.force, prune=args.prune, stream=args.stream)
@@ -0,0 +1,199 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+from course_tree import COURSES_ROOT, find_course_dirs, iter_course_lessons, read_json, read_lesson, read_text
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TEMPLATE = os.path.join(SCRIPTS_DIR, 'review-templates', 'lesson-review-prompt.md')
+DEFAULT_OUT = os.path.normpath(os.path.join(SCRIPTS_DIR, '..', 'build', 'review-prompts.jsonl'))
+PLACEHOLDER_RE = re.compile(r'\{\{([A-Z_]+)\}\}')
+
+def template_fields(course, module, lesson):
+    """Values for every placeholder the review templates use."""
+    return {
+        'COURSE_TITLE': course.get('title', ''),
+        'COURSE_LANGUAGE': course.get('language', ''),
+        'MODULE_TITLE': module.get('title', ''),
+        'LESSON_TITLE': lesson.get('title', ''),
+        'LESSON_ID': lesson.get('id', ''),
+        'DIFFICULTY': lesson.get('difficulty') or module.get('difficulty', ''),
+        'ESTIMATED_MINUTES': str(lesson.get('estimatedMinutes', '')),
+        'LESSON_CONTENT_JSON': json.dumps(lesson, indent=2, ensure_ascii=False),
+    }
+
+def render(template, fields):
+    """Fills {{NAME}} placeholders. Raises KeyError naming any placeholder without a value."""
+    missing = sorted(set(PLACEHOLDER_RE.findall(template)) - set(fields))
+    if missing:
+        raise KeyError(f"no value for placeholder(s): {', '.join(missing)}")
+    return PLACEHOLDER_RE.sub(lambda m: fields[m.group(1)], template)
+
+@lru_cache(maxsize=None)
+def _read_meta(path):
+    return read_json(path) if os.path.exists(path) else {}
+
+_template = None
+
+def init_worker(template):
+    global _template
+    _template = template
+
+def render_task(task):
+    """Renders one lesson. Returns (lesson path, sha256 of the prompt, JSONL line)."""
+    courses_root, course_dir, module_dir, lesson_dir = task
+    course = _read_meta(os.path.join(course_dir, 'course.json'))
+    module = _read_meta(os.path.join(module_dir, 'module.json'))
+    lesson = read_lesson(lesson_dir)
+    prompt = render(_template, template_fields(course, module, lesson))
+    digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    rel_dir = os.path.relpath(lesson_dir, courses_root).replace(os.sep, '/')
+    record = {
+        'request_id': f"{course.get('id', os.path.basename(course_dir))}-{lesson.get('id', os.path.basename(lesson_dir))}",
+        'title': f"Review {course.get('title', '')}: {lesson.get('title', '')}",
+        'body': prompt,
+        'path': rel_dir,
+        'sha256': digest,
+    }
+    return rel_dir, digest, json.dumps(record, ensure_ascii=False) + '\n'
+
+def iter_tasks(courses_root, courses=None, include_archived=False):
+    for course_dir in find_course_dirs(courses_root):
+        if courses and os.path.basename(course_dir) not in courses:
+            continue
+        for module_dir, lesson_dir in iter_course_lessons(course_dir):
+            if not include_archived and _read_meta(os.path.join(lesson_dir, 'lesson.json')).get('archived'):
+                continue
+            yield courses_root, course_dir, module_dir, lesson_dir
+
+def trim_partial_line(path):
+    """Drops an unterminated last line left by an interrupted run, so appended output stays valid JSONL."""
+    try:
+        f = open(path, 'rb+')
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            step = min(65536, position)
+            f.seek(position - step)
+            chunk = f.read(step)
+            if position == end and chunk.endswith(b'\n'):
+                return
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                f.truncate(position - step + newline + 1)
+                return
+            position -= step
+        f.truncate(0)
+
+def state_path(out_path):
+    return out_path + '.state.json'
+
+def load_state(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('rendered', {})
+    except (OSError, ValueError):
+        return {}
+
+def save_state(path, rendered):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'rendered': rendered}, f)
+    os.replace(path + '.tmp', path)
+
+def render_all(courses_root=COURSES_ROOT, template_path=DEFAULT_TEMPLATE, out_path=DEFAULT_OUT, jobs=None,
+               courses=None, force=False, include_archived=False, checkpoint_every=50):
+    """
+    Renders every lesson's review prompt and appends the ones whose rendered
+    text changed since they were last written to out_path as JSONL.
+
+    Lessons are rendered by worker processes with a bounded number in
+    flight and written in tree order, so memory stays flat however large
+    the tree. The state file next to the output records the hash of every
+    prompt written; it's saved every `checkpoint_every` lines, after the
+    output is flushed to disk, so an interrupted run resumes where it left
+    off. A crash between the two can repeat at most that many lines.
+    Returns counts of written and unchanged lessons.
+    """
+    template = read_text(template_path)
+    state_file = state_path(out_path)
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    if not force:
+        trim_partial_line(out_path)
+        # The state describes what the output holds; with no output, start over
+        if not os.path.exists(out_path) or os.path.getsize(out_path) == 0:
+            force = True
+    rendered = {} if force else load_state(state_file)
+    counts = {'written': 0, 'unchanged': 0}
+    max_in_flight = (jobs or os.cpu_count()) * 4
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(template,)) as pool, \
+            open(out_path, 'w' if force else 'a', encoding='utf-8') as out:
+
+        def checkpoint():
+            out.flush()
+            os.fsync(out.fileno())
+            save_state(state_file, rendered)
+
+        pending = deque()
+        since_checkpoint = 0
+
+        def drain(limit):
+            nonlocal since_checkpoint
+            while len(pending) > limit:
+                rel_dir, digest, line = pending.popleft().result()
+                if rendered.get(rel_dir) == digest:
+                    counts['unchanged'] += 1
+                    continue
+                out.write(line)
+                rendered[rel_dir] = digest
+                counts['written'] += 1
+                since_checkpoint += 1
+                if since_checkpoint >= checkpoint_every:
+                    checkpoint()
+                    since_checkpoint = 0
+
+        for task in iter_tasks(courses_root, courses, include_archived):
+            pending.append(pool.submit(render_task, task))
+            drain(max_in_flight)
+        drain(0)
+        checkpoint()
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the lesson review prompt for every lesson and stream the changed ones to JSONL.")
+    parser.add_argument('--courses-root', default=COURSES_ROOT, help="Content root (default: content/courses)")
+    parser.add_argument('--courses', nargs='*', help="Only these course directories (e.g. python java)")
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE, help="Prompt template with {{PLACEHOLDER}} fields")
+    parser.add_argument('--out', default=DEFAULT_OUT, help="JSONL output, appended to (default: build/review-prompts.jsonl)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Forget what was rendered before: truncate the output and render every lesson")
+    parser.add_argument('--include-archived', action='store_true', help="Also render archived lessons")
+    parser.add_argument('--checkpoint-every', type=int, default=50, help="Lines written between checkpoints (default: 50)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.courses_root):
+        print(f"Error: {args.courses_root} is not a directory.")
+        sys.exit(1)
+    if not os.path.isfile(args.template):
+        print(f"Error: template {args.template} not found.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    try:
+        counts = render_all(args.courses_root, args.template, args.out, args.jobs, args.courses, args.force,
+                            args.include_archived, max(1, args.checkpoint_every))
+    except KeyError as e:
+        print(f"Error: {e.args[0]}")
+        sys.exit(1)
+    print(f"Wrote {counts['written']:,} prompts to {args.out} ({counts['unchanged']:,} unchanged) "
+          f"in {time.perf_counter() - start:.1f}s")
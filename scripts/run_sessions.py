@@ -0,0 +1,211 @@
+import os
+import re
+import sys
+import json
+import time
+import codecs
+import shutil
+import signal
+import asyncio
+import argparse
+import tempfile
+
+try:
+    import pty
+    import termios
+except ImportError:  # Windows
+    pty = termios = None
+
+from course_tree import read_json
+from run_solutions import (BOOTSTRAP, DEFAULT_ROOT, SANDBOX_FLAGS, SOLUTION_NAME, SandboxConfig, find_solutions,
+                           sandbox_env, sandbox_limits, tail)
+
+DEFAULT_STEP_TIMEOUT = 5.0
+
+def describe_step(step):
+    if 'expectRegex' in step:
+        return f"/{step['expectRegex']}/"
+    return repr(step.get('expect', ''))
+
+def step_pattern(step):
+    if 'expectRegex' in step:
+        return re.compile(step['expectRegex'])
+    if step.get('expect'):
+        return re.compile(re.escape(step['expect']))
+    return None
+
+class Terminal:
+    """The controlling side of a pseudo-terminal: collects output and types input."""
+
+    def __init__(self, master_fd):
+        self.fd = master_fd
+        self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self.output = ''
+        self.transcript = []
+        self.position = 0
+        self.eof = False
+        self.changed = asyncio.Event()
+
+    def read(self):
+        try:
+            data = os.read(self.fd, 65536)
+        except OSError:
+            # Linux reports EIO once every process has closed the other side
+            data = b''
+        if data:
+            text = self.decoder.decode(data).replace('\r\n', '\n')
+            self.output += text
+            self.transcript.append(text)
+        else:
+            self.eof = True
+            asyncio.get_running_loop().remove_reader(self.fd)
+        self.changed.set()
+
+    def send(self, text):
+        self.transcript.append(text + '\n')
+        os.write(self.fd, (text + '\n').encode('utf-8'))
+
+    async def expect(self, pattern, deadline):
+        """Waits for pattern in the output not yet matched. Returns the match, or None on EOF or deadline."""
+        while True:
+            match = pattern.search(self.output, self.position)
+            if match:
+                self.position = match.end()
+                return match
+            remaining = deadline - time.perf_counter()
+            if self.eof or remaining <= 0:
+                return None
+            self.changed.clear()
+            try:
+                await asyncio.wait_for(self.changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    def last_line(self):
+        lines = self.output.strip().splitlines()
+        return lines[-1] if lines else ''
+
+async def drive(proc, terminal, session, deadline, step_timeout):
+    """Plays a session's steps. Returns (status, detail, failing step number or None)."""
+    for number, step in enumerate(session.get('steps', []), 1):
+        pattern = step_pattern(step)
+        if pattern is not None:
+            step_deadline = min(time.perf_counter() + step.get('timeout', step_timeout), deadline)
+            if await terminal.expect(pattern, step_deadline) is None:
+                if terminal.eof:
+                    return 'failed', f"program ended before {describe_step(step)}: {terminal.last_line()}", number
+                return 'timeout', f"no {describe_step(step)} after {step.get('timeout', step_timeout):g}s", number
+        if 'send' in step:
+            terminal.send(step['send'])
+    try:
+        await asyncio.wait_for(proc.wait(), max(0.0, deadline - time.perf_counter()))
+    except asyncio.TimeoutError:
+        return 'timeout', 'program still running after the last step', None
+    expected_exit = session.get('exitCode', 0)
+    if proc.returncode != expected_exit:
+        return 'error', f"exit status {proc.returncode}: {terminal.last_line()}", None
+    return 'passed', '', None
+
+async def run_session(path, session, config, step_timeout=DEFAULT_STEP_TIMEOUT):
+    """
+    Runs a solution under a pseudo-terminal in the same sandbox as
+    run_solutions.run_solution() and plays one session against it.
+    """
+    loop = asyncio.get_running_loop()
+    scratch = tempfile.mkdtemp(prefix='session-')
+    master, slave = pty.openpty()
+    proc = None
+    try:
+        # Typed input isn't echoed back, so expectations only ever see program output
+        attrs = termios.tcgetattr(slave)
+        attrs[3] &= ~termios.ECHO
+        termios.tcsetattr(slave, termios.TCSANOW, attrs)
+        script = os.path.join(scratch, SOLUTION_NAME)
+        shutil.copyfile(path, script)
+        env = sandbox_env(scratch)
+        env['TERM'] = 'dumb'
+        start = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            config.python, *SANDBOX_FLAGS, '-c', BOOTSTRAP, *map(str, sandbox_limits(config)), script,
+            stdin=slave, stdout=slave, stderr=slave, cwd=scratch, env=env, start_new_session=True)
+        os.close(slave)
+        slave = None
+        terminal = Terminal(master)
+        loop.add_reader(master, terminal.read)
+        deadline = start + session.get('timeout', config.timeout)
+        status, detail, step = await drive(proc, terminal, session, deadline, step_timeout)
+        return {
+            'session': session.get('id', ''),
+            'status': status,
+            'detail': detail,
+            'step': step,
+            'seconds': round(time.perf_counter() - start, 4),
+            'transcript': tail(''.join(terminal.transcript)),
+        }
+    finally:
+        loop.remove_reader(master)
+        if proc is not None and proc.returncode is None:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            await proc.wait()
+        for fd in (master, slave):
+            if fd is not None:
+                os.close(fd)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+def find_sessions(root):
+    """Returns [(relative challenge dir, solution path, session)] for challenges that define sessions."""
+    found = []
+    for rel_dir, path in find_solutions(root):
+        challenge_path = os.path.join(os.path.dirname(path), 'challenge.json')
+        if not os.path.exists(challenge_path):
+            continue
+        for session in read_json(challenge_path).get('sessions') or []:
+            found.append((rel_dir, path, session))
+    return found
+
+async def run_all(sessions, config, jobs, step_timeout=DEFAULT_STEP_TIMEOUT):
+    """Runs every session concurrently, at most jobs at a time. Returns results in input order."""
+    limit = asyncio.Semaphore(jobs)
+
+    async def run_one(rel_dir, path, session):
+        async with limit:
+            result = await run_session(path, session, config, step_timeout)
+        result['challenge'] = rel_dir
+        if result['status'] != 'passed':
+            where = f" step {result['step']}" if result['step'] else ''
+            print(f"{result['status']:<8} {rel_dir} [{result['session']}]{where}: {result['detail']}")
+        return result
+
+    return await asyncio.gather(*(run_one(*entry) for entry in sessions))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive interactive challenge solutions through a pseudo-terminal using the sessions in their challenge.json.")
+    parser.add_argument('root', nargs='?', default=DEFAULT_ROOT, help="Directory searched for challenges (default: the Python course)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="Concurrent sessions (default: 4 per CPU)")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Seconds per session unless it sets its own (default: 30)")
+    parser.add_argument('--step-timeout', type=float, default=DEFAULT_STEP_TIMEOUT, help="Seconds to wait for each expectation")
+    parser.add_argument('--memory', type=int, default=512)
+    parser.add_argument('--json', help="Write a JSON report to this path")
+    args = parser.parse_args()
+
+    if pty is None:
+        print("Error: pseudo-terminals are only available on POSIX systems.")
+        sys.exit(1)
+
+    sessions = find_sessions(args.root)
+    config = SandboxConfig(args.timeout, args.memory)
+    start = time.perf_counter()
+    # Sessions mostly wait on the program, so more of them than CPUs can run at once
+    results = asyncio.run(run_all(sessions, config, args.jobs or 4 * (os.cpu_count() or 1), args.step_timeout))
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'root': args.root, 'results': results}, f, indent=2)
+    passed = sum(1 for r in results if r['status'] == 'passed')
+    print(f"Ran {len(results)} sessions in {elapsed:.1f}s: {passed} passed, {len(results) - passed} failed")
+    sys.exit(0 if passed == len(results) else 1)
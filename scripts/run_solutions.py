@@ -0,0 +1,590 @@
+import io
+import os
+import sys
+import json
+import codecs
+import time
+import shutil
+import queue
+import signal
+import hashlib
+import argparse
+import contextlib
+import tempfile
+import threading
+import subprocess
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from course_tree import COURSES_ROOT
+
+DEFAULT_ROOT = os.path.join(COURSES_ROOT, 'python')
+DEFAULT_CACHE = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'build', 'solution-cache.json'))
+SOLUTION_NAME = 'solution.py'
+ZYGOTE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solution_zygote.py')
+
+# Imported once by the fork server instead of by every solution. Modules that
+# aren't installed are skipped.
+DEFAULT_PRELOAD = [
+    'asyncio', 'dataclasses', 'datetime', 'decimal', 'json', 're', 'typing',
+    'fastapi', 'sqlalchemy.ext.asyncio', 'pydantic', 'passlib.context', 'jwt',
+    'rich', 'typer', 'asyncpg',
+]
+
+# Bump when the sandbox or result classification changes to invalidate cached results
+RUNNER_VERSION = 2
+
+# Interpreter flags for every sandboxed run. Not -I: it implies -E, which
+# would ignore the PYTHON* settings in sandbox_env(). The environment is
+# built from scratch anyway, so -s (no user site-packages) is all that's left.
+SANDBOX_FLAGS = ['-s']
+
+# Runs inside the sandboxed interpreter: applies resource limits, then runs the
+# solution as __main__ from the scratch directory.
+BOOTSTRAP = '''
+import os, sys, runpy
+memory, cpu, fsize = (int(v) for v in sys.argv[1:4])
+try:
+    import resource
+except ImportError:
+    resource = None
+if resource is not None:
+    if memory:
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
+script = sys.argv[4]
+sys.argv = sys.argv[4:]
+sys.path.insert(0, os.path.dirname(script))
+runpy.run_path(script, run_name='__main__')
+'''
+
+# Prints the interpreter version, every installed distribution and the mtime
+# of each sys.path entry, which also catches modules installed without metadata.
+INSTALLED_PROBE = '''
+import os, sys, json, importlib.metadata
+packages = sorted({(d.metadata['Name'] or '', d.version or '') for d in importlib.metadata.distributions()})
+mtimes = [(p, os.stat(p).st_mtime_ns) for p in sys.path if p and os.path.isdir(p)]
+print(json.dumps([sys.version, packages, mtimes]))
+'''
+
+# Statuses that make the run fail; the others point at the environment or at
+# solutions that need input, and only fail with --strict.
+FAILING = {'failed', 'timeout', 'resource-limit'}
+OUTPUT_LIMIT = 4096
+
+class SandboxConfig:
+    """Limits applied to every solution run."""
+
+    def __init__(self, timeout=10.0, memory_mb=512, max_file_mb=16, python=sys.executable, environment=''):
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.max_file_mb = max_file_mb
+        self.python = python
+        # Digest of the per-lesson environments solutions run in, if any
+        self.environment = environment
+
+    def digest(self):
+        """
+        Identifies everything besides the solution itself that affects a
+        result, including what's installed, so that missing-module results
+        expire once the module is installed.
+        """
+        installed = subprocess.run([self.python, *SANDBOX_FLAGS, '-c', INSTALLED_PROBE],
+                                   capture_output=True, text=True).stdout.strip()
+        key = json.dumps([RUNNER_VERSION, installed, self.timeout, self.memory_mb, self.max_file_mb, self.environment])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def find_solutions(root):
+    """Yields (relative challenge dir, solution path) for every solution.py below root."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if SOLUTION_NAME in filenames:
+            rel_dir = os.path.relpath(dirpath, root).replace(os.sep, '/')
+            yield rel_dir, os.path.join(dirpath, SOLUTION_NAME)
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def sandbox_env(scratch):
+    """A minimal environment: nothing from the caller besides PATH leaks into the run."""
+    env = {
+        'PATH': os.environ.get('PATH', ''),
+        'HOME': scratch,
+        'TMPDIR': scratch,
+        'TEMP': scratch,
+        'TMP': scratch,
+        'PYTHONHASHSEED': '0',
+        'PYTHONDONTWRITEBYTECODE': '1',
+        'PYTHONIOENCODING': 'utf-8',
+        'NO_COLOR': '1',
+    }
+    if 'SYSTEMROOT' in os.environ:
+        # Windows can't start Python without it
+        env['SYSTEMROOT'] = os.environ['SYSTEMROOT']
+    return env
+
+def tail(text, limit=OUTPUT_LIMIT):
+    return text if len(text) <= limit else '...' + text[-limit:]
+
+def classify(returncode, stderr):
+    """Maps a finished run to (status, detail)."""
+    if returncode == 0:
+        return 'passed', ''
+    lines = stderr.strip().splitlines()
+    last = lines[-1] if lines else ''
+    if last.startswith('ModuleNotFoundError:'):
+        return 'missing-module', last.split(':', 1)[1].strip()
+    if last.startswith('EOFError'):
+        return 'needs-input', 'reads from stdin'
+    if last.startswith('MemoryError') or returncode in (-getattr(signal, 'SIGXCPU', 0), -getattr(signal, 'SIGXFSZ', 0)):
+        return 'resource-limit', last or f"killed by signal {-returncode}"
+    if returncode < 0:
+        return 'failed', f"killed by signal {-returncode}"
+    return 'failed', last or f"exit status {returncode}"
+
+def kill_tree(proc):
+    """Kills a sandboxed process along with anything it started."""
+    if hasattr(os, 'killpg'):
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+            return
+        except OSError:
+            pass
+    proc.kill()
+
+def sandbox_limits(config):
+    """[address space bytes, CPU seconds, max file bytes] applied inside the sandbox."""
+    return [config.memory_mb * 1024 * 1024, max(1, int(config.timeout + 0.999)), config.max_file_mb * 1024 * 1024]
+
+def build_result(returncode, timed_out, seconds, stdout, stderr, scratch, config):
+    stdout = stdout.decode('utf-8', 'replace')
+    stderr = stderr.decode('utf-8', 'replace').replace(scratch + os.sep, '')
+    if timed_out:
+        status, detail = 'timeout', f"no exit after {config.timeout:g}s"
+    else:
+        status, detail = classify(returncode, stderr)
+    return {
+        'status': status,
+        'detail': detail,
+        'seconds': round(seconds, 4),
+        'returncode': returncode,
+        'stdout': tail(stdout),
+        'stderr': tail(stderr),
+    }
+
+def run_solution(path, config, stdin_data=None):
+    """
+    Runs one solution in a fresh interpreter inside a scratch directory that
+    is deleted afterwards. Returns a result dict with status, detail, seconds,
+    returncode, stdout and stderr.
+    """
+    scratch = tempfile.mkdtemp(prefix='solution-')
+    try:
+        script = os.path.join(scratch, SOLUTION_NAME)
+        shutil.copyfile(path, script)
+        args = [config.python, *SANDBOX_FLAGS, '-c', BOOTSTRAP, *map(str, sandbox_limits(config)), script]
+        start = time.perf_counter()
+        # A new session lets a timeout kill the whole process group
+        proc = subprocess.Popen(args, cwd=scratch, env=sandbox_env(scratch),
+                                stdin=subprocess.PIPE if stdin_data is not None else subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                start_new_session=hasattr(os, 'setsid'))
+        try:
+            stdout, stderr = proc.communicate(stdin_data.encode('utf-8') if stdin_data is not None else None,
+                                              timeout=config.timeout)
+            timed_out = False
+        except subprocess.TimeoutExpired:
+            kill_tree(proc)
+            stdout, stderr = proc.communicate()
+            timed_out = True
+        return build_result(proc.returncode, timed_out, time.perf_counter() - start, stdout, stderr, scratch, config)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+def _pump(stream, chunks):
+    while True:
+        chunk = stream.read1(65536)
+        chunks.put(chunk)
+        if not chunk:
+            return
+
+def _feed(stream, data):
+    try:
+        stream.write(data)
+        stream.close()
+    except OSError:
+        pass  # The solution exited without reading all of it
+
+def run_solution_streaming(path, config, consume, stdin_data=None):
+    """
+    Like run_solution(), but hands stdout to consume(text) as it arrives.
+    When consume returns False the run is killed and reported as 'stopped'.
+    """
+    scratch = tempfile.mkdtemp(prefix='solution-')
+    try:
+        script = os.path.join(scratch, SOLUTION_NAME)
+        shutil.copyfile(path, script)
+        args = [config.python, *SANDBOX_FLAGS, '-c', BOOTSTRAP, *map(str, sandbox_limits(config)), script]
+        with tempfile.TemporaryFile() as stderr_file:
+            start = time.perf_counter()
+            proc = subprocess.Popen(args, cwd=scratch, env=sandbox_env(scratch),
+                                    stdin=subprocess.PIPE if stdin_data is not None else subprocess.DEVNULL,
+                                    stdout=subprocess.PIPE, stderr=stderr_file,
+                                    start_new_session=hasattr(os, 'setsid'))
+            # Threads, so neither a solution that never reads stdin nor the
+            # timeout can block on a pipe
+            if stdin_data is not None:
+                threading.Thread(target=_feed, args=(proc.stdin, stdin_data.encode('utf-8')), daemon=True).start()
+            chunks = queue.Queue()
+            threading.Thread(target=_pump, args=(proc.stdout, chunks), daemon=True).start()
+            decoder = codecs.getincrementaldecoder('utf-8')('replace')
+            captured = []
+            deadline = start + config.timeout
+            timed_out = stopped = False
+            while True:
+                try:
+                    chunk = chunks.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    timed_out = True
+                    break
+                captured.append(chunk)
+                if consume(decoder.decode(chunk, final=not chunk)) is False:
+                    stopped = True
+                    break
+                if not chunk:
+                    break
+            if not (timed_out or stopped):
+                try:
+                    # stdout can close before the process exits
+                    proc.wait(timeout=max(0.0, deadline - time.perf_counter()))
+                except subprocess.TimeoutExpired:
+                    timed_out = True
+            if timed_out or stopped:
+                kill_tree(proc)
+            proc.wait()
+            seconds = time.perf_counter() - start
+            stderr_file.seek(0)
+            stderr = stderr_file.read()
+        result = build_result(proc.returncode, timed_out, seconds, b''.join(captured), stderr, scratch, config)
+        if stopped:
+            result.update(status='stopped', detail='stopped early by the caller')
+        return result
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+class ForkServer:
+    """
+    Runs solutions as children forked from solution_zygote.py, which has
+    already imported the preload modules. Each child gets the same sandbox
+    as run_solution(): its own scratch directory, environment, process group,
+    limits and timeout. POSIX only.
+    """
+
+    def __init__(self, config, preload=DEFAULT_PRELOAD):
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("The fork server needs os.fork(); run without --forkserver")
+        self.home = tempfile.mkdtemp(prefix='forkserver-')
+        self.proc = subprocess.Popen([config.python, *SANDBOX_FLAGS, ZYGOTE_PATH, *preload], cwd=self.home,
+                                     env=sandbox_env(self.home), stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE, start_new_session=True)
+        ready = json.loads(self.proc.stdout.readline() or '{}')
+        if not ready.get('ready'):
+            self.close()
+            raise RuntimeError("Fork server failed to start")
+        self.preloaded = ready['preloaded']
+        self.preload_failures = ready['failed']
+        self.lock = threading.Lock()
+        self.replies = {}
+        self.next_id = 0
+        self.alive = True
+        self.warned = False
+        self.reader = threading.Thread(target=self._read_replies, daemon=True)
+        self.reader.start()
+
+    def _read_replies(self):
+        try:
+            for line in self.proc.stdout:
+                message = json.loads(line)
+                replies = self.replies.get(message['id'])
+                if replies is not None:
+                    replies.put(message)
+        except (ValueError, KeyError):
+            pass  # A garbled reply means the server can't be trusted any more
+        finally:
+            # The server is gone: fail everything still waiting and refuse new requests
+            with self.lock:
+                self.alive = False
+                pending = list(self.replies.values())
+            for replies in pending:
+                replies.put({'pid': None, 'status': None})
+
+    def _request(self, request):
+        """Sends a request and returns (id, reply queue), or (None, None) when the server has exited."""
+        replies = queue.Queue()
+        with self.lock:
+            if not self.alive:
+                return None, None
+            request['id'] = self.next_id
+            self.next_id += 1
+            self.replies[request['id']] = replies
+            try:
+                self.proc.stdin.write((json.dumps(request) + '\n').encode('utf-8'))
+                self.proc.stdin.flush()
+            except OSError:
+                self.replies.pop(request['id'])
+                return None, None
+        return request['id'], replies
+
+    def run(self, path, config, stdin_data=None):
+        """Same contract as run_solution(), which it falls back to once the server has exited."""
+        run_dir = tempfile.mkdtemp(prefix='solution-')
+        try:
+            # Captured output lives next to the scratch directory, not in it
+            scratch = os.path.join(run_dir, 'work')
+            os.mkdir(scratch)
+            script = os.path.join(scratch, SOLUTION_NAME)
+            shutil.copyfile(path, script)
+            stdin_path = None
+            if stdin_data is not None:
+                stdin_path = os.path.join(run_dir, 'stdin')
+                with open(stdin_path, 'w', encoding='utf-8') as f:
+                    f.write(stdin_data)
+            stdout_path = os.path.join(run_dir, 'stdout')
+            stderr_path = os.path.join(run_dir, 'stderr')
+            start = time.perf_counter()
+            request_id, replies = self._request({
+                'script': script, 'cwd': scratch, 'env': sandbox_env(scratch), 'limits': sandbox_limits(config),
+                'stdin': stdin_path, 'stdout': stdout_path, 'stderr': stderr_path,
+            })
+            if replies is None:
+                return self._fallback(path, config, stdin_data)
+            try:
+                pid = replies.get()['pid']
+                status = None
+                timed_out = False
+                if pid is not None:
+                    try:
+                        status = replies.get(timeout=max(0.0, config.timeout - (time.perf_counter() - start)))['status']
+                    except queue.Empty:
+                        try:
+                            os.killpg(pid, signal.SIGKILL)
+                        except OSError:
+                            pass
+                        status = replies.get()['status']
+                        timed_out = True
+            finally:
+                self.replies.pop(request_id, None)
+            if status is None:
+                if pid is not None:
+                    # Nobody is left to reap or time out the child the server forked
+                    try:
+                        os.killpg(pid, signal.SIGKILL)
+                    except OSError:
+                        pass
+                return self._fallback(path, config, stdin_data)
+            seconds = time.perf_counter() - start
+            outputs = []
+            for output_path in (stdout_path, stderr_path):
+                with open(output_path, 'rb') as f:
+                    outputs.append(f.read())
+            return build_result(os.waitstatus_to_exitcode(status), timed_out, seconds, *outputs, scratch, config)
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    def _fallback(self, path, config, stdin_data):
+        if not self.warned:
+            self.warned = True
+            print("Warning: the fork server exited; running the remaining solutions cold.", file=sys.stderr)
+        return run_solution(path, config, stdin_data)
+
+    def close(self):
+        if self.proc.stdin:
+            self.proc.stdin.close()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            kill_tree(self.proc)
+            self.proc.wait()
+        shutil.rmtree(self.home, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def load_cache(path, config_digest):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('configDigest') != config_digest:
+        return {}
+    return cache.get('results', {})
+
+def save_cache(path, config_digest, results):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'configDigest': config_digest, 'results': results}, f)
+    os.replace(path + '.tmp', path)
+
+def run_all(root, config, jobs=None, cache_path=DEFAULT_CACHE, use_cache=True, runner=run_solution):
+    """
+    Runs every solution below root. Solutions whose content hash has a cached
+    result are skipped. Returns {relative challenge dir: result}, in tree order.
+    """
+    config_digest = config.digest()
+    cached = load_cache(cache_path, config_digest) if use_cache else {}
+
+    results = {}
+    pending = []
+    for rel_dir, path in find_solutions(root):
+        digest = file_digest(path)
+        entry = cached.get(rel_dir)
+        if entry is not None and entry['sha256'] == digest:
+            results[rel_dir] = dict(entry, cached=True)
+        else:
+            results[rel_dir] = None
+            pending.append((rel_dir, path, digest))
+
+    # Every run is its own subprocess, so threads are enough to keep them all busy
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = [(rel_dir, digest, pool.submit(runner, path, config)) for rel_dir, path, digest in pending]
+        for rel_dir, digest, future in futures:
+            result = future.result()
+            results[rel_dir] = dict(result, sha256=digest, cached=False)
+            if result['status'] != 'passed':
+                print(f"{result['status']:<15} {rel_dir}: {result['detail']}")
+
+    if use_cache:
+        save_cache(cache_path, config_digest, {rel_dir: {k: v for k, v in r.items() if k != 'cached'}
+                                               for rel_dir, r in results.items()})
+    return results
+
+def summarize(results):
+    counts = {}
+    for result in results.values():
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    return counts
+
+def write_json_report(path, root, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'root': root, 'summary': summarize(results), 'results': results}, f, indent=2)
+
+def write_junit_report(path, results, strict=False):
+    """One <testcase> per solution; non-failing statuses are reported as skipped unless strict."""
+    suite = ET.Element('testsuite', name='solutions', tests=str(len(results)))
+    failures = skipped = 0
+    total = 0.0
+    for rel_dir, result in results.items():
+        classname, _, name = rel_dir.rpartition('/challenges/')
+        case = ET.SubElement(suite, 'testcase', classname=classname.replace('/', '.') or rel_dir,
+                             name=name or rel_dir, time=f"{result['seconds']:.3f}")
+        total += result['seconds']
+        status = result['status']
+        if status == 'passed':
+            continue
+        if status in FAILING or strict:
+            failures += 1
+            failure = ET.SubElement(case, 'failure', type=status, message=result['detail'])
+            failure.text = result['stderr']
+        else:
+            skipped += 1
+            ET.SubElement(case, 'skipped', message=f"{status}: {result['detail']}")
+        if result['stdout']:
+            ET.SubElement(case, 'system-out').text = result['stdout']
+    suite.set('failures', str(failures))
+    suite.set('skipped', str(skipped))
+    suite.set('time', f"{total:.3f}")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    ET.ElementTree(suite).write(path, encoding='utf-8', xml_declaration=True)
+
+def benchmark(root, config, jobs=None, preload=DEFAULT_PRELOAD):
+    """Runs every solution cold and through the fork server, uncached, and compares wall time and statuses."""
+    timings = {}
+    outcomes = {}
+    for mode in ('cold', 'forkserver'):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if mode == 'cold':
+                outcomes[mode] = run_all(root, config, jobs, use_cache=False)
+            else:
+                # Server start-up, including the preloads, counts against the fork server
+                with ForkServer(config, preload) as server:
+                    outcomes[mode] = run_all(root, config, jobs, use_cache=False, runner=server.run)
+                    preloaded = server.preloaded
+        timings[mode] = time.perf_counter() - start
+
+    count = len(outcomes['cold'])
+    print(f"Preloaded: {', '.join(preloaded) or 'nothing'}")
+    for mode, seconds in timings.items():
+        per_run = sum(r['seconds'] for r in outcomes[mode].values()) / count if count else 0.0
+        print(f"{mode:<11} {seconds:7.2f}s wall  {per_run * 1000:7.1f}ms per solution")
+    saved = timings['cold'] - timings['forkserver']
+    print(f"Saved {saved:.2f}s ({saved / timings['cold'] * 100:.0f}%) across {count} solutions")
+    differing = [rel_dir for rel_dir, result in outcomes['cold'].items()
+                 if outcomes['forkserver'][rel_dir]['status'] != result['status']]
+    for rel_dir in differing:
+        print(f"Status differs: {rel_dir}: {outcomes['cold'][rel_dir]['status']} cold, "
+              f"{outcomes['forkserver'][rel_dir]['status']} with fork server")
+    return not differing
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every challenge solution.py in a sandboxed subprocess and report the results.")
+    parser.add_argument('root', nargs='?', default=DEFAULT_ROOT, help="Directory searched for solution.py files (default: the Python course)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="Concurrent runs (default: CPU count)")
+    parser.add_argument('--timeout', type=float, default=10.0, help="Wall-clock seconds per solution (default: 10)")
+    parser.add_argument('--memory', type=int, default=512, help="Address-space limit in MB, 0 for none (default: 512)")
+    parser.add_argument('--python', default=sys.executable, help="Interpreter used to run solutions")
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help="Result cache keyed by solution content hash")
+    parser.add_argument('--no-cache', action='store_true', help="Run every solution and don't update the cache")
+    parser.add_argument('--json', help="Write a JSON report to this path")
+    parser.add_argument('--junit', help="Write a JUnit XML report to this path")
+    parser.add_argument('--strict', action='store_true', help="Also fail on missing modules and solutions that need input")
+    parser.add_argument('--forkserver', action='store_true', help="Fork each run from a server with --preload modules already imported (POSIX)")
+    parser.add_argument('--preload', nargs='*', default=DEFAULT_PRELOAD, help="Modules the fork server imports up front")
+    parser.add_argument('--bench', action='store_true', help="Compare cold runs against the fork server instead of reporting")
+    parser.add_argument('--envs', help="Run each lesson in its environment from this solution_envs.py plan")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"Error: {args.root} is not a directory.")
+        sys.exit(1)
+
+    if args.envs and (args.forkserver or args.bench):
+        print("Error: --envs can't be combined with the fork server.")
+        sys.exit(1)
+
+    config = SandboxConfig(args.timeout, args.memory, python=args.python)
+    if args.bench:
+        sys.exit(0 if benchmark(args.root, config, args.jobs, args.preload) else 1)
+
+    start = time.perf_counter()
+    if args.forkserver:
+        # Results are interchangeable with cold runs, so they share the cache
+        with ForkServer(config, args.preload) as server:
+            results = run_all(args.root, config, args.jobs, args.cache, not args.no_cache, runner=server.run)
+    elif args.envs:
+        from solution_envs import EnvRunner, load_plan
+        envs = EnvRunner(load_plan(args.envs))
+        config.environment = envs.digest()
+        results = run_all(args.root, config, args.jobs, args.cache, not args.no_cache, runner=envs.run)
+    else:
+        results = run_all(args.root, config, args.jobs, args.cache, not args.no_cache)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        write_json_report(args.json, args.root, results)
+    if args.junit:
+        write_junit_report(args.junit, results, args.strict)
+
+    counts = summarize(results)
+    cached = sum(1 for r in results.values() if r['cached'])
+    print(f"Ran {len(results) - cached:,} solutions ({cached:,} cached) in {elapsed:.1f}s: "
+          + ', '.join(f"{count} {status}" for status, count in sorted(counts.items())))
+    failing = FAILING if not args.strict else set(counts) - {'passed'}
+    sys.exit(1 if any(status in failing for status in counts) else 0)
@@ -0,0 +1,348 @@
+import os
+import re
+import sys
+import math
+import mmap
+import time
+import heapq
+import pickle
+import argparse
+from array import array
+from collections import Counter
+
+from course_tree import (
+    COURSES_ROOT, find_course_dirs, hints_text, iter_course_lessons, list_dirs, list_files,
+    mistakes_text, read_json, read_text,
+)
+from frontmatter import parse_frontmatter
+
+DEFAULT_INDEX_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'build', 'search-index'))
+INDEX_VERSION = 3
+
+# BM25F: each field's term frequencies and length are scaled by its boost
+FIELD_BOOSTS = {
+    'title': 3.0,
+    'body': 1.0,
+    'hints': 0.7,
+    'mistakes': 0.5,
+}
+K1 = 1.2
+B = 0.75
+
+TOKEN_RE = re.compile(r'\w+')
+STOPWORDS = frozenset(
+    'a an and are as at be but by for from has have if in into is it its not of on or '
+    'so than that the their then there these this to was were will with you your'.split()
+)
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+def weigh_fields(fields):
+    """
+    Tokenizes a document's fields and returns (length, {term: weighted tf}),
+    where each field's counts and length are scaled by its boost.
+    """
+    weighted = Counter()
+    length = 0.0
+    for field, text in fields.items():
+        if not text:
+            continue
+        boost = FIELD_BOOSTS[field]
+        counts = Counter(tokenize(text))
+        length += boost * sum(counts.values())
+        for term, tf in counts.items():
+            weighted[term] += boost * tf
+    return length, dict(weighted)
+
+def lesson_fingerprint(lesson_dir):
+    """(relative path, size, mtime_ns) for every file in a lesson; changes when any file does."""
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(lesson_dir):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            st = os.stat(path)
+            entries.append((os.path.relpath(path, lesson_dir), st.st_size, st.st_mtime_ns))
+    return tuple(entries)
+
+def lesson_documents(courses_root, course_name, lesson_dir):
+    """
+    Tokenizes one lesson into documents: the lesson itself, each content
+    section and each challenge. Returns [(doc info, length, weighted tfs)].
+    """
+    lesson = read_json(os.path.join(lesson_dir, 'lesson.json'))
+    lesson_id = lesson.get('id')
+    rel_dir = os.path.relpath(lesson_dir, courses_root).replace(os.sep, '/')
+
+    def doc(kind, path, title, fields):
+        info = {
+            'course': course_name,
+            'lesson': lesson_id,
+            'lessonTitle': lesson.get('title'),
+            'kind': kind,
+            'title': title,
+            'path': path,
+        }
+        return (info, *weigh_fields(fields))
+
+    docs = [doc('lesson', rel_dir + '/lesson.json', lesson.get('title'),
+                {'title': lesson.get('title'), 'body': lesson.get('description')})]
+
+    content_dir = os.path.join(lesson_dir, 'content')
+    for name in list_files(content_dir, '.md'):
+        meta, body = parse_frontmatter(read_text(os.path.join(content_dir, name)))
+        docs.append(doc('section', f'{rel_dir}/content/{name}', meta.get('title'),
+                        {'title': meta.get('title'), 'body': body}))
+
+    challenges_dir = os.path.join(lesson_dir, 'challenges')
+    for name in list_dirs(challenges_dir):
+        json_path = os.path.join(challenges_dir, name, 'challenge.json')
+        if not os.path.exists(json_path):
+            continue
+        challenge = read_json(json_path)
+        hints = hints_text(challenge.get('hints'), ' ')
+        mistakes = mistakes_text(challenge.get('commonMistakes'), ' ')
+        docs.append(doc('challenge', f'{rel_dir}/challenges/{name}/challenge.json', challenge.get('title'), {
+            'title': challenge.get('title'),
+            'body': challenge.get('description') or challenge.get('instructions') or challenge.get('question'),
+            'hints': hints,
+            'mistakes': mistakes,
+        }))
+    return docs
+
+def load_pickle(path, default):
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return default
+
+def write_pickle(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def refresh_lessons(courses_root, cached_lessons, only=None):
+    """
+    Returns ({lesson key: {'fingerprint', 'docs'}}, number re-indexed).
+    Lessons whose files are unchanged reuse their cached entry. With only, a
+    set of lesson keys, the other lessons are taken from the cache as they
+    are, without looking at their files.
+    """
+    lessons = {}
+    reindexed = 0
+    for course_dir in find_course_dirs(courses_root):
+        course_name = os.path.basename(course_dir)
+        for _, lesson_dir in iter_course_lessons(course_dir):
+            key = os.path.relpath(lesson_dir, courses_root).replace(os.sep, '/')
+            cached = cached_lessons.get(key)
+            if only is not None and key not in only:
+                if cached is not None:
+                    lessons[key] = cached
+                continue
+            if not os.path.exists(os.path.join(lesson_dir, 'lesson.json')):
+                continue
+            fingerprint = lesson_fingerprint(lesson_dir)
+            if cached is not None and cached['fingerprint'] == fingerprint:
+                lessons[key] = cached
+                continue
+            lessons[key] = {'fingerprint': fingerprint, 'docs': lesson_documents(courses_root, course_name, lesson_dir)}
+            reindexed += 1
+    return lessons, reindexed
+
+def write_index(index_dir, lessons):
+    """Writes index.pickle and postings.bin for the given lessons. Returns (documents, terms)."""
+    # Assemble postings: term -> (doc ids, weighted term frequencies)
+    docs = []
+    doc_lengths = array('f')
+    postings = {}
+    for key in sorted(lessons):
+        for info, length, weighted in lessons[key]['docs']:
+            doc_id = len(docs)
+            docs.append(info)
+            doc_lengths.append(length)
+            for term, tf in weighted.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = (array('I'), array('f'))
+                entry[0].append(doc_id)
+                entry[1].append(tf)
+
+    # Postings go into one flat file read through mmap at query time
+    terms = {}
+    postings_path = os.path.join(index_dir, 'postings.bin')
+    with open(postings_path + '.tmp', 'wb') as f:
+        offset = 0
+        for term in sorted(postings):
+            doc_ids, tfs = postings[term]
+            f.write(doc_ids.tobytes())
+            f.write(tfs.tobytes())
+            terms[term] = (offset, len(doc_ids))
+            offset += len(doc_ids) * (doc_ids.itemsize + tfs.itemsize)
+    os.replace(postings_path + '.tmp', postings_path)
+
+    write_pickle(os.path.join(index_dir, 'index.pickle'), {
+        'version': INDEX_VERSION,
+        'docs': docs,
+        'doc_lengths': doc_lengths,
+        'avg_length': (sum(doc_lengths) / len(doc_lengths)) if docs else 0.0,
+        'terms': terms,
+    })
+    return len(docs), len(terms)
+
+def load_lesson_cache(index_dir):
+    cache = load_pickle(os.path.join(index_dir, 'lessons.pickle'), {})
+    return cache.get('lessons', {}) if cache.get('version') == INDEX_VERSION else {}
+
+def save_lesson_cache(index_dir, lessons):
+    write_pickle(os.path.join(index_dir, 'lessons.pickle'), {'version': INDEX_VERSION, 'lessons': lessons})
+
+def build_index(courses_root=COURSES_ROOT, index_dir=DEFAULT_INDEX_DIR, force=False):
+    """
+    Builds or refreshes the index. Lessons whose files are unchanged since the
+    last build reuse their cached token counts; only changed lessons are read
+    and tokenized again.
+    """
+    start = time.perf_counter()
+    os.makedirs(index_dir, exist_ok=True)
+    cached_lessons = {} if force else load_lesson_cache(index_dir)
+    lessons, reindexed = refresh_lessons(courses_root, cached_lessons)
+    removed = len(set(cached_lessons) - set(lessons))
+
+    if not reindexed and not removed and os.path.exists(os.path.join(index_dir, 'index.pickle')):
+        print(f"Search index up to date ({len(lessons)} lessons, {time.perf_counter() - start:.2f}s)")
+        return
+
+    n_docs, n_terms = write_index(index_dir, lessons)
+    save_lesson_cache(index_dir, lessons)
+    print(f"Indexed {n_docs:,} documents from {len(lessons)} lessons "
+          f"({reindexed} re-indexed, {len(lessons) - reindexed} reused, {removed} removed), "
+          f"{n_terms:,} terms in {time.perf_counter() - start:.2f}s")
+
+class SearchIndex:
+    """Loaded search index. Postings are read from a memory map per query term."""
+
+    def __init__(self, index_dir=DEFAULT_INDEX_DIR, courses_root=COURSES_ROOT):
+        self.courses_root = courses_root
+        with open(os.path.join(index_dir, 'index.pickle'), 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Search index in {index_dir} is from another version; rebuild it")
+        self.docs = data['docs']
+        self.doc_lengths = data['doc_lengths']
+        self.avg_length = data['avg_length'] or 1.0
+        self.terms = data['terms']
+        self._file = open(os.path.join(index_dir, 'postings.bin'), 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.terms else None
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def postings(self, term):
+        entry = self.terms.get(term)
+        if entry is None:
+            return array('I'), array('f')
+        offset, count = entry
+        doc_ids = array('I')
+        doc_ids.frombytes(self._map[offset:offset + count * 4])
+        tfs = array('f')
+        tfs.frombytes(self._map[offset + count * 4:offset + count * 8])
+        return doc_ids, tfs
+
+    def search(self, query, limit=10, course=None):
+        """
+        Returns up to limit hits as dicts (course, lesson, lessonTitle, kind,
+        title, path, score, snippet), best-scoring document per lesson.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        n_docs = len(self.docs)
+        scores = {}
+        for term in terms:
+            doc_ids, tfs = self.postings(term)
+            if not doc_ids:
+                continue
+            idf = math.log(1 + (n_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            for doc_id, tf in zip(doc_ids, tfs):
+                norm = K1 * (1 - B + B * self.doc_lengths[doc_id] / self.avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+        best_per_lesson = {}
+        for doc_id, score in scores.items():
+            doc = self.docs[doc_id]
+            if course and doc['course'] != course:
+                continue
+            key = (doc['course'], doc['lesson'])
+            if key not in best_per_lesson or score > best_per_lesson[key][0]:
+                best_per_lesson[key] = (score, doc_id)
+
+        hits = []
+        for score, doc_id in heapq.nlargest(limit, best_per_lesson.values()):
+            hit = dict(self.docs[doc_id])
+            hit['score'] = round(score, 4)
+            hit['snippet'] = self.snippet(hit, terms)
+            hits.append(hit)
+        return hits
+
+    def snippet(self, doc, terms, width=160):
+        """Cuts a window of the document's text around the first query term."""
+        path = os.path.join(self.courses_root, *doc['path'].split('/'))
+        try:
+            if doc['kind'] == 'section':
+                text = parse_frontmatter(read_text(path))[1]
+            elif doc['kind'] == 'challenge':
+                data = read_json(path)
+                text = data.get('description') or data.get('instructions') or ''
+            else:
+                text = read_json(path).get('description') or ''
+        except (OSError, ValueError):
+            return ''
+        text = ' '.join(text.split())
+        lowered = text.lower()
+        positions = [p for p in (lowered.find(t) for t in terms) if p >= 0]
+        start = max(0, min(positions) - width // 3) if positions else 0
+        window = text[start:start + width]
+        return ('...' if start else '') + window + ('...' if start + width < len(text) else '')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full-text search over lessons, sections and challenges of every course.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_cmd = sub.add_parser('build', help="Build or incrementally refresh the index")
+    build_cmd.add_argument('--courses', default=COURSES_ROOT)
+    build_cmd.add_argument('--index', default=DEFAULT_INDEX_DIR)
+    build_cmd.add_argument('--force', action='store_true', help="Re-tokenize every lesson")
+
+    query_cmd = sub.add_parser('query', help="Search the index")
+    query_cmd.add_argument('terms', nargs='+')
+    query_cmd.add_argument('--courses', default=COURSES_ROOT)
+    query_cmd.add_argument('--index', default=DEFAULT_INDEX_DIR)
+    query_cmd.add_argument('--course', help="Only return lessons from this course (e.g. python)")
+    query_cmd.add_argument('-n', '--limit', type=int, default=10)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_index(args.courses, args.index, args.force)
+    elif args.command == 'query':
+        if not os.path.exists(os.path.join(args.index, 'index.pickle')):
+            print(f"Error: no index in {args.index}; run 'search_index.py build' first.")
+            sys.exit(1)
+        with SearchIndex(args.index, args.courses) as index:
+            start = time.perf_counter()
+            hits = index.search(' '.join(args.terms), args.limit, args.course)
+            elapsed = time.perf_counter() - start
+        for hit in hits:
+            print(f"{hit['score']:7.2f}  {hit['course']}/{hit['lesson']}  [{hit['kind']}] {hit['title'] or hit['lessonTitle']}")
+            if hit['snippet']:
+                print(f"         {hit['snippet']}")
+        print(f"{len(hits)} results in {elapsed * 1000:.1f}ms")
@@ -0,0 +1,380 @@
+import os
+import re
+import ast
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from run_solutions import DEFAULT_ROOT, SandboxConfig, run_solution
+
+ENVS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'build', 'envs'))
+DEFAULT_PLAN = os.path.join(ENVS_DIR, 'plan.json')
+LAYER_MARKER = '.layer.json'
+
+# Import name -> PyPI distribution for the third-party packages the courses
+# use. Imports that are neither here nor in the standard library are reported
+# as unresolved instead of guessed at: a lesson's `import models` is its own
+# module, not the `models` package on PyPI.
+PACKAGES = {
+    'aiofiles': 'aiofiles',
+    'alembic': 'alembic',
+    'asgiref': 'asgiref',
+    'asyncpg': 'asyncpg',
+    'django': 'Django',
+    'fastapi': 'fastapi',
+    'flask': 'Flask',
+    'httpx': 'httpx',
+    'jose': 'python-jose',
+    'jwt': 'PyJWT',
+    'passlib': 'passlib',
+    'pydantic': 'pydantic',
+    'pydantic_settings': 'pydantic-settings',
+    'pytest': 'pytest',
+    'pytest_asyncio': 'pytest-asyncio',
+    'requests': 'requests',
+    'rich': 'rich',
+    'sqlalchemy': 'SQLAlchemy',
+    'typer': 'typer',
+    'uvicorn': 'uvicorn',
+    'zstandard': 'zstandard',
+    'yaml': 'PyYAML',
+    'dotenv': 'python-dotenv',
+    'bs4': 'beautifulsoup4',
+    'PIL': 'Pillow',
+}
+
+# Optional dependencies that only specific imports need, keyed by dotted
+# import path; `from pydantic import EmailStr` is 'pydantic.EmailStr'.
+IMPLIED = {
+    'sqlalchemy.ext.asyncio': 'greenlet',
+    'pydantic.EmailStr': 'email-validator',
+    'pydantic.networks.EmailStr': 'email-validator',
+    'fastapi.UploadFile': 'python-multipart',
+    'fastapi.Form': 'python-multipart',
+    'passlib.hash.bcrypt': 'bcrypt',
+    'passlib.context.CryptContext': 'bcrypt',
+}
+
+# SQLAlchemy URL dialect drivers ('sqlite+aiosqlite://...') -> distribution.
+# The driver is loaded from the URL at run time and never imported by name.
+DRIVERS = {
+    'aiosqlite': 'aiosqlite',
+    'asyncpg': 'asyncpg',
+    'psycopg': 'psycopg',
+    'psycopg2': 'psycopg2-binary',
+    'aiomysql': 'aiomysql',
+    'pymysql': 'PyMySQL',
+}
+DRIVER_URL = re.compile(r'^\w+\+(\w+)://')
+
+# Standard library modules added after the oldest Python the courses target
+NEWER_STDLIB = {'compression', 'annotationlib', 'string.templatelib'}
+
+def imported_names(source):
+    """
+    Dotted paths of every absolute import in source, including imports inside
+    functions. `from a.b import c` gives 'a.b' and 'a.b.c'.
+    """
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+            names.add(node.module)
+            names.update(f"{node.module}.{alias.name}" for alias in node.names)
+    return names
+
+def url_drivers(source):
+    """Distributions for the database drivers named in SQLAlchemy URL string literals."""
+    drivers = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            match = DRIVER_URL.match(node.value)
+            if match and match.group(1) in DRIVERS:
+                drivers.add(DRIVERS[match.group(1)])
+    return drivers
+
+def classify_imports(names, local_modules=()):
+    """Splits dotted import paths into (distributions, unresolved top-level names)."""
+    distributions = set()
+    unresolved = set()
+    for dotted, extra in IMPLIED.items():
+        if any(name == dotted or name.startswith(dotted + '.') for name in names):
+            distributions.add(extra)
+    for name in {name.split('.')[0] for name in names}:
+        if name in sys.stdlib_module_names or name in NEWER_STDLIB or name in local_modules or name == '__future__':
+            continue
+        if name in PACKAGES:
+            distributions.add(PACKAGES[name])
+        else:
+            unresolved.add(name)
+    return distributions, unresolved
+
+def lesson_of(rel_path):
+    return rel_path.rpartition('/challenges/')[0] or os.path.dirname(rel_path)
+
+def scan_requirements(root):
+    """
+    {lesson: {'requires': [...], 'unresolved': [...]}} for every lesson below
+    root with Python challenge files, keyed by lesson path relative to root.
+    """
+    lessons = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        sources = sorted(name for name in filenames if name.endswith('.py'))
+        if not sources:
+            continue
+        local_modules = {os.path.splitext(name)[0] for name in sources}
+        names = set()
+        drivers = set()
+        for name in sources:
+            with open(os.path.join(dirpath, name), 'r', encoding='utf-8') as f:
+                source = f.read()
+            try:
+                names |= imported_names(source)
+                drivers |= url_drivers(source)
+            except SyntaxError:
+                continue
+        distributions, unresolved = classify_imports(names, local_modules)
+        distributions |= drivers
+        rel_path = os.path.relpath(os.path.join(dirpath, sources[0]), root).replace(os.sep, '/')
+        entry = lessons.setdefault(lesson_of(rel_path), {'requires': set(), 'unresolved': set()})
+        entry['requires'] |= distributions
+        entry['unresolved'] |= unresolved
+    return {lesson: {'requires': sorted(entry['requires']), 'unresolved': sorted(entry['unresolved'])}
+            for lesson, entry in sorted(lessons.items())}
+
+def layer_key(python_version, parent, packages):
+    key = json.dumps([python_version, parent, sorted(packages)])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+def plan_environments(requirements, root, min_shared=3, python=sys.executable):
+    """
+    Plans the fewest environments that cover every lesson. Packages needed by
+    at least `min_shared` lessons go into one shared base layer; each
+    environment adds a single layer on top with the rest. A lesson whose
+    remaining packages are a subset of another's reuses that environment, so
+    lessons only get their own layer when nothing existing covers them.
+    """
+    python_version = subprocess.run([python, '-c', 'import sys; print(sys.version.split()[0])'],
+                                    capture_output=True, text=True, check=True).stdout.strip()
+    needs = {lesson: frozenset(entry['requires']) for lesson, entry in requirements.items() if entry['requires']}
+    counts = Counter(package for packages in needs.values() for package in packages)
+    common = frozenset(package for package, count in counts.items() if count >= min_shared)
+
+    layers = {}
+    base = None
+    if common:
+        base = layer_key(python_version, None, common)
+        layers[base] = {'parent': None, 'packages': sorted(common)}
+
+    # Largest sets first, so smaller ones can fold into them
+    remainders = sorted({packages - common for packages in needs.values()}, key=lambda s: (-len(s), sorted(s)))
+    tops = []
+    for remainder in remainders:
+        if not remainder or any(remainder <= top for top in tops):
+            continue
+        tops.append(remainder)
+        layers[layer_key(python_version, base, remainder)] = {'parent': base, 'packages': sorted(remainder)}
+
+    lessons = {}
+    for lesson, packages in sorted(needs.items()):
+        remainder = packages - common
+        if not remainder:
+            lessons[lesson] = base
+            continue
+        top = next(top for top in tops if remainder <= top)
+        lessons[lesson] = layer_key(python_version, base, top)
+
+    return {
+        'root': os.path.realpath(root),
+        'python': python,
+        'pythonVersion': python_version,
+        'minShared': min_shared,
+        'layers': layers,
+        'lessons': lessons,
+        'requirements': requirements,
+    }
+
+def layer_dir(key, envs_dir=ENVS_DIR):
+    return os.path.join(envs_dir, 'layers', key)
+
+def layer_python(key, envs_dir=ENVS_DIR):
+    scripts = 'Scripts' if os.name == 'nt' else 'bin'
+    return os.path.join(layer_dir(key, envs_dir), scripts, 'python.exe' if os.name == 'nt' else 'python')
+
+def site_packages(key, envs_dir=ENVS_DIR):
+    # Asked of the layer's own interpreter, whose layout may differ from ours
+    return subprocess.run([layer_python(key, envs_dir), '-c', 'import sysconfig; print(sysconfig.get_path("purelib"))'],
+                          capture_output=True, text=True, check=True).stdout.strip()
+
+def layer_ready(key, envs_dir=ENVS_DIR):
+    return os.path.exists(os.path.join(layer_dir(key, envs_dir), LAYER_MARKER))
+
+def build_layer(key, layers, python, envs_dir=ENVS_DIR, pip_args=()):
+    """
+    Creates the layer's venv and installs its packages. A layer on top of a
+    parent sees the parent's site-packages through a .pth file, so pip skips
+    whatever the parent already provides and the venv holds only the rest.
+    The marker file is written last; a layer without one is rebuilt.
+    """
+    layer = layers[key]
+    venv = layer_dir(key, envs_dir)
+    shutil.rmtree(venv, ignore_errors=True)
+    subprocess.run([python, '-m', 'venv', '--without-pip', venv], check=True, capture_output=True)
+    chain = []
+    parent = layer['parent']
+    while parent is not None:
+        chain.append(site_packages(parent, envs_dir))
+        parent = layers[parent]['parent']
+    if chain:
+        with open(os.path.join(site_packages(key, envs_dir), '_layers.pth'), 'w', encoding='utf-8') as f:
+            f.write(''.join(path + '\n' for path in chain))
+    # pip isn't installed into the layers; the base interpreter's pip targets them
+    install = subprocess.run([python, '-m', 'pip', '--python', layer_python(key, envs_dir), 'install',
+                              '--disable-pip-version-check', '--quiet', *pip_args, *layer['packages']],
+                             capture_output=True, text=True)
+    if install.returncode != 0:
+        raise RuntimeError(f"pip failed for layer {key}: {install.stderr.strip()[-2000:]}")
+    with open(os.path.join(venv, LAYER_MARKER), 'w', encoding='utf-8') as f:
+        json.dump(layer, f)
+
+def build_environments(plan, envs_dir=ENVS_DIR, jobs=4, pip_args=()):
+    """
+    Builds every layer in the plan that isn't already built: parents first,
+    then the top layers in parallel. Layers left over from older plans are
+    removed. Returns {key: seconds or None if cached}.
+    """
+    layers_root = os.path.join(envs_dir, 'layers')
+    if os.path.isdir(layers_root):
+        for key in os.listdir(layers_root):
+            if key not in plan['layers']:
+                shutil.rmtree(os.path.join(layers_root, key), ignore_errors=True)
+    timings = {}
+
+    def build(key):
+        layer = plan['layers'][key]
+        if layer_ready(key, envs_dir):
+            timings[key] = None
+            return
+        start = time.perf_counter()
+        build_layer(key, plan['layers'], plan['python'], envs_dir, pip_args)
+        timings[key] = time.perf_counter() - start
+        print(f"Built layer {key} ({', '.join(layer['packages'])}) in {timings[key]:.1f}s")
+
+    bases = [key for key, layer in plan['layers'].items() if layer['parent'] is None]
+    tops = [key for key, layer in plan['layers'].items() if layer['parent'] is not None]
+    for key in bases:
+        build(key)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for future in [pool.submit(build, key) for key in tops]:
+            future.result()
+    return timings
+
+def load_plan(path=DEFAULT_PLAN):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_plan(plan, path=DEFAULT_PLAN):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+class EnvRunner:
+    """
+    A run_solutions runner that runs each solution with the interpreter of
+    its lesson's environment. Lessons without third-party imports, or whose
+    layer isn't built, use the configured interpreter.
+    """
+
+    def __init__(self, plan, envs_dir=ENVS_DIR):
+        self.root = plan['root']
+        self.python_version = plan['pythonVersion']
+        self.pythons = {lesson: layer_python(key, envs_dir) for lesson, key in plan['lessons'].items()
+                        if key is not None and layer_ready(key, envs_dir)}
+
+    def digest(self):
+        """Identifies the environments in use, for result caches."""
+        key = json.dumps([self.python_version, sorted(self.pythons.items())])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def python_for(self, path):
+        rel_path = os.path.relpath(os.path.realpath(path), self.root).replace(os.sep, '/')
+        return self.pythons.get(lesson_of(rel_path))
+
+    def run(self, path, config):
+        python = self.python_for(path)
+        if python is not None:
+            config = SandboxConfig(config.timeout, config.memory_mb, config.max_file_mb, python, config.environment)
+        return run_solution(path, config)
+
+def print_plan(plan):
+    needing = [lesson for lesson, entry in plan['requirements'].items() if entry['requires']]
+    distinct = {tuple(plan['requirements'][lesson]['requires']) for lesson in needing}
+    print(f"{len(plan['requirements'])} lessons, {len(needing)} with third-party imports, "
+          f"{len(distinct)} distinct requirement sets -> {len(plan['layers'])} layers")
+    usage = Counter(plan['lessons'].values())
+    for key, layer in plan['layers'].items():
+        role = 'base' if layer['parent'] is None else f"on {layer['parent']}"
+        print(f"  {key} ({role}, {usage.get(key, 0)} lessons): {', '.join(layer['packages'])}")
+    unresolved = Counter(name for entry in plan['requirements'].values() for name in entry['unresolved'])
+    if unresolved:
+        print("Unresolved imports (not installed; add them to PACKAGES if they're on PyPI): "
+              + ', '.join(f"{name} ({count})" for name, count in sorted(unresolved.items())))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Infer the packages each lesson's Python solutions import and build shared, layered environments for them.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    scan_cmd = sub.add_parser('scan', help="Print the per-lesson requirements map")
+    scan_cmd.add_argument('root', nargs='?', default=DEFAULT_ROOT)
+    scan_cmd.add_argument('--json', help="Write the map to this path")
+
+    plan_cmd = sub.add_parser('plan', help="Scan and plan the layers without building them")
+    plan_cmd.add_argument('root', nargs='?', default=DEFAULT_ROOT)
+    plan_cmd.add_argument('--plan', default=DEFAULT_PLAN)
+    plan_cmd.add_argument('--min-shared', type=int, default=3, help="Lessons a package needs to go into the base layer (default: 3)")
+    plan_cmd.add_argument('--python', default=sys.executable, help="Interpreter the environments are created from")
+
+    build_cmd = sub.add_parser('build', help="Plan, then build any layers that aren't cached yet")
+    build_cmd.add_argument('root', nargs='?', default=DEFAULT_ROOT)
+    build_cmd.add_argument('--plan', default=DEFAULT_PLAN)
+    build_cmd.add_argument('--min-shared', type=int, default=3)
+    build_cmd.add_argument('--python', default=sys.executable)
+    build_cmd.add_argument('-j', '--jobs', type=int, default=4, help="Layers installed concurrently (default: 4)")
+    build_cmd.add_argument('--pip-arg', action='append', default=[], help="Extra argument for pip install, e.g. --pip-arg=--constraint=pins.txt")
+
+    args = parser.parse_args()
+    if not os.path.isdir(args.root):
+        print(f"Error: {args.root} is not a directory.")
+        sys.exit(1)
+
+    requirements = scan_requirements(args.root)
+    if args.command == 'scan':
+        for lesson, entry in requirements.items():
+            if entry['requires'] or entry['unresolved']:
+                unresolved = f"  (unresolved: {', '.join(entry['unresolved'])})" if entry['unresolved'] else ''
+                print(f"{lesson}: {', '.join(entry['requires']) or '-'}{unresolved}")
+        if args.json:
+            save_plan(requirements, args.json)
+        sys.exit(0)
+
+    plan = plan_environments(requirements, args.root, args.min_shared, args.python)
+    save_plan(plan, args.plan)
+    print_plan(plan)
+    if args.command == 'build':
+        start = time.perf_counter()
+        try:
+            timings = build_environments(plan, jobs=args.jobs, pip_args=args.pip_arg)
+        except (RuntimeError, subprocess.CalledProcessError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        cached = sum(1 for seconds in timings.values() if seconds is None)
+        print(f"Environments ready in {time.perf_counter() - start:.1f}s ({cached} of {len(timings)} layers cached)")
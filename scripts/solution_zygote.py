@@ -0,0 +1,139 @@
+"""
+Fork server for run_solutions.py --forkserver. Started as
+`python -s solution_zygote.py MODULE...`, it imports the given modules once
+and then forks a fresh child for every solution it is asked to run, so each
+run skips interpreter start-up and those imports. It uses only the standard
+library because every child inherits whatever it imports.
+
+The protocol is one JSON object per line. Requests arrive on stdin:
+    {"id", "script", "cwd", "env", "limits": [memory, cpu, fsize], "stdin", "stdout", "stderr"}
+Replies go to stdout: {"ready", "preloaded", "failed"} once at start-up, then
+{"id", "pid"} after each fork and {"id", "status"} (a raw wait status) when
+that child exits.
+"""
+import os
+import sys
+import json
+import runpy
+import select
+import signal
+import importlib
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def preload(names):
+    loaded, failed = [], []
+    for name in names:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception as e:  # broken installs raise more than ImportError
+            failed.append(f"{name}: {type(e).__name__}: {e}")
+    return loaded, failed
+
+def send(fd, message):
+    # Replies are far below PIPE_BUF, so each write is atomic
+    os.write(fd, (json.dumps(message) + '\n').encode('utf-8'))
+
+def reap(ctl_out, children):
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        request_id = children.pop(pid, None)
+        if request_id is not None:
+            send(ctl_out, {'id': request_id, 'status': status})
+
+def serve(ctl_in, ctl_out):
+    """
+    Forks a child per request until the control pipe closes. Returns None in
+    the server and the request in each forked child.
+    """
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    children = {}
+    buffer = b''
+    while True:
+        ready, _, _ = select.select([ctl_in, wake_r], [], [])
+        if wake_r in ready:
+            os.read(wake_r, 4096)
+            reap(ctl_out, children)
+        if ctl_in not in ready:
+            continue
+        data = os.read(ctl_in, 65536)
+        if not data:
+            for pid in children:
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            return None
+        *lines, buffer = (buffer + data).split(b'\n')
+        for line in lines:
+            request = json.loads(line)
+            pid = os.fork()
+            if pid == 0:
+                signal.set_wakeup_fd(-1)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                for fd in (ctl_in, ctl_out, wake_r, wake_w):
+                    os.close(fd)
+                return request
+            children[pid] = request['id']
+            send(ctl_out, {'id': request['id'], 'pid': pid})
+
+def enter_sandbox(request):
+    """Turns a freshly forked child into the same sandbox a cold run gets."""
+    # Own process group, so a timeout can kill everything the solution starts
+    os.setsid()
+    for fd, path, flags in ((0, request['stdin'] or os.devnull, os.O_RDONLY),
+                            (1, request['stdout'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC),
+                            (2, request['stderr'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC)):
+        target = os.open(path, flags, 0o600)
+        os.dup2(target, fd)
+        os.close(target)
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    memory, cpu, fsize = request['limits']
+    if resource is not None:
+        if memory:
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
+    # State a cold interpreter would not share with its siblings
+    if 'random' in sys.modules:
+        sys.modules['random'].seed()
+    if 'tempfile' in sys.modules:
+        sys.modules['tempfile'].tempdir = None
+    script = request['script']
+    sys.argv = [script]
+    sys.path.insert(0, os.path.dirname(script))
+    return script
+
+if __name__ == "__main__":
+    # Solutions mustn't be able to import the scripts next to this one
+    del sys.path[0]
+    # Keep the control pipes away from fds 0 and 1, which belong to the solution
+    ctl_in, ctl_out = os.dup(0), os.dup(1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    loaded, failed = preload(sys.argv[1:])
+    sys.stdout.flush()
+    sys.stderr.flush()
+    send(ctl_out, {'ready': True, 'preloaded': loaded, 'failed': failed})
+    request = serve(ctl_in, ctl_out)
+    if request is None:
+        sys.exit(0)
+    # From here on this is the child; uncaught exceptions and exit codes
+    # behave exactly as in `python -s -c BOOTSTRAP`
+    runpy.run_path(enter_sandbox(request), run_name='__main__')
@@ -0,0 +1,264 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+from course_tree import COURSES_ROOT, pool_map
+
+SCHEMAS_DIR = os.path.normpath(os.path.join(COURSES_ROOT, '..', 'schemas'))
+DEFAULT_CACHE = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'build', 'validate-cache.json'))
+
+# Content file name -> schema that validates it
+SCHEMA_FOR_FILE = {
+    'course.json': 'course',
+    'module.json': 'module',
+    'lesson.json': 'lesson',
+    'challenge.json': 'challenge',
+}
+
+# Keywords that don't constrain anything
+ANNOTATIONS = {'$schema', '$id', 'title', 'description', 'default', 'examples', '$comment'}
+
+JSON_TYPES = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool) or isinstance(v, float) and v.is_integer(),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None,
+}
+
+def pointer_join(pointer, token):
+    """Appends a reference token to a JSON pointer (RFC 6901 escaping)."""
+    return f"{pointer}/{str(token).replace('~', '~0').replace('/', '~1')}"
+
+def compile_schema(schema):
+    """
+    Compiles the draft-07 subset used by content/schemas into a function
+    validate(value, pointer, errors) that appends (pointer, message) pairs.
+    Unsupported keywords raise ValueError rather than being silently ignored.
+    """
+    if schema is True or schema == {}:
+        return lambda value, pointer, errors: None
+    if schema is False:
+        return lambda value, pointer, errors: errors.append((pointer, "no value is allowed here"))
+
+    unknown = set(schema) - ANNOTATIONS - {
+        'type', 'enum', 'required', 'properties', 'additionalProperties',
+        'items', 'pattern', 'minimum', 'maximum', 'minLength', 'minItems',
+    }
+    if unknown:
+        raise ValueError(f"Unsupported schema keywords: {', '.join(sorted(unknown))}")
+
+    checks = []
+
+    if 'type' in schema:
+        types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+        predicates = [JSON_TYPES[t] for t in types]
+        expected = ' or '.join(types)
+
+        def check_type(value, pointer, errors):
+            if not any(p(value) for p in predicates):
+                errors.append((pointer, f"expected {expected}, got {type(value).__name__}"))
+                return False
+            return True
+        checks.append(check_type)
+
+    if 'enum' in schema:
+        allowed = schema['enum']
+
+        def check_enum(value, pointer, errors):
+            if value not in allowed:
+                errors.append((pointer, f"{value!r} is not one of {allowed}"))
+        checks.append(check_enum)
+
+    if 'pattern' in schema:
+        pattern = re.compile(schema['pattern'])
+
+        def check_pattern(value, pointer, errors):
+            if isinstance(value, str) and not pattern.search(value):
+                errors.append((pointer, f"{value!r} does not match {pattern.pattern!r}"))
+        checks.append(check_pattern)
+
+    for keyword, op, describe in (('minimum', lambda v, m: v >= m, 'less than'),
+                                  ('maximum', lambda v, m: v <= m, 'greater than')):
+        if keyword in schema:
+            def check_bound(value, pointer, errors, limit=schema[keyword], op=op, describe=describe):
+                if JSON_TYPES['number'](value) and not op(value, limit):
+                    errors.append((pointer, f"{value} is {describe} {limit}"))
+            checks.append(check_bound)
+
+    if 'minLength' in schema:
+        def check_min_length(value, pointer, errors, limit=schema['minLength']):
+            if isinstance(value, str) and len(value) < limit:
+                errors.append((pointer, f"shorter than {limit} characters"))
+        checks.append(check_min_length)
+
+    if 'minItems' in schema:
+        def check_min_items(value, pointer, errors, limit=schema['minItems']):
+            if isinstance(value, list) and len(value) < limit:
+                errors.append((pointer, f"fewer than {limit} items"))
+        checks.append(check_min_items)
+
+    if 'required' in schema:
+        required = schema['required']
+
+        def check_required(value, pointer, errors):
+            if isinstance(value, dict):
+                for key in required:
+                    if key not in value:
+                        errors.append((pointer_join(pointer, key), "required property is missing"))
+        checks.append(check_required)
+
+    if 'properties' in schema or 'additionalProperties' in schema:
+        properties = {key: compile_schema(sub) for key, sub in schema.get('properties', {}).items()}
+        additional = schema.get('additionalProperties', True)
+        additional_check = None if additional is True else compile_schema(additional)
+
+        def check_properties(value, pointer, errors):
+            if not isinstance(value, dict):
+                return
+            for key, item in value.items():
+                check = properties.get(key, additional_check)
+                if check is not None:
+                    check(item, pointer_join(pointer, key), errors)
+        checks.append(check_properties)
+
+    if 'items' in schema:
+        item_check = compile_schema(schema['items'])
+
+        def check_items(value, pointer, errors):
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    item_check(item, pointer_join(pointer, index), errors)
+        checks.append(check_items)
+
+    def validate(value, pointer, errors):
+        for check in checks:
+            # A type mismatch makes the remaining checks meaningless
+            if check(value, pointer, errors) is False:
+                return
+    return validate
+
+def load_schemas(schemas_dir=SCHEMAS_DIR):
+    """Returns ({name: raw schema}, digest of all schema files)."""
+    schemas = {}
+    digest = hashlib.sha256()
+    for name in sorted(set(SCHEMA_FOR_FILE.values())):
+        with open(os.path.join(schemas_dir, f'{name}.schema.json'), 'rb') as f:
+            raw = f.read()
+        digest.update(raw)
+        schemas[name] = json.loads(raw)
+    return schemas, digest.hexdigest()
+
+# Per-process compiled validators, set up once by init_worker()
+_validators = {}
+
+def init_worker(schemas):
+    _validators.clear()
+    for name, schema in schemas.items():
+        _validators[name] = compile_schema(schema)
+
+def validate_file(task):
+    """Worker: validates one file. Returns (relative path, [[pointer, message], ...])."""
+    rel_path, path, schema_name = task
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        return rel_path, [['', f"invalid JSON: {e}"]]
+    errors = []
+    _validators[schema_name](data, '', errors)
+    return rel_path, [[pointer, message] for pointer, message in errors]
+
+def iter_content_files(root):
+    """Yields (relative path, absolute path, schema name) for every file with a schema."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            schema_name = SCHEMA_FOR_FILE.get(name)
+            if schema_name is None:
+                continue
+            path = os.path.join(dirpath, name)
+            yield os.path.relpath(path, root).replace(os.sep, '/'), path, schema_name
+
+def cache_key(path):
+    """Cache entries are keyed relative to content/courses, whatever root a run validates."""
+    return os.path.relpath(path, COURSES_ROOT).replace(os.sep, '/')
+
+def load_cache(path, schema_digest):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('schemaDigest') != schema_digest:
+        return {}
+    return cache.get('files', {})
+
+def save_cache(path, schema_digest, files):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'schemaDigest': schema_digest, 'files': files}, f)
+    os.replace(path + '.tmp', path)
+
+def validate_tree(root=COURSES_ROOT, cache_path=DEFAULT_CACHE, jobs=None, use_cache=True):
+    """
+    Validates every content JSON file below root. Files whose content hash is
+    in the cache are not re-validated. Returns {relative path: errors} for
+    files with errors. Cache entries for files outside root are kept.
+    """
+    start = time.perf_counter()
+    schemas, schema_digest = load_schemas()
+    cached = load_cache(cache_path, schema_digest) if use_cache else {}
+
+    results = {}
+    keys = {}
+    pending = []
+    for rel_path, path, schema_name in iter_content_files(root):
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        entry = cached.get(cache_key(path))
+        if entry is not None and entry['sha256'] == digest:
+            results[rel_path] = entry
+        else:
+            results[rel_path] = {'sha256': digest, 'errors': None}
+            pending.append((rel_path, path, schema_name))
+        keys[rel_path] = cache_key(path)
+
+    for rel_path, errors in pool_map(validate_file, pending, jobs, init_worker, (schemas,), chunksize=64):
+        results[rel_path]['errors'] = errors
+
+    if use_cache:
+        # Replace what this run covers; entries of files deleted below root go with it
+        prefix = cache_key(root) + '/'
+        files = {key: entry for key, entry in cached.items() if not (prefix == './' or key.startswith(prefix))}
+        files.update((keys[rel_path], entry) for rel_path, entry in results.items())
+        save_cache(cache_path, schema_digest, files)
+    failures = {rel_path: entry['errors'] for rel_path, entry in results.items() if entry['errors']}
+    print(f"Validated {len(results):,} files ({len(pending):,} checked, "
+          f"{len(results) - len(pending):,} cached) in {time.perf_counter() - start:.2f}s: "
+          f"{len(failures):,} with errors")
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate course, module, lesson and challenge JSON against content/schemas.")
+    parser.add_argument('root', nargs='?', default=COURSES_ROOT, help="Content root to validate (default: content/courses)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help="Result cache keyed by file content hash")
+    parser.add_argument('--no-cache', action='store_true', help="Validate every file and don't update the cache")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"Error: {args.root} is not a directory.")
+        sys.exit(1)
+
+    failures = validate_tree(args.root, args.cache, args.jobs, not args.no_cache)
+    for rel_path in sorted(failures):
+        for pointer, message in failures[rel_path]:
+            print(f"{rel_path}: {pointer or '/'}: {message}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,419 @@
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import signal
+import argparse
+import threading
+import subprocess
+from collections import deque
+
+from course_tree import COURSES_ROOT
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKERS_DIR = os.path.join(SCRIPTS_DIR, 'workers')
+BUILD_DIR = os.path.normpath(os.path.join(SCRIPTS_DIR, '..', 'build', 'workers'))
+
+# Solution file extension -> language. Python solutions are run by run_solutions.py.
+LANGUAGES = {
+    '.js': 'javascript',
+    '.cs': 'csharp',
+    '.java': 'java',
+    '.kt': 'kotlin',
+    '.dart': 'dart',
+}
+
+# Diagnostic codes meaning the solution needs a package or SDK that isn't
+# available to a single-file compile, rather than being broken itself.
+MISSING_CODES = {
+    'csharp': {'CS0246', 'CS0234'},
+    'java': {'compiler.err.doesnt.exist'},
+    'kotlin': {'unresolved-import'},
+    'dart': {'URI_DOES_NOT_EXIST'},
+}
+
+FAILING = {'failed', 'timeout', 'error'}
+STARTUP_TIMEOUT = 120.0
+
+def find_solutions(root, languages=None):
+    """Yields (relative path, language, path) for every non-Python solution file below root."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            stem, ext = os.path.splitext(name)
+            language = LANGUAGES.get(ext)
+            if stem != 'solution' or language is None or (languages and language not in languages):
+                continue
+            path = os.path.join(dirpath, name)
+            yield os.path.relpath(path, root).replace(os.sep, '/'), language, path
+
+def _newer_than(target, sources):
+    try:
+        built = os.path.getmtime(target)
+    except OSError:
+        return True
+    return any(os.path.getmtime(source) > built for source in sources)
+
+def node_worker():
+    node = shutil.which('node')
+    if node is None:
+        return None
+    return [node, '--experimental-vm-modules', '--no-warnings', os.path.join(WORKERS_DIR, 'js_worker.mjs')]
+
+def dotnet_worker():
+    """Builds the Roslyn worker on first use, or when its sources change."""
+    dotnet = shutil.which('dotnet') or shutil.which(os.path.expanduser('~/.dotnet/dotnet'))
+    if dotnet is None:
+        return None
+    project_dir = os.path.join(WORKERS_DIR, 'csharp')
+    out_dir = os.path.join(BUILD_DIR, 'csharp')
+    assembly = os.path.join(out_dir, 'CSharpWorker.dll')
+    sources = [os.path.join(project_dir, name) for name in os.listdir(project_dir)]
+    if _newer_than(assembly, sources):
+        print("Building C# worker...")
+        build = subprocess.run([dotnet, 'build', project_dir, '-c', 'Release', '-o', out_dir, '--nologo', '-v', 'q', '-p:UseSharedCompilation=false',
+                                f"-p:BaseIntermediateOutputPath={os.path.join(BUILD_DIR, 'csharp-obj')}/"],
+                               capture_output=True, text=True)
+        if build.returncode != 0:
+            print(f"Warning: couldn't build the C# worker:\n{build.stdout}{build.stderr}")
+            return None
+    return [dotnet, assembly]
+
+def java_worker():
+    # Single-file source launch compiles the worker in memory; no build step
+    java = shutil.which('java')
+    if java is None:
+        return None
+    return [java, os.path.join(WORKERS_DIR, 'JavaWorker.java')]
+
+def kotlin_worker():
+    java = shutil.which('java')
+    kotlinc = shutil.which('kotlinc')
+    kotlin_home = os.environ.get('KOTLIN_HOME')
+    if kotlin_home is None and kotlinc is not None:
+        kotlin_home = os.path.dirname(os.path.dirname(os.path.realpath(kotlinc)))
+    if java is None or kotlin_home is None:
+        return None
+    compiler = os.path.join(kotlin_home, 'lib', 'kotlin-compiler.jar')
+    if not os.path.isfile(compiler):
+        return None
+    return [java, '-cp', compiler, os.path.join(WORKERS_DIR, 'JavaWorker.java'), '--kotlin', kotlin_home]
+
+# Languages that have a warm worker. Each entry returns the worker command, or
+# None when the runtime isn't installed.
+WORKERS = {
+    'javascript': node_worker,
+    'csharp': dotnet_worker,
+    'java': java_worker,
+    'kotlin': kotlin_worker,
+}
+
+def dart_check(path, timeout):
+    """Cold fallback for Dart, which has no embeddable analyzer: one `dart analyze` per file."""
+    dart = shutil.which('dart')
+    proc = subprocess.run([dart, 'analyze', '--format=machine', path], capture_output=True, text=True, timeout=timeout)
+    diagnostics = []
+    # SEVERITY|TYPE|CODE|FILE|LINE|COLUMN|LENGTH|MESSAGE
+    for line in proc.stderr.splitlines() + proc.stdout.splitlines():
+        fields = line.split('|', 7)
+        if len(fields) == 8 and fields[0] == 'ERROR':
+            diagnostics.append({'line': int(fields[4]), 'code': fields[2], 'message': fields[7]})
+    return {'ok': not diagnostics, 'diagnostics': diagnostics}
+
+# Languages checked with one process per file
+COLD_CHECKERS = {
+    'dart': lambda: dart_check if shutil.which('dart') else None,
+}
+
+def available_languages():
+    """{language: ('warm', command) or ('cold', check function)} for every installed runtime."""
+    available = {}
+    for language, find in WORKERS.items():
+        command = find()
+        if command is not None:
+            available[language] = ('warm', command)
+    for language, find in COLD_CHECKERS.items():
+        check = find()
+        if check is not None:
+            available[language] = ('cold', check)
+    return available
+
+class WorkerDied(Exception):
+    pass
+
+class Worker:
+    """
+    A long-lived compiler process speaking the line protocol in workers/:
+    one {"id", "path"} job per line in, one {"id", "ok", "diagnostics"} reply
+    per line out, in order.
+    """
+
+    def __init__(self, command, startup_timeout=STARTUP_TIMEOUT):
+        self.command = command
+        self.startup_timeout = startup_timeout
+        self.proc = None
+        self.runtime = None
+        self.jobs_done = 0
+
+    def start(self):
+        """Starts the process and waits for its ready line. Returns the start-up time in seconds."""
+        start = time.perf_counter()
+        self.proc = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                     text=True, encoding='utf-8', bufsize=1, cwd=SCRIPTS_DIR,
+                                     start_new_session=hasattr(os, 'setsid'))
+        self.replies = queue.Queue()
+        self.stderr = deque(maxlen=20)
+        threading.Thread(target=self._read_stdout, args=(self.proc.stdout, self.replies), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self.proc.stderr, self.stderr), daemon=True).start()
+        ready = self._next_reply(self.startup_timeout)
+        if not ready.get('ready'):
+            self.close()
+            raise WorkerDied(f"unexpected first line from worker: {ready}")
+        self.runtime = ready.get('runtime')
+        self.jobs_done = 0
+        return time.perf_counter() - start
+
+    @staticmethod
+    def _read_stdout(stream, replies):
+        for line in stream:
+            try:
+                replies.put(json.loads(line))
+            except ValueError:
+                # Stray output from the compiler isn't part of the protocol
+                continue
+        replies.put(None)
+
+    @staticmethod
+    def _read_stderr(stream, lines):
+        for line in stream:
+            lines.append(line.rstrip())
+
+    def _next_reply(self, timeout):
+        try:
+            reply = self.replies.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError
+        if reply is None:
+            self.proc.wait()
+            detail = '\n'.join(self.stderr) or f"exit status {self.proc.returncode}"
+            raise WorkerDied(detail)
+        return reply
+
+    def run_batch(self, jobs, timeout):
+        """
+        Sends [(id, path)] and collects replies, allowing each job `timeout`
+        seconds after the previous reply. Returns ({id: (reply, seconds)},
+        unanswered jobs). A job that times out or kills the worker is answered
+        with a synthetic reply; everything after it is left unanswered.
+        """
+        try:
+            self.proc.stdin.write(''.join(json.dumps({'id': job_id, 'path': path}) + '\n' for job_id, path in jobs))
+            self.proc.stdin.flush()
+        except OSError:
+            pass  # Reported below when the reply stream ends
+        replies = {}
+        for index, (job_id, path) in enumerate(jobs):
+            start = time.perf_counter()
+            try:
+                reply = self._next_reply(timeout)
+            except TimeoutError:
+                self.close()
+                replies[job_id] = ({'status': 'timeout', 'detail': f"no reply within {timeout:g}s"}, timeout)
+                return replies, jobs[index + 1:]
+            except WorkerDied as e:
+                self.close()
+                replies[job_id] = ({'status': 'error', 'detail': f"worker exited: {str(e)[-500:]}"},
+                                   time.perf_counter() - start)
+                return replies, jobs[index + 1:]
+            replies[reply['id']] = (reply, time.perf_counter() - start)
+            self.jobs_done += 1
+        return replies, []
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def close(self):
+        if self.proc is None:
+            return
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+                self.proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                try:
+                    os.killpg(self.proc.pid, signal.SIGKILL)
+                except (AttributeError, OSError):
+                    self.proc.kill()
+                self.proc.wait()
+        self.proc = None
+
+def classify(language, reply):
+    """Maps a worker reply to (status, detail)."""
+    if 'status' in reply:
+        return reply['status'], reply['detail']
+    diagnostics = reply.get('diagnostics', [])
+    if reply.get('ok'):
+        return 'passed', ''
+    missing = MISSING_CODES.get(language, set())
+    for diagnostic in diagnostics:
+        if diagnostic['code'] == 'WorkerError':
+            return 'error', diagnostic['message']
+    for diagnostic in diagnostics:
+        if diagnostic['code'] in missing:
+            return 'missing-reference', diagnostic['message']
+    first = diagnostics[0] if diagnostics else {'line': 0, 'code': '', 'message': 'failed without diagnostics'}
+    return 'failed', f"line {first['line']}: {first['code']} {first['message']}".replace('  ', ' ')
+
+def build_result(language, reply, seconds):
+    status, detail = classify(language, reply)
+    return {'language': language, 'status': status, 'detail': detail,
+            'diagnostics': reply.get('diagnostics', []), 'seconds': round(seconds, 4)}
+
+def verify_warm(language, command, jobs, workers=1, batch_size=16, timeout=30.0, recycle=500):
+    """
+    Checks [(rel_path, path)] with `workers` long-lived worker processes. Each
+    pulls batches from a shared queue; a worker that times out or crashes is
+    replaced and the rest of its batch goes back on the queue. Workers are
+    restarted after `recycle` jobs to bound memory growth.
+    Returns (results, stats).
+    """
+    pending = deque((job_id, path) for job_id, (_, path) in enumerate(jobs))
+    lock = threading.Lock()
+    answers = {}
+    stats = {'starts': 0, 'startupSeconds': 0.0, 'runtime': None, 'startError': None}
+
+    def run():
+        worker = Worker(command)
+        try:
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    batch = [pending.popleft() for _ in range(min(batch_size, len(pending)))]
+                if not worker.alive or worker.jobs_done >= recycle:
+                    worker.close()
+                    try:
+                        startup = worker.start()
+                    except (OSError, TimeoutError, WorkerDied) as e:
+                        worker.close()
+                        # A worker that can't start won't start for the next batch either
+                        with lock:
+                            stats['startError'] = str(e) or type(e).__name__
+                            batch.extend(pending)
+                            pending.clear()
+                            for job_id, _ in batch:
+                                answers[job_id] = ({'status': 'error', 'detail': f"worker didn't start: {stats['startError']}"}, 0.0)
+                        return
+                    with lock:
+                        stats['starts'] += 1
+                        stats['startupSeconds'] += startup
+                        stats['runtime'] = worker.runtime
+                # Never send past the recycle point, so a batch isn't split across restarts
+                sendable = batch[:max(1, recycle - worker.jobs_done)]
+                replies, unanswered = worker.run_batch(sendable, timeout)
+                with lock:
+                    answers.update(replies)
+                    pending.extendleft(reversed(unanswered + batch[len(sendable):]))
+        finally:
+            worker.close()
+
+    threads = [threading.Thread(target=run, daemon=True) for _ in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    results = {rel_path: build_result(language, *answers[job_id]) for job_id, (rel_path, _) in enumerate(jobs)}
+    return results, stats
+
+def verify_cold(language, check, jobs, timeout=30.0):
+    """Checks [(rel_path, path)] one process per file. Returns (results, stats)."""
+    results = {}
+    for rel_path, path in jobs:
+        start = time.perf_counter()
+        try:
+            reply = check(path, timeout)
+        except subprocess.TimeoutExpired:
+            reply = {'status': 'timeout', 'detail': f"no result within {timeout:g}s"}
+        except OSError as e:
+            reply = {'status': 'error', 'detail': str(e)}
+        results[rel_path] = build_result(language, reply, time.perf_counter() - start)
+    return results, {'starts': len(jobs), 'startupSeconds': 0.0, 'runtime': None, 'startError': None}
+
+def verify_all(root, languages=None, workers=1, batch_size=16, timeout=30.0, recycle=500):
+    """
+    Verifies every solution below root whose runtime is installed. Returns
+    (results keyed by relative path, per-language throughput stats).
+    """
+    by_language = {}
+    for rel_path, language, path in find_solutions(root, languages):
+        by_language.setdefault(language, []).append((rel_path, path))
+
+    available = available_languages()
+    results = {}
+    throughput = {}
+    for language, jobs in sorted(by_language.items()):
+        if language not in available:
+            throughput[language] = {'mode': 'unavailable', 'files': len(jobs)}
+            continue
+        mode, runner = available[language]
+        start = time.perf_counter()
+        if mode == 'warm':
+            language_results, stats = verify_warm(language, runner, jobs, workers, batch_size, timeout, recycle)
+        else:
+            language_results, stats = verify_cold(language, runner, jobs, timeout)
+        elapsed = time.perf_counter() - start
+        counts = {}
+        for rel_path, result in language_results.items():
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+            if result['status'] != 'passed':
+                print(f"{result['status']:<17} {rel_path}: {result['detail']}")
+        results.update(language_results)
+        throughput[language] = dict(stats, mode=mode, files=len(jobs), counts=counts, seconds=round(elapsed, 3),
+                                    filesPerSecond=round(len(jobs) / elapsed, 1) if elapsed else 0.0)
+    return results, throughput
+
+def print_throughput(throughput):
+    print(f"{'language':<11} {'mode':<11} {'files':>6} {'passed':>7} {'other':>6} {'wall':>8} {'files/s':>8} "
+          f"{'starts':>7} {'startup':>8}  runtime")
+    for language, stats in throughput.items():
+        if stats['mode'] == 'unavailable':
+            print(f"{language:<11} {'-':<11} {stats['files']:>6}  (runtime not installed)")
+            continue
+        passed = stats['counts'].get('passed', 0)
+        startup = stats['startupSeconds'] / stats['starts'] if stats['starts'] and stats['mode'] == 'warm' else 0.0
+        print(f"{language:<11} {stats['mode']:<11} {stats['files']:>6} {passed:>7} {stats['files'] - passed:>6} "
+              f"{stats['seconds']:>7.2f}s {stats['filesPerSecond']:>8.1f} {stats['starts']:>7} {startup:>7.2f}s  "
+              f"{stats['runtime'] or ''}")
+        if stats.get('startError'):
+            print(f"  worker failed to start: {stats['startError']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile-check non-Python challenge solutions with warm per-language worker processes.")
+    parser.add_argument('root', nargs='?', default=COURSES_ROOT, help="Directory searched for solution files (default: content/courses)")
+    parser.add_argument('--languages', nargs='*', choices=sorted(set(LANGUAGES.values())), help="Only verify these languages")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes per language (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=16, help="Jobs sent to a worker at a time (default: 16)")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Seconds allowed per solution (default: 30)")
+    parser.add_argument('--recycle', type=int, default=500, help="Restart a worker after this many jobs; 1 gives a cold baseline (default: 500)")
+    parser.add_argument('--json', help="Write a JSON report to this path")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"Error: {args.root} is not a directory.")
+        sys.exit(1)
+    if args.batch_size < 1 or args.recycle < 1:
+        print("Error: --batch-size and --recycle must be at least 1.")
+        sys.exit(1)
+
+    results, throughput = verify_all(args.root, args.languages, args.workers or os.cpu_count(),
+                                     args.batch_size, args.timeout, args.recycle)
+    print_throughput(throughput)
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'root': args.root, 'throughput': throughput, 'results': results}, f, indent=2)
+    sys.exit(1 if any(result['status'] in FAILING for result in results.values()) else 0)
@@ -0,0 +1,369 @@
+import os
+import sys
+import json
+import time
+import errno
+import select
+import signal
+import struct
+import fnmatch
+import argparse
+import ctypes
+import ctypes.util
+
+from course_tree import COURSES_ROOT, read_text
+from frontmatter import parse_frontmatter
+from refactor_course import process_course
+from search_index import DEFAULT_INDEX_DIR, load_lesson_cache, refresh_lessons, save_lesson_cache, write_index
+from validate_content import SCHEMA_FOR_FILE, init_worker, load_schemas, validate_file
+
+# Editor swap files, atomic-write temporaries and our own outputs that
+# shouldn't trigger any work
+IGNORED = ('*.tmp', '*.bak', '*.swp', '*.swx', '*~', '.#*', '4913', '__pycache__', '*.py[cod]',
+           '.split-manifest.json', '.DS_Store')
+
+def ignored(path):
+    return any(fnmatch.fnmatchcase(name, pattern) for name in path.split('/') for pattern in IGNORED)
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x1000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+EVENT_HEADER = struct.Struct('iIII')
+
+class InotifyWatcher:
+    """
+    Recursive watch on a directory through the kernel's inotify API, called
+    via ctypes. New directories are watched as they appear, and the files
+    already in them reported, since they may have been written before the
+    watch was in place. read() returns None when the kernel dropped events.
+    """
+
+    def __init__(self, root):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.root = root
+        self.dirs = {}
+        self._buffer = b''
+        try:
+            self.watch_tree(root)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def watch(self, path):
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOENT:
+                return
+            if err == errno.ENOSPC:
+                raise OSError(err, "out of inotify watches (see /proc/sys/fs/inotify/max_user_watches)")
+            raise OSError(err, f"{path}: {os.strerror(err)}")
+        self.dirs[wd] = path
+
+    def watch_tree(self, path):
+        """Watches path and every directory below it. Returns the files found in them."""
+        files = []
+        self.watch(path)
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [d for d in dirnames if not ignored(d)]
+            for name in dirnames:
+                self.watch(os.path.join(dirpath, name))
+            files.extend(os.path.join(dirpath, name) for name in filenames)
+        return files
+
+    def read(self, timeout):
+        """Waits up to timeout seconds for events. Returns the set of paths touched."""
+        deadline = time.monotonic() + timeout
+        paths = set()
+        while not paths:
+            ready, _, _ = select.select([self.fd], [], [], max(0.0, deadline - time.monotonic()))
+            if not ready:
+                break
+            try:
+                while True:
+                    self._buffer += os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                pass
+            data, self._buffer = self._buffer, b''
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+                offset += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    return None
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                parent = self.dirs.get(wd)
+                if parent is None:
+                    continue
+                path = os.path.join(parent, os.fsdecode(name)) if name else parent
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        paths.update(self.watch_tree(path))
+                    paths.add(path)
+                elif not mask & IN_CREATE:
+                    # A created file is reported again when it's closed after writing
+                    paths.add(path)
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback for systems without inotify: compares (size, mtime) snapshots of the tree every interval seconds."""
+
+    def __init__(self, root, interval=1.0):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        snapshot = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not ignored(d)]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def read(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        snapshot = self.scan()
+        changed = {path for path, state in snapshot.items() if self.snapshot.get(path) != state}
+        changed.update(set(self.snapshot) - set(snapshot))
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+def open_watcher(root, poll=False, interval=1.0):
+    if not poll:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}); polling every {interval:g}s instead")
+    return PollingWatcher(root, interval)
+
+def wait_for_batch(watcher, debounce, max_wait):
+    """
+    Blocks until something changes, then keeps collecting until no event has
+    arrived for `debounce` seconds (or `max_wait` seconds have passed, so a
+    steady stream of writes can't hold work back forever). Returns (paths,
+    monotonic time of the first event); paths is None after an overflow.
+    """
+    while True:
+        paths = watcher.read(3600)
+        if paths is None or paths:
+            break
+    first = time.monotonic()
+    while paths is not None:
+        more = watcher.read(max(0.0, min(debounce, first + max_wait - time.monotonic())))
+        if more is None:
+            paths = None
+        elif not more or time.monotonic() - first >= max_wait:
+            paths.update(more or ())
+            break
+        else:
+            paths.update(more)
+    return paths, first
+
+def is_monolithic(path):
+    """True for a course source file that still holds its modules and needs splitting."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return isinstance(json.load(f).get('modules'), list)
+    except (OSError, ValueError):
+        return False
+
+def lesson_key(rel_path):
+    """'course/modules/NN-x/lessons/NN-y/...' -> the lesson's key in the search index, else None."""
+    parts = rel_path.split('/')
+    if len(parts) >= 5 and parts[1] == 'modules' and parts[3] == 'lessons':
+        return '/'.join(parts[:5])
+    return None
+
+class ContentWatcher:
+    """Re-runs only the checks a batch of changed files affects."""
+
+    def __init__(self, root, index_dir=DEFAULT_INDEX_DIR, source='course.json', use_index=True):
+        self.root = root
+        self.index_dir = index_dir if use_index else None
+        self.source = source
+        schemas, _ = load_schemas()
+        init_worker(schemas)
+        self.lessons = None
+        self.index_dirty = False
+        if self.index_dir:
+            os.makedirs(self.index_dir, exist_ok=True)
+            self.lessons = load_lesson_cache(self.index_dir)
+            # Catch up with edits made while nobody was watching
+            self.update_index(None)
+
+    def update_index(self, keys):
+        """Re-indexes the given lessons (every lesson for None) and rewrites the index if anything changed."""
+        lessons, reindexed = refresh_lessons(self.root, self.lessons, keys)
+        removed = len(set(self.lessons) - set(lessons))
+        self.lessons = lessons
+        if reindexed or removed or not os.path.exists(os.path.join(self.index_dir, 'index.pickle')):
+            write_index(self.index_dir, lessons)
+            self.index_dirty = True
+        return reindexed, removed
+
+    def save(self):
+        """The per-lesson cache only speeds up the next cold build, so it's written when watching stops."""
+        if self.index_dir and self.index_dirty:
+            save_lesson_cache(self.index_dir, self.lessons)
+            self.index_dirty = False
+
+    def split_sources(self, rel_paths):
+        """Re-splits courses whose monolithic source changed. Returns the number split."""
+        split = 0
+        for rel_path in sorted(rel_paths):
+            parts = rel_path.split('/')
+            path = os.path.join(self.root, *parts)
+            if len(parts) == 2 and parts[1] == self.source and is_monolithic(path):
+                process_course(os.path.dirname(path), source=self.source, stream=True)
+                split += 1
+        return split
+
+    def process(self, rel_paths):
+        """Runs the affected checks for a batch. Returns (report dict, problems)."""
+        report = {'files': len(rel_paths)}
+        problems = []
+        timings = {}
+
+        start = time.perf_counter()
+        validated = 0
+        sections = 0
+        for rel_path in sorted(rel_paths):
+            path = os.path.join(self.root, *rel_path.split('/'))
+            if not os.path.isfile(path):
+                continue
+            name = rel_path.rsplit('/', 1)[-1]
+            schema_name = SCHEMA_FOR_FILE.get(name)
+            if schema_name is not None:
+                _, errors = validate_file((rel_path, path, schema_name))
+                validated += 1
+                problems.extend(f"{rel_path}: {pointer or '/'}: {message}" for pointer, message in errors)
+            elif name.endswith('.md') and rel_path.split('/')[-2:-1] == ['content']:
+                sections += 1
+                try:
+                    metadata, _ = parse_frontmatter(read_text(path))
+                except (OSError, UnicodeDecodeError) as e:
+                    problems.append(f"{rel_path}: unreadable: {e}")
+                    continue
+                if not metadata:
+                    problems.append(f"{rel_path}: no frontmatter header")
+                elif not metadata.get('type'):
+                    problems.append(f"{rel_path}: frontmatter has no type")
+        report['validated'] = validated
+        report['sections'] = sections
+        timings['check'] = time.perf_counter() - start
+
+        if self.index_dir:
+            start = time.perf_counter()
+            keys = {key for key in map(lesson_key, rel_paths) if key}
+            if keys:
+                try:
+                    report['indexed'], report['removed'] = self.update_index(keys)
+                except Exception as e:
+                    # Half-written or invalid content; the next edit to the lesson retries it
+                    problems.append(f"search index not updated: {type(e).__name__}: {e}")
+            timings['index'] = time.perf_counter() - start
+        report['timings'] = timings
+        return report, problems
+
+def relative(root, paths):
+    rel_paths = set()
+    for path in paths:
+        rel_path = os.path.relpath(path, root).replace(os.sep, '/')
+        if not rel_path.startswith('..') and not ignored(rel_path):
+            rel_paths.add(rel_path)
+    return rel_paths
+
+def watch(root, index_dir=DEFAULT_INDEX_DIR, source='course.json', use_index=True, debounce=0.2, max_wait=2.0,
+          poll=False, interval=1.0):
+    start = time.perf_counter()
+    content = ContentWatcher(root, index_dir, source, use_index)
+    watcher = open_watcher(root, poll, interval)
+    kind = 'inotify' if isinstance(watcher, InotifyWatcher) else 'polling'
+    # Stopping through SIGTERM still saves the index cache on the way out
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Watching {root} ({kind}, ready in {time.perf_counter() - start:.2f}s); Ctrl-C to stop")
+    try:
+        while True:
+            paths, first = wait_for_batch(watcher, debounce, max_wait)
+            if paths is None:
+                # The kernel queue overflowed: treat everything as changed once
+                print("Event queue overflowed; rescanning the whole tree")
+                watcher.close()
+                watcher = open_watcher(root, poll, interval)
+                paths = {os.path.join(dirpath, name) for dirpath, _, names in os.walk(root) for name in names}
+            rel_paths = relative(root, paths)
+            if not rel_paths:
+                continue
+            started = time.monotonic()
+            if content.split_sources(rel_paths):
+                # Pick up what the split wrote so it's checked in this same round
+                rel_paths |= relative(root, watcher.read(0) or ())
+            split_time = time.monotonic() - started
+            report, problems = content.process(rel_paths)
+            done = time.monotonic()
+            report['timings'] = dict(split=split_time, **report['timings'])
+            timings = ', '.join(f"{step} {seconds * 1000:.0f}ms" for step, seconds in report['timings'].items())
+            summary = f"{report['files']} changed: {report['validated']} validated, {report['sections']} sections parsed"
+            if 'indexed' in report:
+                summary += f", {report['indexed']} lessons re-indexed, {report['removed']} removed"
+            print(f"[{time.strftime('%H:%M:%S')}] {summary} in {(done - started) * 1000:.0f}ms "
+                  f"({timings}; {(done - first) * 1000:.0f}ms since first event)")
+            for problem in problems:
+                print(f"  {problem}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        content.save()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch the content tree and re-run the checks each edit affects: re-split, schema validation, frontmatter and search index.")
+    parser.add_argument('root', nargs='?', default=COURSES_ROOT, help="Content root to watch (default: content/courses)")
+    parser.add_argument('--index', default=DEFAULT_INDEX_DIR, help="Search index directory to keep up to date")
+    parser.add_argument('--no-index', action='store_true', help="Don't update the search index")
+    parser.add_argument('--source', default='course.json', help="Monolithic course file that triggers a re-split when edited (default: course.json)")
+    parser.add_argument('--debounce', type=float, default=0.2, help="Seconds without events that end a burst (default: 0.2)")
+    parser.add_argument('--max-wait', type=float, default=2.0, help="Longest a burst is collected before it's processed (default: 2)")
+    parser.add_argument('--poll', action='store_true', help="Poll for changes instead of using inotify")
+    parser.add_argument('--interval', type=float, default=1.0, help="Polling interval in seconds (default: 1)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"Error: {args.root} is not a directory.")
+        sys.exit(1)
+
+    watch(os.path.abspath(args.root), args.index, args.source, not args.no_index, args.debounce, args.max_wait,
+          args.poll, args.interval)
@@ -0,0 +1,163 @@
+// Verification worker for scripts/verify_solutions.py, run as a single-file
+// program (`java JavaWorker.java`). Compiles Java files in-process with
+// javax.tools, or Kotlin files with the Kotlin compiler when started as
+// `java -cp KOTLIN_HOME/lib/kotlin-compiler.jar JavaWorker.java --kotlin KOTLIN_HOME`,
+// so the JVM and compiler stay warm across jobs.
+// Reads one job per line on stdin ({"id", "path"}) and writes one reply per
+// line ({"id", "ok", "diagnostics": [{"line", "code", "message"}]}).
+import java.io.*;
+import java.lang.reflect.Method;
+import java.net.URI;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.*;
+import java.util.*;
+import java.util.regex.*;
+import javax.tools.*;
+
+public class JavaWorker {
+    private static final Pattern ID = Pattern.compile("\"id\"\\s*:\\s*(\\d+)");
+    private static final Pattern PATH = Pattern.compile("\"path\"\\s*:\\s*\"((?:[^\"\\\\]|\\\\.)*)\"");
+    private static final Pattern PUBLIC_TYPE = Pattern.compile(
+        "^\\s*public\\s+(?:(?:abstract|final|sealed|non-sealed|static|strictfp)\\s+)*(?:class|interface|enum|record|@interface)\\s+(\\w+)",
+        Pattern.MULTILINE);
+    private static final Pattern KOTLIN_MESSAGE = Pattern.compile("^.*?:(\\d+):\\d+: error: (.*)$", Pattern.MULTILINE);
+
+    record Diagnostic(long line, String code, String message) {}
+
+    public static void main(String[] args) throws Exception {
+        boolean kotlin = args.length > 0 && args[0].equals("--kotlin");
+        String kotlinHome = kotlin && args.length > 1 ? args[1] : null;
+        JavaCompiler javac = kotlin ? null : ToolProvider.getSystemJavaCompiler();
+        Object kotlinc = kotlin ? Class.forName("org.jetbrains.kotlin.cli.jvm.K2JVMCompiler").getDeclaredConstructor().newInstance() : null;
+        Path output = Files.createTempDirectory("verify-worker-");
+
+        PrintStream out = new PrintStream(new FileOutputStream(FileDescriptor.out), true, StandardCharsets.UTF_8);
+        // Compilers print to System.out/err; keep them off the reply channel
+        System.setOut(new PrintStream(OutputStream.nullOutputStream()));
+        String runtime = (kotlin ? "kotlinc on " : "javac ") + System.getProperty("java.version");
+        out.println("{\"ready\":true,\"runtime\":" + quote(runtime) + "}");
+
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        String line;
+        while ((line = in.readLine()) != null) {
+            if (line.isBlank()) continue;
+            Matcher id = ID.matcher(line);
+            Matcher path = PATH.matcher(line);
+            if (!id.find() || !path.find()) continue;
+            List<Diagnostic> diagnostics;
+            try {
+                Path source = Paths.get(unquote(path.group(1)));
+                diagnostics = kotlin ? compileKotlin(kotlinc, kotlinHome, source, output) : compileJava(javac, source);
+            } catch (Exception e) {
+                diagnostics = List.of(new Diagnostic(1, "WorkerError", String.valueOf(e)));
+            }
+            StringBuilder reply = new StringBuilder("{\"id\":").append(id.group(1))
+                .append(",\"ok\":").append(diagnostics.isEmpty()).append(",\"diagnostics\":[");
+            for (int i = 0; i < diagnostics.size(); i++) {
+                Diagnostic d = diagnostics.get(i);
+                if (i > 0) reply.append(',');
+                reply.append("{\"line\":").append(d.line()).append(",\"code\":").append(quote(d.code()))
+                    .append(",\"message\":").append(quote(d.message())).append('}');
+            }
+            out.println(reply.append("]}"));
+        }
+    }
+
+    static List<Diagnostic> compileJava(JavaCompiler javac, Path path) throws IOException {
+        String source = Files.readString(path);
+        // javac insists a public type lives in a file of the same name
+        Matcher publicType = PUBLIC_TYPE.matcher(source);
+        String name = publicType.find() ? publicType.group(1) : "Solution";
+        JavaFileObject file = new SimpleJavaFileObject(URI.create("string:///" + name + ".java"), JavaFileObject.Kind.SOURCE) {
+            @Override
+            public CharSequence getCharContent(boolean ignoreEncodingErrors) {
+                return source;
+            }
+        };
+        DiagnosticCollector<JavaFileObject> collector = new DiagnosticCollector<>();
+        StandardJavaFileManager standard = javac.getStandardFileManager(collector, null, StandardCharsets.UTF_8);
+        // Class files are discarded; only the diagnostics matter
+        JavaFileManager discard = new ForwardingJavaFileManager<>(standard) {
+            @Override
+            public JavaFileObject getJavaFileForOutput(Location location, String className, JavaFileObject.Kind kind, FileObject sibling) {
+                return new SimpleJavaFileObject(URI.create("mem:///" + className.replace('.', '/') + kind.extension), kind) {
+                    @Override
+                    public OutputStream openOutputStream() {
+                        return OutputStream.nullOutputStream();
+                    }
+                };
+            }
+        };
+        javac.getTask(null, discard, collector, List.of("-proc:none", "-Xlint:none", "--enable-preview", "--release",
+                      String.valueOf(Runtime.version().feature())), null, List.of(file)).call();
+        List<Diagnostic> diagnostics = new ArrayList<>();
+        for (var d : collector.getDiagnostics()) {
+            if (d.getKind() == javax.tools.Diagnostic.Kind.ERROR) {
+                diagnostics.add(new Diagnostic(Math.max(1, d.getLineNumber()), d.getCode(), d.getMessage(Locale.ROOT)));
+            }
+        }
+        return diagnostics;
+    }
+
+    static List<Diagnostic> compileKotlin(Object kotlinc, String kotlinHome, Path path, Path output) throws Exception {
+        ByteArrayOutputStream messages = new ByteArrayOutputStream();
+        PrintStream stream = new PrintStream(messages, true, StandardCharsets.UTF_8);
+        Method exec = kotlinc.getClass().getMethod("exec", PrintStream.class, String[].class);
+        exec.invoke(kotlinc, stream, new String[] {
+            path.toString(), "-d", output.toString(), "-kotlin-home", kotlinHome, "-nowarn", "-no-reflect"
+        });
+        List<String> lines = Files.readAllLines(path);
+        List<Diagnostic> diagnostics = new ArrayList<>();
+        Matcher m = KOTLIN_MESSAGE.matcher(messages.toString(StandardCharsets.UTF_8));
+        while (m.find()) {
+            int line = Integer.parseInt(m.group(1));
+            String text = line <= lines.size() ? lines.get(line - 1).trim() : "";
+            String code = text.startsWith("import ") && m.group(2).startsWith("unresolved reference") ? "unresolved-import" : "error";
+            diagnostics.add(new Diagnostic(line, code, m.group(2)));
+        }
+        return diagnostics;
+    }
+
+    static String quote(String value) {
+        StringBuilder sb = new StringBuilder("\"");
+        for (char c : String.valueOf(value).toCharArray()) {
+            switch (c) {
+                case '"' -> sb.append("\\\"");
+                case '\\' -> sb.append("\\\\");
+                case '\n' -> sb.append("\\n");
+                case '\r' -> sb.append("\\r");
+                case '\t' -> sb.append("\\t");
+                default -> {
+                    if (c < 0x20) sb.append(String.format("\\u%04x", (int) c));
+                    else sb.append(c);
+                }
+            }
+        }
+        return sb.append('"').toString();
+    }
+
+    static String unquote(String value) {
+        StringBuilder sb = new StringBuilder();
+        for (int i = 0; i < value.length(); i++) {
+            char c = value.charAt(i);
+            if (c != '\\' || i + 1 >= value.length()) {
+                sb.append(c);
+                continue;
+            }
+            char next = value.charAt(++i);
+            switch (next) {
+                case 'n' -> sb.append('\n');
+                case 'r' -> sb.append('\r');
+                case 't' -> sb.append('\t');
+                case 'b' -> sb.append('\b');
+                case 'f' -> sb.append('\f');
+                case 'u' -> {
+                    sb.append((char) Integer.parseInt(value.substring(i + 1, i + 5), 16));
+                    i += 4;
+                }
+                default -> sb.append(next);
+            }
+        }
+        return sb.toString();
+    }
+}
@@ -0,0 +1,63 @@
+// Verification worker for scripts/verify_solutions.py: compiles C# files
+// in-process with Roslyn, so the compiler is loaded and JIT-compiled once.
+// Reads one job per line on stdin ({"id", "path"}) and writes one reply per
+// line ({"id", "ok", "diagnostics": [{"line", "code", "message"}]}).
+using System.Text.Json;
+using Microsoft.CodeAnalysis;
+using Microsoft.CodeAnalysis.CSharp;
+using Microsoft.CodeAnalysis.CSharp.Syntax;
+
+var runtimeDir = Path.GetDirectoryName(typeof(object).Assembly.Location);
+var references = ((string)AppContext.GetData("TRUSTED_PLATFORM_ASSEMBLIES"))
+    .Split(Path.PathSeparator)
+    .Where(path => Path.GetDirectoryName(path) == runtimeDir)
+    .Select(path => (MetadataReference)MetadataReference.CreateFromFile(path))
+    .ToList();
+
+var parseOptions = new CSharpParseOptions(LanguageVersion.Latest);
+// The usings `dotnet new console` enables implicitly, which the course code relies on
+var implicitUsings = CSharpSyntaxTree.ParseText(
+    string.Join("\n", new[] { "System", "System.IO", "System.Linq", "System.Net.Http", "System.Threading",
+                              "System.Threading.Tasks", "System.Collections.Generic" }
+        .Select(ns => $"global using global::{ns};")),
+    parseOptions);
+
+var jsonOptions = new JsonSerializerOptions { PropertyNamingPolicy = JsonNamingPolicy.CamelCase };
+Console.WriteLine(JsonSerializer.Serialize(new { Ready = true, Runtime = $".NET {Environment.Version}" }, jsonOptions));
+
+string line;
+while ((line = Console.ReadLine()) != null)
+{
+    if (string.IsNullOrWhiteSpace(line)) continue;
+    using var job = JsonDocument.Parse(line);
+    var id = job.RootElement.GetProperty("id").GetInt64();
+    var path = job.RootElement.GetProperty("path").GetString();
+    List<Reply> diagnostics;
+    try
+    {
+        diagnostics = Compile(path);
+    }
+    catch (Exception e)
+    {
+        diagnostics = new List<Reply> { new Reply(1, "WorkerError", e.Message) };
+    }
+    Console.WriteLine(JsonSerializer.Serialize(new { Id = id, Ok = diagnostics.Count == 0, Diagnostics = diagnostics }, jsonOptions));
+}
+
+List<Reply> Compile(string path)
+{
+    var tree = CSharpSyntaxTree.ParseText(File.ReadAllText(path), parseOptions, path);
+    // Top-level statements need an executable; anything else compiles as a library
+    var kind = tree.GetCompilationUnitRoot().Members.OfType<GlobalStatementSyntax>().Any()
+        ? OutputKind.ConsoleApplication
+        : OutputKind.DynamicallyLinkedLibrary;
+    var compilation = CSharpCompilation.Create(
+        "Solution", new[] { tree, implicitUsings }, references,
+        new CSharpCompilationOptions(kind, nullableContextOptions: NullableContextOptions.Enable));
+    return compilation.GetDiagnostics()
+        .Where(d => d.Severity == DiagnosticSeverity.Error)
+        .Select(d => new Reply(d.Location.GetLineSpan().StartLinePosition.Line + 1, d.Id, d.GetMessage()))
+        .ToList();
+}
+
+record Reply(int Line, string Code, string Message);
@@ -0,0 +1,51 @@
+// Verification worker for scripts/verify_solutions.py.
+// Reads one job per line on stdin: {"id", "path"}. Parses the file without
+// running it and writes one reply per line:
+// {"id", "ok", "diagnostics": [{"line", "code", "message"}]}.
+// Start with --experimental-vm-modules so ES modules can be parsed too.
+import { readFileSync } from 'node:fs';
+import { createInterface } from 'node:readline';
+import vm from 'node:vm';
+
+function diagnostic(error, path) {
+  const location = String(error.stack || '').match(new RegExp(`${path.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')}:(\\d+)`));
+  return { line: location ? Number(location[1]) : 1, code: error.name || 'Error', message: error.message };
+}
+
+function check(path) {
+  const source = readFileSync(path, 'utf8');
+  try {
+    new vm.Script(source, { filename: path });
+    return [];
+  } catch (scriptError) {
+    if (!vm.SourceTextModule) {
+      return [diagnostic(scriptError, path)];
+    }
+    // import/export and top-level await only parse as a module
+    try {
+      new vm.SourceTextModule(source, { identifier: path });
+      return [];
+    } catch (moduleError) {
+      // Module parse errors carry no location; the script error has one when it's the same error
+      if (moduleError.message === scriptError.message) {
+        return [diagnostic(scriptError, path)];
+      }
+      return [diagnostic(moduleError, path)];
+    }
+  }
+}
+
+process.stdout.write(JSON.stringify({ ready: true, runtime: `node ${process.version}` }) + '\n');
+
+const lines = createInterface({ input: process.stdin, crlfDelay: Infinity });
+lines.on('line', (line) => {
+  if (!line.trim()) return;
+  const job = JSON.parse(line);
+  let diagnostics;
+  try {
+    diagnostics = check(job.path);
+  } catch (error) {
+    diagnostics = [{ line: 1, code: 'WorkerError', message: String(error && error.message) }];
+  }
+  process.stdout.write(JSON.stringify({ id: job.id, ok: diagnostics.length === 0, diagnostics }) + '\n');
+});